@@ -1,54 +1,292 @@
 import os
 import json
+import threading
 
-from rdflib import Graph
+from . import trace_utils
 
-from .utils import load_orbn
-from .rdf_utils import convert_rbn_to_lemon, load_orbn_in_lemon, get_senseid_to_lu_uri
+with trace_utils.span('import ODWN_reader'):
+    from .utils import load_orbn
+    from .rdf_utils import convert_rbn_to_lemon, load_orbn_in_lemon, get_senseid_to_lu_uri
+    from .rdf_utils import write_rbn_in_lemon, mint_senseid_to_lu_uri, verify_senseid_to_lu_uri
+    from . import cache_utils
+    from .index_utils import LemmaIndex, INDEX_VERSION, PartIndex, PART_INDEX_VERSION
 
-# load sense_id to RBN sense object
 package_dir = os.path.dirname(os.path.realpath(__file__))
-path = os.path.join(package_dir, 'output/orbn.p')
-senseid_to_sense_obj = load_orbn(path,
-                                 package_dir)
-print(f'loaded {len(senseid_to_sense_obj)} RBN senses')
+path = os.path.join(package_dir, 'output/orbn.lex')
+if not os.path.exists(path):
+    path = os.path.join(package_dir, 'output/orbn.p')
 
-from .lexicon_utils import get_verb_to_phrasal_entries
-verb_to_phrasal_entries = get_verb_to_phrasal_entries(orbn_sense_id_to_obj=senseid_to_sense_obj,
-                                                      verbose=2)
-
-
-orbn_lemon_path = os.path.join(package_dir, 'output', 'orbn_1.0.ttl')
-path_senseid_to_uri = os.path.join(package_dir, 'output', 'orbn_1.0_senseid_to_uri.json')
-if not os.path.exists(orbn_lemon_path):
-    rbn_pos_to_lexinfo = {
+output_dir = os.path.join(package_dir, 'output')
+lemon_ttl_path = os.path.join(package_dir, 'resources', 'lemon', 'lemon.ttl')
+wiktionary_path = os.path.join(package_dir, 'resources', 'wiktionary', 'translations.tsv')
+mapping_excel_path = os.path.join(package_dir, 'mapping_to_fn', 'Mapping.xlsx')
+mapping_json_path = os.path.join(package_dir, 'mapping_to_fn', 'mapping.json')
+lemon_settings = {
+    'namespace': 'http://rdf.cltl.nl/rbn/',
+    'major_version': 1,
+    'minor_version': 0,
+    'language': 'nld',
+    'rbn_pos_to_lexinfo': {
       "adj" : "http://www.lexinfo.net/ontology/3.0/lexinfo#adjective",
       "noun" : "http://www.lexinfo.net/ontology/3.0/lexinfo#noun",
       "verb" : "http://www.lexinfo.net/ontology/3.0/lexinfo#verb"
     }
-    lemon_ttl_path = os.path.join(package_dir, 'resources', 'lemon', 'lemon.ttl')
+}
+rbn_pos_to_lexinfo = lemon_settings['rbn_pos_to_lexinfo']
+lemon_stem = f"orbn_{lemon_settings['major_version']}.{lemon_settings['minor_version']}"
+
+# the attributes below are computed on first access (see __getattr__) and cached here
+loaded_attributes = dict()
+lock = threading.RLock()
+
+
+def get_senseid_to_sense_obj():
+    # load sense_id to RBN sense object
+    senseid_to_sense_obj = load_orbn(path,
+                                     package_dir)
+    print(f'loaded {len(senseid_to_sense_obj)} RBN senses')
+    return senseid_to_sense_obj
+
+
+def get_verb_to_phrasal_entries():
+    from .lexicon_utils import get_verb_to_phrasal_entries
+    return get_verb_to_phrasal_entries(orbn_sense_id_to_obj=__getattr__('senseid_to_sense_obj'),
+                                       verbose=2)
+
+
+def get_lemma_index():
+    """
+    index of the senses by (lemma, rbn_pos) and (lemma, fn_pos),
+    cached as output/lemma_index-<fingerprint>.json
+    """
+    def write_lemma_index(output_path):
+        loaded_attributes['lemma_index'] = LemmaIndex.build(__getattr__('senseid_to_sense_obj'))
+        loaded_attributes['lemma_index'].save(output_path)
+
+    fingerprint = cache_utils.get_fingerprint(input_paths={'orbn': path},
+                                              settings={'index_version': INDEX_VERSION})
+    lemma_index_path = cache_utils.get_or_build(output_dir,
+                                                stem='lemma_index',
+                                                suffix='.json',
+                                                fingerprint=fingerprint,
+                                                write_function=write_lemma_index,
+                                                verbose=1)
+    if 'lemma_index' in loaded_attributes:
+        return loaded_attributes['lemma_index']
+    return LemmaIndex.load(lemma_index_path)
+
+
+def get_part_index():
+    """
+    index of the senses by the parts of their morpho-structure,
+    cached as output/part_index-<fingerprint>.json
+    """
+    def write_part_index(output_path):
+        loaded_attributes['part_index'] = PartIndex.build(__getattr__('senseid_to_sense_obj'))
+        loaded_attributes['part_index'].save(output_path)
+
+    fingerprint = cache_utils.get_fingerprint(input_paths={'orbn': path},
+                                              settings={'index_version': PART_INDEX_VERSION})
+    part_index_path = cache_utils.get_or_build(output_dir,
+                                               stem='part_index',
+                                               suffix='.json',
+                                               fingerprint=fingerprint,
+                                               write_function=write_part_index,
+                                               verbose=1)
+    if 'part_index' in loaded_attributes:
+        return loaded_attributes['part_index']
+    return PartIndex.load(part_index_path)
+
+
+def get_frame_mapping():
+    """
+    rbn_feature_set <-> FrameNet frames joined to ORBN,
+    cached as output/frame_mapping-<fingerprint>.json
+    """
+    from .framenet_utils import get_frame_mapping
+    return get_frame_mapping(mapping_excel_path,
+                             mapping_json_path,
+                             orbn_path=path,
+                             senseid_to_sense_obj=__getattr__('senseid_to_sense_obj'),
+                             output_dir=output_dir,
+                             verbose=1)
+
+
+def get_translation_index():
+    """
+    Wiktionary translations of the ORBN lemmas,
+    cached as output/wiktionary_translations-<fingerprint>.json
+    """
+    from .translation_utils import get_translation_index
+    translation_index = get_translation_index(wiktionary_path, output_dir, verbose=1)
+    translation_index.index_senses(__getattr__('senseid_to_sense_obj'))
+    return translation_index
+
+
+def get_synset_graph():
+    """
+    sense <-> synset graph with integer ids, written by main.py as output/odwn_graph.npz
+    """
+    from .graph_utils import SynsetGraph
+    return SynsetGraph.load(os.path.join(output_dir, 'odwn_graph.npz'))
+
+
+def get_lemon():
+    from rdflib import Graph
     lemon = Graph()
     lemon.parse(lemon_ttl_path, format='turtle')
+    return lemon
+
+
+def get_lemon_fingerprint():
+    """
+    fingerprint of the Lemon representation of ORBN and of the senseid to URI mapping:
+    hash of ORBN, lemon.ttl, namespace, version, language and the POS mapping
+    """
+    return cache_utils.get_fingerprint(input_paths={'orbn': path,
+                                                    'lemon': lemon_ttl_path},
+                                       settings=dict(lemon_settings,
+                                                     serializer='write_rbn_in_lemon'))
+
+
+def get_orbn_lemon_path():
+    """
+    path of the Lemon representation of ORBN for the current inputs, e.g., output/orbn_1.0-<fingerprint>.ttl.
+    This does not convert anything, the file only exists once build_orbn_lemon has been called.
+    """
+    return cache_utils.get_artifact_path(output_dir,
+                                         stem=lemon_stem,
+                                         suffix='.ttl',
+                                         fingerprint=get_lemon_fingerprint())
+
+
+def build_orbn_lemon():
+    """
+    convert ORBN to Lemon if output/orbn_1.0-<fingerprint>.ttl does not exist for the current inputs
+
+    :rtype: str
+    :return: path of the Lemon representation of ORBN
+    """
+    def write_orbn_in_lemon(output_path):
+        loaded_attributes['senseid_to_uri'] = write_rbn_in_lemon(
+            senseid_to_senseobj=__getattr__('senseid_to_sense_obj'),
+            lemon=__getattr__('lemon'),
+            output_path=output_path,
+            rdf_format='turtle',
+            verbose=2,
+            **lemon_settings)
+
+    with lock:
+        return cache_utils.get_or_build(output_dir,
+                                        stem=lemon_stem,
+                                        suffix='.ttl',
+                                        fingerprint=get_lemon_fingerprint(),
+                                        write_function=write_orbn_in_lemon,
+                                        verbose=1)
+
+
+def get_path_senseid_to_uri():
+    """
+    path of the senseid to URI mapping, e.g., output/orbn_1.0_senseid_to_uri-<fingerprint>.json,
+    which is (re)built if it does not exist for the current inputs.
+    The URIs are minted with the same scheme as the Lemon conversion, so no conversion is needed.
+    """
+    def write_senseid_to_uri(output_path):
+        if 'senseid_to_uri' not in loaded_attributes:
+            loaded_attributes['senseid_to_uri'] = mint_senseid_to_lu_uri(
+                senseid_to_senseobj=__getattr__('senseid_to_sense_obj'),
+                namespace=lemon_settings['namespace'],
+                major_version=lemon_settings['major_version'],
+                minor_version=lemon_settings['minor_version'])
+        with open(output_path, 'w') as outfile:
+            json.dump(loaded_attributes['senseid_to_uri'], outfile)
+
+    return cache_utils.get_or_build(output_dir,
+                                    stem=f'{lemon_stem}_senseid_to_uri',
+                                    suffix='.json',
+                                    fingerprint=get_lemon_fingerprint(),
+                                    write_function=write_senseid_to_uri,
+                                    verbose=1)
+
+
+def get_senseid_to_uri():
+    path_senseid_to_uri = __getattr__('path_senseid_to_uri')
+    if 'senseid_to_uri' in loaded_attributes:
+        return loaded_attributes['senseid_to_uri']
 
-    orbn_in_lemon = convert_rbn_to_lemon(senseid_to_senseobj=senseid_to_sense_obj,
-                                        namespace='http://rdf.cltl.nl/rbn/',
-                                        lemon=lemon,
-                                        major_version=1,
-                                        minor_version=0,
-                                        rbn_pos_to_lexinfo=rbn_pos_to_lexinfo,
-                                        language='nld',
-                                        output_path=orbn_lemon_path,
-                                        verbose=2)
-
-    senseid_to_uri = get_senseid_to_lu_uri(orbn_in_lemon=orbn_in_lemon)
-
-    with open(path_senseid_to_uri, 'w') as outfile:
-        json.dump(senseid_to_uri, outfile)
-else:
     with open(path_senseid_to_uri) as infile:
         senseid_to_uri = json.load(infile)
+    return senseid_to_uri
+
+
+def get_orbn_in_lemon():
+    """
+    the cached Lemon representation of ORBN, only parsed once per version
+    of output/orbn_1.0-<fingerprint>.ttl (read-only, see triple_dump_utils.py)
+    """
+    return load_orbn_in_lemon(build_orbn_lemon(),
+                              cache_dir=output_dir,
+                              cache_stem=f'{lemon_stem}_triples',
+                              verbose=1)
+
+
+def verify_senseid_to_uri(verbose=1):
+    """
+    check the cached Lemon representation against senseid_to_uri
+
+    :rtype: bool
+    :return: True if they agree
+    """
+    result = verify_senseid_to_lu_uri(orbn_lemon_path=build_orbn_lemon(),
+                                      senseid_to_uri=__getattr__('senseid_to_uri'),
+                                      namespace=lemon_settings['namespace'],
+                                      major_version=lemon_settings['major_version'],
+                                      minor_version=lemon_settings['minor_version'],
+                                      verbose=verbose)
+    return not any(result.values())
+
+
+attribute_to_loader = {
+    'senseid_to_sense_obj': get_senseid_to_sense_obj,
+    'verb_to_phrasal_entries': get_verb_to_phrasal_entries,
+    'lemma_index': get_lemma_index,
+    'part_index': get_part_index,
+    'frame_mapping': get_frame_mapping,
+    'synset_graph': get_synset_graph,
+    'translation_index': get_translation_index,
+    'lemon': get_lemon,
+    'orbn_lemon_path': get_orbn_lemon_path,
+    'orbn_in_lemon': get_orbn_in_lemon,
+    'path_senseid_to_uri': get_path_senseid_to_uri,
+    'senseid_to_uri': get_senseid_to_uri,
+}
+
+
+def __getattr__(name):
+    """
+    compute the lazy module attributes on first access, e.g., ODWN_reader.senseid_to_uri
+    """
+    if name not in attribute_to_loader:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    with lock:
+        if name not in loaded_attributes:
+            with trace_utils.span(f'load {name}'):
+                loaded_attributes[name] = attribute_to_loader[name]()
+    return loaded_attributes[name]
 
 
+def __dir__():
+    return sorted(set(globals()) | set(attribute_to_loader))
 
 
+def preload(attributes=None):
+    """
+    compute the lazy module attributes up front, e.g., to warm up a server
 
+    :param iterable attributes: names of attributes, by default all of them
+    """
+    if attributes is None:
+        attributes = attribute_to_loader
+    for name in attributes:
+        __getattr__(name)
@@ -0,0 +1,46 @@
+"""
+Measure the memory footprint of the LE objects per sense
+
+Usage:
+  bytes_per_sense.py --orbn_path=<orbn_path> [--namespace=<namespace>] [--short_namespace=<short_namespace>]
+
+Options:
+    --orbn_path=<orbn_path>  e.g., resources/orbn_n-v-a.xml
+    --namespace=<namespace>  the RDF namespace [default: http://premon.fbk.eu/resource/]
+    --short_namespace=<short_namespace>  [default: pm]
+
+Example:
+    python benchmarks/bytes_per_sense.py --orbn_path="resources/orbn_n-v-a.xml"
+"""
+import os
+import sys
+import gc
+import pickle
+import tracemalloc
+from docopt import docopt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import ingest_utils
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+
+    cdb_lu_els = ingest_utils.iter_xml_elements(arguments['--orbn_path'], ['cdb_lu'])
+
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    sense_id2le_obj, not_added = ingest_utils.load_le_objs(cdb_lu_els,
+                                                           arguments['--namespace'],
+                                                           arguments['--short_namespace'],
+                                                           allowed_prefixes={'r', 'c', 'o', 't'},
+                                                           exclude_sub_number_ids=False)
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_senses = len(sense_id2le_obj)
+    print(f'senses: {num_senses}')
+    print(f'bytes per sense (in memory): {round((end - start) / num_senses)}')
+    print(f'bytes per sense (pickled): {round(len(pickle.dumps(sense_id2le_obj)) / num_senses)}')
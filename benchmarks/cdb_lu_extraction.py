@@ -0,0 +1,58 @@
+"""
+Report the time per cdb_lu element of building odwn_classes.LE objects from a parsed ORBN file
+(the xml parsing itself is not included)
+
+Usage:
+  cdb_lu_extraction.py --orbn_path=<orbn_path> [--repeat=<repeat>] [--results_path=<results_path>]
+
+Options:
+    --orbn_path=<orbn_path>  e.g., resources/orbn_n-v-a.xml
+    --repeat=<repeat>  number of runs, the fastest one is reported [default: 3]
+    --results_path=<results_path>  if provided, the results are written here as JSON
+
+Example:
+    python benchmarks/cdb_lu_extraction.py --orbn_path="resources/orbn_n-v-a.xml"
+"""
+import os
+import sys
+import gc
+import json
+import time
+from docopt import docopt
+from lxml import etree
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+from odwn_classes import LE
+
+
+def build_le_objs(cdb_lu_els):
+    return [LE(le_xml_obj,
+               namespace='http://premon.fbk.eu/resource/',
+               abbreviated_namespace='pm')
+            for le_xml_obj in cdb_lu_els]
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+
+    doc = etree.parse(arguments['--orbn_path'])
+    cdb_lu_els = doc.findall('cdb_lu')
+
+    timings = []
+    for _ in range(int(arguments['--repeat'])):
+        gc.collect()
+        start = time.perf_counter()
+        le_objs = build_le_objs(cdb_lu_els)
+        timings.append(time.perf_counter() - start)
+        del le_objs
+
+    results = {'cdb_lu_elements': len(cdb_lu_els),
+               'seconds': round(min(timings), 3),
+               'microseconds_per_element': round(1e6 * min(timings) / len(cdb_lu_els), 2)}
+    for key, value in results.items():
+        print(f'{key}: {value}')
+
+    if arguments['--results_path']:
+        with open(arguments['--results_path'], 'w') as outfile:
+            json.dump(results, outfile, indent=2)
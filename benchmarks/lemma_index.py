@@ -0,0 +1,60 @@
+"""
+Report build time and query latency of index_utils.LemmaIndex
+
+Usage:
+  lemma_index.py --orbn_path=<orbn_path> --index_path=<index_path> [--num_queries=<num_queries>]
+
+Options:
+    --orbn_path=<orbn_path>  e.g., output/orbn.lex
+    --index_path=<index_path>  where the index is saved, e.g., output/benchmark/lemma_index.json
+    --num_queries=<num_queries>  number of lemmas to look up [default: 5000]
+
+Example:
+    python benchmarks/lemma_index.py --orbn_path="output/orbn.lex" --index_path="output/benchmark/lemma_index.json"
+"""
+import os
+import sys
+import time
+import random
+from docopt import docopt
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+import utils
+from index_utils import LemmaIndex
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    num_queries = int(arguments['--num_queries'])
+
+    senseid_to_sense_obj = utils.load_orbn(arguments['--orbn_path'], package_dir)
+
+    lemma_index, elapsed = timed(lambda: LemmaIndex.build(senseid_to_sense_obj))
+    print(f'build: {round(elapsed, 3)} s for {len(senseid_to_sense_obj)} senses, {len(lemma_index)} (lemma, pos) keys')
+    _, elapsed = timed(lambda: lemma_index.save(arguments['--index_path']))
+    print(f'save: {round(elapsed, 3)} s')
+    lemma_index, elapsed = timed(lambda: LemmaIndex.load(arguments['--index_path']))
+    print(f'load: {round(elapsed, 3)} s')
+
+    random.seed(0)
+    lemmas = random.choices(lemma_index.lemmas, k=num_queries)
+
+    _, elapsed = timed(lambda: [lemma_index.get_sense_ids(lemma, 'N') for lemma in lemmas])
+    print(f'exact lookup: {round(1e6 * elapsed / num_queries, 2)} microseconds per query')
+    _, elapsed = timed(lambda: [lemma_index.get_sense_ids_with_prefix(lemma[:3]) for lemma in lemmas])
+    print(f'prefix lookup (3 characters): {round(1e6 * elapsed / num_queries, 2)} microseconds per query')
+    _, elapsed = timed(lambda: lemma_index.get_sense_ids_batch(lemmas))
+    print(f'batch lookup of {num_queries} lemmas: {round(1e3 * elapsed, 2)} ms')
+
+    # the baseline: scanning all (materialized) senses, as utils.load_polysemy_info does
+    le_objs = list(senseid_to_sense_obj.values())
+    _, elapsed = timed(lambda: [le_obj.sense_id for le_obj in le_objs
+                                if le_obj.lemma == lemmas[0]])
+    print(f'full scan for one lemma: {round(1e3 * elapsed, 2)} ms')
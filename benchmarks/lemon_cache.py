@@ -0,0 +1,86 @@
+"""
+Compare loading the Lemon representation of ORBN by parsing the turtle file (rdf_utils.load_orbn_in_lemon)
+with loading its cached triple dump (triple_dump_utils.py), and the latency of the identifier lookups on both graphs:
+    senseid_to_lu_uri       rdf_utils.get_senseid_to_lu_uri (all dct:identifier triples)
+    sense id -> LU          graph.value(predicate=dct:identifier, object=Literal(sense_id))
+    LU -> sense id          graph.value(subject=lu, predicate=dct:identifier)
+
+Usage:
+  lemon_cache.py --orbn_lemon_path=<orbn_lemon_path> --cache_dir=<cache_dir> [--num_queries=<num_queries>] [--results_path=<results_path>]
+
+Options:
+    --orbn_lemon_path=<orbn_lemon_path>  e.g., output/orbn_1.0-<fingerprint>.ttl
+    --cache_dir=<cache_dir>  where the triple dump is written, e.g., output/benchmark
+    --num_queries=<num_queries>  number of sense ids to look up [default: 2000]
+    --results_path=<results_path>  if provided, the results are written here as JSON
+
+Example:
+    python benchmarks/lemon_cache.py --orbn_lemon_path="output/orbn_1.0-0123456789abcdef.ttl" --cache_dir="output/benchmark"
+"""
+import os
+import sys
+import json
+import time
+import random
+from docopt import docopt
+from rdflib import Literal
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+import rdf_utils
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def time_queries(graph, sense_ids, lus):
+    """
+    :rtype: dict
+    :return: latency of the identifier lookups in milliseconds (senseid_to_lu_uri) and microseconds per query
+    """
+    _, elapsed = timed(lambda: rdf_utils.get_senseid_to_lu_uri(graph))
+    results = {'senseid_to_lu_uri_ms': round(1e3 * elapsed, 1)}
+    _, elapsed = timed(lambda: [graph.value(predicate=rdf_utils.DCT.identifier, object=Literal(sense_id))
+                                for sense_id in sense_ids])
+    results['sense_id_to_lu_us'] = round(1e6 * elapsed / len(sense_ids), 1)
+    _, elapsed = timed(lambda: [graph.value(subject=lu, predicate=rdf_utils.DCT.identifier)
+                                for lu in lus])
+    results['lu_to_sense_id_us'] = round(1e6 * elapsed / len(lus), 1)
+    return results
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    orbn_lemon_path = arguments['--orbn_lemon_path']
+    cache_dir = arguments['--cache_dir']
+    stem = 'lemon_cache_benchmark'
+
+    for name in os.listdir(cache_dir) if os.path.isdir(cache_dir) else []: # cold start
+        if name.startswith(f'{stem}-') and name.endswith('.npz'):
+            os.remove(os.path.join(cache_dir, name))
+
+    parsed_graph, parse_elapsed = timed(lambda: rdf_utils.load_orbn_in_lemon(orbn_lemon_path))
+    _, build_elapsed = timed(lambda: rdf_utils.load_orbn_in_lemon(orbn_lemon_path, cache_dir=cache_dir, cache_stem=stem))
+    cached_graph, load_elapsed = timed(lambda: rdf_utils.load_orbn_in_lemon(orbn_lemon_path, cache_dir=cache_dir, cache_stem=stem))
+
+    results = {'triples': len(parsed_graph),
+               'cold_parse_s': round(parse_elapsed, 3),
+               'parse_and_dump_s': round(build_elapsed, 3),
+               'warm_cache_s': round(load_elapsed, 3),
+               'speedup': round(parse_elapsed / load_elapsed, 1)}
+
+    senseid_to_lu = rdf_utils.get_senseid_to_lu_uri(parsed_graph)
+    random.seed(0)
+    sense_ids = random.sample(sorted(senseid_to_lu), min(int(arguments['--num_queries']), len(senseid_to_lu)))
+    lus = [parsed_graph.value(predicate=rdf_utils.DCT.identifier, object=Literal(sense_id))
+           for sense_id in sense_ids]
+    results['parsed_graph'] = time_queries(parsed_graph, sense_ids, lus)
+    results['cached_graph'] = time_queries(cached_graph, sense_ids, lus)
+
+    print(json.dumps(results, indent=2))
+    if arguments['--results_path']:
+        with open(arguments['--results_path'], 'w') as outfile:
+            json.dump(results, outfile, indent=2)
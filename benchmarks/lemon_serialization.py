@@ -0,0 +1,78 @@
+"""
+Compare the throughput of rdf_utils.convert_rbn_to_lemon (rdflib Graph + Turtle serialization)
+with the streaming rdf_utils.write_rbn_in_lemon
+
+Usage:
+  lemon_serialization.py --orbn_path=<orbn_path> --lemon_path=<lemon_path> --output_folder=<output_folder> [--memory]
+
+Options:
+    --orbn_path=<orbn_path>  e.g., output/orbn.lex
+    --lemon_path=<lemon_path>  e.g., resources/lemon/lemon.ttl
+    --output_folder=<output_folder>  where the serializations are written
+    --memory  also report the peak of memory allocated by Python (tracemalloc, slower)
+
+Example:
+    python benchmarks/lemon_serialization.py --orbn_path="output/orbn.lex" --lemon_path="resources/lemon/lemon.ttl" --output_folder="output/benchmark"
+"""
+import os
+import sys
+import time
+import tracemalloc
+from docopt import docopt
+from rdflib import Graph
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+import utils
+import rdf_utils
+
+rbn_pos_to_lexinfo = {
+    "adj": "http://www.lexinfo.net/ontology/3.0/lexinfo#adjective",
+    "noun": "http://www.lexinfo.net/ontology/3.0/lexinfo#noun",
+    "verb": "http://www.lexinfo.net/ontology/3.0/lexinfo#verb"
+}
+
+
+def run(label, function, num_senses, memory):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    line = f'{label}: {round(elapsed, 2)} s, {round(num_senses / elapsed)} senses/s'
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f', peak {round(peak / 2 ** 20, 1)} MB'
+    print(line)
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    output_folder = arguments['--output_folder']
+    os.makedirs(output_folder, exist_ok=True)
+
+    senseid_to_senseobj = dict(utils.load_orbn(arguments['--orbn_path'], package_dir).items())
+    lemon = Graph()
+    lemon.parse(arguments['--lemon_path'], format='turtle')
+    settings = dict(senseid_to_senseobj=senseid_to_senseobj,
+                    namespace='http://rdf.cltl.nl/rbn/',
+                    lemon=lemon,
+                    major_version=1,
+                    minor_version=0,
+                    rbn_pos_to_lexinfo=rbn_pos_to_lexinfo,
+                    language='nld')
+    num_senses = len(senseid_to_senseobj)
+    print(f'senses: {num_senses}')
+
+    run('rdflib Graph + turtle',
+        lambda: rdf_utils.convert_rbn_to_lemon(output_path=os.path.join(output_folder, 'graph.ttl'), **settings),
+        num_senses,
+        arguments['--memory'])
+    for rdf_format in ['turtle', 'nt']:
+        run(f'streaming {rdf_format}',
+            lambda: rdf_utils.write_rbn_in_lemon(output_path=os.path.join(output_folder, f'streaming.{rdf_format}'),
+                                                 rdf_format=rdf_format,
+                                                 **settings),
+            num_senses,
+            arguments['--memory'])
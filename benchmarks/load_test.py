@@ -0,0 +1,130 @@
+"""
+Load test of the lookup service of serve.py: sends GET requests over keep-alive connections
+and reports the latency percentiles (p50, p99) and the throughput (requests/s)
+
+The requests are drawn from the senses in orbn_path: /sense, /senses (lemma and pos), /uri and /synset.
+The number of distinct requests determines how often the LRU cache of the service is hit.
+
+Usage:
+  load_test.py --orbn_path=<orbn_path> [--url=<url>] [--requests=<requests>] [--concurrency=<concurrency>] [--distinct=<distinct>] [--seed=<seed>] [--results_path=<results_path>]
+
+Options:
+    --orbn_path=<orbn_path>  orbn.lex (or orbn.p) that the service serves
+    --url=<url>  address of the service [default: http://127.0.0.1:8080]
+    --requests=<requests>  total number of requests [default: 10000]
+    --concurrency=<concurrency>  number of concurrent connections [default: 10]
+    --distinct=<distinct>  number of distinct requests [default: 1000]
+    --seed=<seed>  seed of the random generator [default: 0]
+    --results_path=<results_path>  if provided, the results are written here as JSON
+
+Example:
+    python benchmarks/load_test.py --orbn_path="output/orbn.lex" --requests=10000 --concurrency=10
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+from urllib.parse import urlsplit, quote
+from docopt import docopt
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+import utils
+
+
+def get_targets(senseid_to_sense_obj, distinct, seed=0):
+    """
+    :rtype: list
+    :return: list of request targets, e.g., '/sense?id=r_n-1'
+    """
+    rng = random.Random(seed)
+    rows = list(utils.iter_sense_attributes(senseid_to_sense_obj,
+                                            ['sense_id', 'lemma', 'rbn_pos', 'synset_id']))
+    targets = []
+    for sense_id, lemma, rbn_pos, synset_id in rng.sample(rows, min(distinct, len(rows))):
+        endpoint = rng.choice(['sense', 'senses', 'uri', 'synset'])
+        if endpoint == 'senses':
+            targets.append(f'/senses?lemma={quote(lemma)}&pos={rbn_pos}')
+        elif endpoint == 'uri':
+            targets.append(f'/uri?sense_id={quote(sense_id)}')
+        elif endpoint == 'synset' and synset_id is not None:
+            targets.append(f'/synset?id={quote(synset_id)}')
+        else:
+            targets.append(f'/sense?id={quote(sense_id)}')
+    return targets
+
+
+async def run_connection(host, port, targets, latencies):
+    """
+    send the requests one after the other over one keep-alive connection
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    for target in targets:
+        start = time.perf_counter()
+        writer.write(f'GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        assert status_line.startswith(b'HTTP/1.1 200'), status_line
+        content_length = 0
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                content_length = int(value)
+        await reader.readexactly(content_length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load_test(url, targets, num_requests, concurrency, seed=0):
+    """
+    :rtype: dict
+    :return: latency percentiles in milliseconds and requests per second
+    """
+    address = urlsplit(url)
+    rng = random.Random(seed)
+    requests = [rng.choice(targets) for _ in range(num_requests)]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[run_connection(address.hostname, address.port, requests[index::concurrency], latencies)
+                           for index in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def percentile(fraction):
+        return round(1000 * latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+    return {'requests': len(latencies),
+            'concurrency': concurrency,
+            'distinct_requests': len(set(targets)),
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(1000 * latencies[-1], 3)}
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    senseid_to_sense_obj = utils.load_orbn(arguments['--orbn_path'], package_dir)
+    targets = get_targets(senseid_to_sense_obj,
+                          distinct=int(arguments['--distinct']),
+                          seed=int(arguments['--seed']))
+    results = asyncio.run(run_load_test(arguments['--url'],
+                                        targets,
+                                        num_requests=int(arguments['--requests']),
+                                        concurrency=int(arguments['--concurrency']),
+                                        seed=int(arguments['--seed'])))
+    for key, value in results.items():
+        print(f'{key}: {value}')
+
+    if arguments['--results_path']:
+        with open(arguments['--results_path'], 'w') as outfile:
+            json.dump(results, outfile, indent=2)
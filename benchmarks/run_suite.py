@@ -0,0 +1,226 @@
+"""
+Run the benchmark suite on synthetic data at several scales and write the results as JSON
+
+For each scale, synthetic_data.py writes scale * base_senses cdb_lu elements (and the LMF file),
+main.py ingests them in a subprocess (wall time and peak RSS), after which the functions
+below are timed on the output:
+    load_orbn                       utils.load_orbn (orbn.lex) and materializing all LE objects
+    get_verb_to_phrasal_entries     lexicon_utils.get_verb_to_phrasal_entries
+    load_polysemy_info              utils.load_polysemy_info
+    compute_stats_about             utils.compute_stats_about on (rbn_pos, lu_type) and on lemma
+    convert_rbn_to_lemon            rdf_utils.convert_rbn_to_lemon (rdflib Graph)
+    get_senseid_to_lu_uri           rdf_utils.get_senseid_to_lu_uri on the Graph of convert_rbn_to_lemon
+
+Usage:
+  run_suite.py --output_folder=<output_folder> --results_path=<results_path> [--scales=<scales>] [--base_senses=<base_senses>] [--real_orbn_path=<real_orbn_path>] [--benchmarks=<benchmarks>] [--main_args=<main_args>]
+
+Options:
+    --output_folder=<output_folder>  synthetic data and main.py output are written to <output_folder>/x<scale>
+    --results_path=<results_path>  JSON file with the results
+    --scales=<scales>  multiples of base_senses separated by + [default: 1+10+100]
+    --base_senses=<base_senses>  number of cdb_lu elements at scale 1 [default: 50000]
+    --real_orbn_path=<real_orbn_path>  if provided, base_senses is the number of cdb_lu elements in this file, e.g., resources/orbn_n-v-a.xml
+    --benchmarks=<benchmarks>  benchmarks separated by +, by default main.py and all functions above
+    --main_args=<main_args>  extra arguments of main.py [default: --streaming]
+
+Example:
+    python benchmarks/run_suite.py --output_folder="output/benchmark" --results_path="output/benchmark/results.json" --scales="1+10"
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shlex
+import platform
+import subprocess
+from datetime import datetime
+from docopt import docopt
+from rdflib import Graph
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+import utils
+import rdf_utils
+import ingest_utils
+import lexicon_utils
+from synthetic_data import write_synthetic_data
+
+NAMESPACE = 'http://rdf.cltl.nl/rbn/'
+rbn_pos_to_lexinfo = {
+    "adj": "http://www.lexinfo.net/ontology/3.0/lexinfo#adjective",
+    "noun": "http://www.lexinfo.net/ontology/3.0/lexinfo#noun",
+    "verb": "http://www.lexinfo.net/ontology/3.0/lexinfo#verb"
+}
+BENCHMARKS = ['main',
+              'load_orbn',
+              'get_verb_to_phrasal_entries',
+              'load_polysemy_info',
+              'compute_stats_about',
+              'convert_rbn_to_lemon',
+              'get_senseid_to_lu_uri']
+
+
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'],
+                              cwd=package_dir,
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(function):
+    gc.collect()
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run_main(paths, output_folder, main_args):
+    """
+    run main.py in a subprocess
+
+    :rtype: tuple
+    :return: (seconds, peak RSS of the subprocess in MB, None if os.wait4 is not available, e.g., on Windows)
+    """
+    command = [sys.executable, os.path.join(package_dir, 'main.py'),
+               f'--orbn_path={paths["orbn"]}',
+               f'--odwn_path={paths["odwn"]}',
+               f'--output_folder={output_folder}',
+               '--allowed_prefixes=r+c',
+               '--exclude_sub_NUMBER=True',
+               '--namespace=http://premon.fbk.eu/resource/',
+               '--short_namespace=pm'] + shlex.split(main_args)
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=package_dir, stdout=subprocess.DEVNULL)
+    if hasattr(os, 'wait4'):
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        peak_rss_mb = utils.get_peak_rss_mb(rusage)
+    else:
+        process.wait()
+        peak_rss_mb = None
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return elapsed, peak_rss_mb
+
+
+def run_scale(scale, num_senses, output_folder, benchmarks, main_args):
+    """
+    :rtype: list
+    :return: list of dicts, one per benchmark
+    """
+    scale_folder = os.path.join(output_folder, f'x{scale}')
+    paths, elapsed = timed(lambda: write_synthetic_data(scale_folder, num_senses))
+    print(f'x{scale}: generated {num_senses} senses in {round(elapsed, 2)} s')
+
+    results = []
+
+    def add_result(benchmark, seconds, **info):
+        result = {'benchmark': benchmark,
+                  'scale': scale,
+                  'num_cdb_lu': num_senses,
+                  'seconds': round(seconds, 4)}
+        result.update(info)
+        results.append(result)
+        print(f'x{scale} {benchmark}: {round(seconds, 3)} s {info if info else ""}')
+
+    if 'main' in benchmarks or not os.path.exists(os.path.join(scale_folder, 'orbn.lex')):
+        elapsed, peak_rss_mb = run_main(paths, scale_folder, main_args)
+        if 'main' in benchmarks:
+            add_result('main', elapsed, peak_rss_mb=peak_rss_mb, main_args=main_args)
+
+    orbn_path = os.path.join(scale_folder, 'orbn.lex')
+    senseid_to_sense_obj, load_elapsed = timed(lambda: utils.load_orbn(orbn_path, package_dir))
+    senseid_to_sense_obj, materialize_elapsed = timed(lambda: dict(senseid_to_sense_obj.items()))
+    num_loaded = len(senseid_to_sense_obj)
+    if 'load_orbn' in benchmarks:
+        add_result('load_orbn', load_elapsed + materialize_elapsed,
+                   num_senses=num_loaded,
+                   seconds_load=round(load_elapsed, 4),
+                   seconds_materialize=round(materialize_elapsed, 4))
+
+    if 'get_verb_to_phrasal_entries' in benchmarks:
+        verb_to_phrasal_entries, elapsed = timed(
+            lambda: lexicon_utils.get_verb_to_phrasal_entries(senseid_to_sense_obj))
+        add_result('get_verb_to_phrasal_entries', elapsed,
+                   num_senses=num_loaded,
+                   num_verbs=len(verb_to_phrasal_entries))
+
+    if 'load_polysemy_info' in benchmarks:
+        (df, distr_df, lemma_pos2le_ids), elapsed = timed(lambda: utils.load_polysemy_info(senseid_to_sense_obj))
+        add_result('load_polysemy_info', elapsed,
+                   num_senses=num_loaded,
+                   num_lemma_pos=len(lemma_pos2le_ids))
+
+    if 'compute_stats_about' in benchmarks:
+        for attributes in [['rbn_pos', 'lu_type'], ['lemma']]:
+            stats, elapsed = timed(lambda: utils.compute_stats_about(senseid_to_sense_obj, attributes))
+            add_result('compute_stats_about', elapsed,
+                       attributes=attributes,
+                       num_senses=num_loaded,
+                       num_unique=stats['# of unique observations'])
+
+    if any(benchmark in benchmarks for benchmark in ['convert_rbn_to_lemon', 'get_senseid_to_lu_uri']):
+        lemon = Graph()
+        lemon.parse(paths['lemon'], format='turtle')
+        orbn_in_lemon, elapsed = timed(lambda: rdf_utils.convert_rbn_to_lemon(senseid_to_sense_obj,
+                                                                              namespace=NAMESPACE,
+                                                                              lemon=lemon,
+                                                                              major_version=1,
+                                                                              minor_version=0,
+                                                                              rbn_pos_to_lexinfo=rbn_pos_to_lexinfo))
+        if 'convert_rbn_to_lemon' in benchmarks:
+            add_result('convert_rbn_to_lemon', elapsed,
+                       num_senses=num_loaded,
+                       num_triples=len(orbn_in_lemon))
+
+        if 'get_senseid_to_lu_uri' in benchmarks:
+            senseid_to_lu_uri, elapsed = timed(lambda: rdf_utils.get_senseid_to_lu_uri(orbn_in_lemon))
+            add_result('get_senseid_to_lu_uri', elapsed,
+                       num_senses=num_loaded,
+                       num_uris=len(senseid_to_lu_uri))
+        del orbn_in_lemon
+
+    return results
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    scales = [int(scale) for scale in arguments['--scales'].split('+')]
+    benchmarks = BENCHMARKS
+    if arguments['--benchmarks']:
+        benchmarks = arguments['--benchmarks'].split('+')
+        for benchmark in benchmarks:
+            assert benchmark in BENCHMARKS, f'unknown benchmark {benchmark}, options are {BENCHMARKS}'
+
+    base_senses = int(arguments['--base_senses'])
+    if arguments['--real_orbn_path']:
+        base_senses = sum(1 for _ in ingest_utils.iter_xml_elements(arguments['--real_orbn_path'], ['cdb_lu']))
+        print(f'{arguments["--real_orbn_path"]} contains {base_senses} cdb_lu elements')
+
+    results = {
+        'commit': get_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'base_senses': base_senses,
+        'results': []
+    }
+    for scale in scales:
+        results['results'].extend(run_scale(scale,
+                                            num_senses=scale * base_senses,
+                                            output_folder=arguments['--output_folder'],
+                                            benchmarks=benchmarks,
+                                            main_args=arguments['--main_args']))
+
+    results_folder = os.path.dirname(arguments['--results_path'])
+    if results_folder:
+        os.makedirs(results_folder, exist_ok=True)
+    with open(arguments['--results_path'], 'w') as outfile:
+        json.dump(results, outfile, indent=2)
+    print(f'written results to {arguments["--results_path"]}')
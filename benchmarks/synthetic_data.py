@@ -0,0 +1,238 @@
+"""
+Write a synthetic ORBN file (cdb_lu elements), ODWN LMF file and Lemon ontology
+with the elements and attributes that odwn_classes and ingest_utils read,
+so that the benchmarks run without the resources of install.sh
+
+Usage:
+  synthetic_data.py --output_folder=<output_folder> [--num_senses=<num_senses>] [--seed=<seed>]
+
+Options:
+    --output_folder=<output_folder>  orbn.xml, odwn.xml and lemon.ttl are written here
+    --num_senses=<num_senses>  number of cdb_lu elements [default: 50000]
+    --seed=<seed>  seed of the random generator [default: 0]
+
+Example:
+    python benchmarks/synthetic_data.py --output_folder="output/benchmark/x1" --num_senses=50000
+"""
+import os
+import sys
+import random
+from xml.sax.saxutils import quoteattr, escape
+from docopt import docopt
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, package_dir)
+import rdf_utils
+
+LETTERS = 'abcdefghijklmnoprstuvwz'
+PARTICLES = ['aan', 'af', 'door', 'in', 'mee', 'op', 'over', 'uit']
+LINKING_ELEMENTS = ['', '', 's', 'e', 'en']
+PREFIXES = 'rrrrccot'
+RBN_POS = ['noun', 'noun', 'noun', 'verb', 'adj']
+MORPHO_TYPES = {
+    'noun': ['simpmorph', 'compound', 'compound', 'derivation', 'compderiv', 'xcompound', None],
+    'verb': ['simpmorph', 'phrasal', 'phrasal', 'derivation', 'compound', None],
+    'adj': ['simpmorph', 'derivation', 'compound', None]
+}
+CASEFRAMES = ['action1', 'action2', 'cognt1', 'cognt2', 'echprod2', 'state1', 'process1']
+SEM_TYPES = {
+    'noun': ['concrother', 'human', 'dynamic', 'institution'],
+    'verb': ['action', 'process', 'state'],
+    'adj': ['quality', 'relation']
+}
+PROVENANCE_LABELS = ['cdb2.2_Auto', 'cdb2.2_Manual', 'cdb2.2_Manual+wn', 'pwn', 'odwn']
+
+
+def get_word(rng, min_length=3, max_length=8):
+    return ''.join(rng.choice(LETTERS)
+                   for _ in range(rng.randint(min_length, max_length)))
+
+
+def iter_synthetic_senses(num_senses, seed=0):
+    """
+    generate the information of num_senses senses, grouped by (lemma, pos) with
+    consecutive sense ranks (about 2% of the ranks are duplicates, which main.py removes).
+    The same seed always generates the same senses, so the ORBN and LMF files
+    can be written one after the other without keeping the senses in memory.
+
+    :rtype: generator
+    :return: generator of dicts
+    """
+    rng = random.Random(seed)
+    index = 0
+    while index < num_senses:
+        rbn_pos = rng.choice(RBN_POS)
+        morpho_type = rng.choice(MORPHO_TYPES[rbn_pos])
+        head = get_word(rng)
+        if rbn_pos == 'verb':
+            head += 'en'
+
+        if morpho_type == 'phrasal':
+            particle = rng.choice(PARTICLES)
+            lemma = particle + head
+            morpho_structure = f'[{particle}][{head}]'
+        elif morpho_type in {'compound', 'compderiv', 'xcompound'}:
+            modifier = get_word(rng, 3, 6)
+            linking_element = rng.choice(LINKING_ELEMENTS)
+            lemma = modifier + linking_element + head
+            morpho_structure = f'[{modifier}]{linking_element}[{head}]'
+        else:
+            lemma = head
+            morpho_structure = f'[{head}]'
+
+        for sense_rank in range(1, rng.choice([1, 1, 1, 2, 2, 3, 4]) + 1):
+            index += 1
+            if index > num_senses:
+                break
+            sense_id = f'{rng.choice(PREFIXES)}_{rbn_pos[0]}-{index}'
+            if rng.random() < 0.02:
+                sense_id += '_sub_1'
+            yield {
+                'sense_id': sense_id,
+                'c_seq_nr': sense_rank if rng.random() > 0.02 else 1,
+                'lemma': lemma,
+                'rbn_pos': rbn_pos,
+                'morpho_type': morpho_type,
+                'morpho_structure': morpho_structure,
+                'article': rng.choice(['de', 'het']),
+                'definition': ' '.join(get_word(rng) for _ in range(rng.randint(2, 8))),
+                'sem_type': rng.choice(SEM_TYPES[rbn_pos]),
+                'caseframe': rng.choice(CASEFRAMES),
+                'examples': [f'{get_word(rng, 2, 5)} {lemma}'
+                             for _ in range(rng.choice([0, 1, 1, 2, 3]))]
+            }
+
+
+def get_cdb_lu(sense, example_start):
+    """
+    :rtype: str
+    :return: serialized cdb_lu element
+    """
+    rbn_pos = sense['rbn_pos']
+    form_cat = 'adjective' if rbn_pos == 'adj' else rbn_pos
+    parts = [f'<cdb_lu c_lu_id={quoteattr(sense["sense_id"])} c_seq_nr="{sense["c_seq_nr"]}">',
+             f'<form form-cat="{form_cat}" form-spelling={quoteattr(sense["lemma"])}/>']
+    if sense['morpho_type'] is not None:
+        parts.append(f'<morphology_{rbn_pos}>'
+                     f'<morpho-type>{sense["morpho_type"]}</morpho-type>'
+                     f'<morpho-structure>{escape(sense["morpho_structure"])}</morpho-structure>'
+                     f'</morphology_{rbn_pos}>')
+
+    definition = escape(sense['definition'])
+    if rbn_pos == 'noun':
+        parts.append(f'<syntax_noun><sy-article>{sense["article"]}</sy-article></syntax_noun>'
+                     f'<sem-definition><sem-def-noun><sem-specificae>{definition}</sem-specificae></sem-def-noun></sem-definition>'
+                     f'<semantics_noun><sem-type>{sense["sem_type"]}</sem-type></semantics_noun>')
+    elif rbn_pos == 'verb':
+        parts.append(f'<sem-definition><sem-def>{definition}</sem-def></sem-definition>'
+                     f'<semantics_verb><sem-type>{sense["sem_type"]}</sem-type>'
+                     f'<sem-caseframe><caseframe>{sense["caseframe"]}</caseframe></sem-caseframe></semantics_verb>')
+    else:
+        parts.append(f'<semantics_adj><sem-resume>{definition}</sem-resume>'
+                     f'<sem-type>{sense["sem_type"]}</sem-type></semantics_adj>')
+
+    parts.append('<examples>')
+    for example_id, example in enumerate(sense['examples'], example_start):
+        parts.append(f'<example r_ex_id="{example_id}"><form_example>'
+                     f'<canonicalform>{escape(example)}</canonicalform></form_example></example>')
+    parts.append('</examples></cdb_lu>\n')
+    return ''.join(parts)
+
+
+def write_orbn(path, num_senses, seed=0):
+    """
+    write a synthetic version of orbn_n-v-a.xml
+    """
+    example_start = 1
+    with open(path, 'w', encoding='utf-8') as outfile:
+        outfile.write('<?xml version="1.0" encoding="UTF-8"?>\n<cdb_rbn>\n')
+        for sense in iter_synthetic_senses(num_senses, seed):
+            outfile.write(get_cdb_lu(sense, example_start))
+            example_start += len(sense['examples'])
+        outfile.write('</cdb_rbn>\n')
+
+
+def get_num_synsets(num_senses):
+    return max(1, num_senses // 2)
+
+
+def write_lmf(path, num_senses, seed=0):
+    """
+    write a synthetic version of odwn_orbn_gwg-LMF_1.3.xml:
+    one LexicalEntry per ORBN sense followed by the Synset elements.
+    Some senses have no synset, the unknown_000 synset or a synset without Synset element.
+    """
+    rng = random.Random(seed + 1)
+    num_synsets = get_num_synsets(num_senses)
+    with open(path, 'w', encoding='utf-8') as outfile:
+        outfile.write('<?xml version="1.0" encoding="UTF-8"?>\n<LexicalResource>\n'
+                      '<GlobalInformation label="synthetic ODWN"/>\n'
+                      '<Lexicon languageCoding="ISO 639-3" label="ODWN" language="nld" owner="synthetic" version="1.3">\n')
+        for index, sense in enumerate(iter_synthetic_senses(num_senses, seed)):
+            draw = rng.random()
+            if draw < 0.05:
+                synset = None
+            elif draw < 0.07:
+                synset = 'unknown_000'
+            elif draw < 0.08:
+                synset = f'odwn-10-missing-{index}-n'
+            else:
+                synset = f'odwn-10-{rng.randrange(num_synsets)}-{sense["rbn_pos"][0]}'
+
+            outfile.write(f'<LexicalEntry id="le-{index}">'
+                          f'<Lemma writtenForm={quoteattr(sense["lemma"])} partOfSpeech="{sense["rbn_pos"]}"/>')
+            if synset is None:
+                outfile.write(f'<Sense id={quoteattr(sense["sense_id"])}/>')
+            else:
+                outfile.write(f'<Sense id={quoteattr(sense["sense_id"])} synset="{synset}" '
+                              f'provenance="{rng.choice(PROVENANCE_LABELS)}"/>')
+            outfile.write('</LexicalEntry>\n')
+
+        for synset_index in range(num_synsets):
+            for pos in 'nva':
+                outfile.write(f'<Synset id="odwn-10-{synset_index}-{pos}" ili="i{rng.randrange(117659)}">')
+                if rng.random() < 0.8:
+                    outfile.write(f'<Definitions><Definition gloss="{get_word(rng)} {get_word(rng)}" language="en"/></Definitions>')
+                outfile.write(f'<SynsetRelations><SynsetRelation target="odwn-10-{rng.randrange(num_synsets)}-{pos}" '
+                              f'relType="has_hyperonym"/></SynsetRelations></Synset>\n')
+        outfile.write('</Lexicon>\n<SenseAxes/>\n</LexicalResource>\n')
+
+
+def write_lemon(path):
+    """
+    write a Lemon ontology that defines the vocabulary used by rdf_utils
+    """
+    with open(path, 'w', encoding='utf-8') as outfile:
+        outfile.write('@prefix owl: <http://www.w3.org/2002/07/owl#> .\n')
+        for term in rdf_utils.LEMON_VOCABULARY:
+            local_name = term.split('#')[-1]
+            owl_type = 'owl:Class' if local_name[0].isupper() else 'owl:ObjectProperty'
+            outfile.write(f'<{term}> a {owl_type} .\n')
+
+
+def write_synthetic_data(output_folder, num_senses, seed=0):
+    """
+    write orbn.xml, odwn.xml and lemon.ttl to output_folder
+
+    :rtype: dict
+    :return: label -> path
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    paths = {
+        'orbn': os.path.join(output_folder, 'orbn.xml'),
+        'odwn': os.path.join(output_folder, 'odwn.xml'),
+        'lemon': os.path.join(output_folder, 'lemon.ttl')
+    }
+    write_orbn(paths['orbn'], num_senses, seed)
+    write_lmf(paths['odwn'], num_senses, seed)
+    write_lemon(paths['lemon'])
+    return paths
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    paths = write_synthetic_data(arguments['--output_folder'],
+                                 num_senses=int(arguments['--num_senses']),
+                                 seed=int(arguments['--seed']))
+    for label, path in paths.items():
+        print(f'written {label}: {path} ({round(os.path.getsize(path) / 2 ** 20, 1)} MB)')
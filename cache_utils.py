@@ -0,0 +1,114 @@
+"""
+Cache for derived artifacts, e.g., the Lemon representation of ORBN.
+
+An artifact is stored as <stem>-<fingerprint><suffix> in its folder,
+where the fingerprint is a hash of all its inputs (file contents and settings).
+An artifact is therefore only rebuilt when one of its inputs has changed.
+Artifacts are written to a temporary file and moved into place with os.replace,
+so concurrent processes never read a partially written file.
+"""
+import os
+import json
+import hashlib
+import tempfile
+
+path_stat_to_hash = dict()
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """
+    :rtype: str
+    :return: sha256 of the file contents or None if the file does not exist
+    """
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in path_stat_to_hash:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as infile:
+            for chunk in iter(lambda: infile.read(chunk_size), b''):
+                sha256.update(chunk)
+        path_stat_to_hash[key] = sha256.hexdigest()
+
+    return path_stat_to_hash[key]
+
+
+def get_fingerprint(input_paths, settings):
+    """
+    compute the fingerprint of an artifact
+
+    :param dict input_paths: label -> path of an input file
+    :param dict settings: label -> json-serializable value
+
+    :rtype: str
+    :return: first 16 characters of sha256 of all inputs
+    """
+    inputs = {
+        'files': {label: hash_file(path)
+                  for label, path in input_paths.items()},
+        'settings': settings
+    }
+    serialized = json.dumps(inputs, sort_keys=True)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+
+
+def get_artifact_path(folder, stem, suffix, fingerprint):
+    """
+    e.g., output/orbn_1.0-0123456789abcdef.ttl
+    """
+    return os.path.join(folder, f'{stem}-{fingerprint}{suffix}')
+
+
+def write_atomically(artifact_path, write_function):
+    """
+    call write_function with a temporary path in the same folder and
+    move the result to artifact_path once it is complete
+
+    :param str artifact_path: final path of the artifact
+    :param callable write_function: function that writes to the path it is called with
+    """
+    folder, name = os.path.split(artifact_path)
+    fd, temp_path = tempfile.mkstemp(dir=folder or '.', prefix=f'.{name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write_function(temp_path)
+        os.replace(temp_path, artifact_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def evict_superseded(folder, stem, suffix, artifact_path, verbose=0):
+    """
+    remove artifacts with the same stem and suffix but a different fingerprint
+    """
+    keep = os.path.basename(artifact_path)
+    for name in os.listdir(folder):
+        if all([name.startswith(f'{stem}-'),
+                name.endswith(suffix),
+                name != keep]):
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError: # evicted by a concurrent process
+                continue
+            if verbose >= 1:
+                print(f'evicted superseded artifact {name}')
+
+
+def get_or_build(folder, stem, suffix, fingerprint, write_function, verbose=0):
+    """
+    return the path of the artifact with this fingerprint,
+    building it (and evicting superseded versions) if it does not exist yet
+
+    :rtype: str
+    :return: path of the artifact
+    """
+    artifact_path = get_artifact_path(folder, stem, suffix, fingerprint)
+    if not os.path.exists(artifact_path):
+        write_atomically(artifact_path, write_function)
+        evict_superseded(folder, stem, suffix, artifact_path, verbose=verbose)
+        if verbose >= 1:
+            print(f'built {artifact_path}')
+    return artifact_path
@@ -0,0 +1,286 @@
+"""
+SQLite representation of ORBN and ODWN (output/odwn.sqlite, see main.py --export_sqlite).
+
+Tables:
+    senses              one row per sense, one column per attribute of odwn_classes.LE
+                        (see lexicon_format.SENSE_COLUMNS), except the attributes below
+    canonical_forms     (sense_id, position, form_id, form): LE.canonical_forms
+    provenance          (sense_id, provenance): LE.provenance_set
+    synsets             one row per synset: synset_id, ili, definition
+    synset_senses       (synset_id, position, sense_id): Synset.synonyms in order
+
+LE.parts is stored as a JSON list. Attributes that were never set on an LE object are listed
+in senses.unset and attributes that are None but are not a column in senses.none_attributes,
+so that LexiconDatabase returns LE objects with the same state as orbn.lex.
+Lookups by lemma, rbn_pos, fn_pos, rbn_feature_set, synset_id, ILI and provenance are indexed.
+"""
+import json
+import sqlite3
+
+try:
+    from .odwn_classes import LE, Synset
+    from .lexicon_format import SENSE_COLUMNS
+    from .cache_utils import write_atomically
+except ImportError:
+    from odwn_classes import LE, Synset
+    from lexicon_format import SENSE_COLUMNS
+    from cache_utils import write_atomically
+
+SCHEMA_VERSION = 1
+SCALAR_COLUMNS = [(name, column_type)
+                  for name, column_type in SENSE_COLUMNS
+                  if column_type in {'str', 'int', 'bool'}]
+SQL_TYPES = {'str': 'TEXT', 'int': 'INTEGER', 'bool': 'INTEGER'}
+COLUMN_NAMES = [name for name, column_type in SCALAR_COLUMNS] + ['parts', 'unset', 'none_attributes']
+BATCH_SIZE = 500 # number of sense ids per query with IN (...)
+
+SCHEMA = [
+    'CREATE TABLE info (name TEXT PRIMARY KEY, value TEXT)',
+    'CREATE TABLE senses (sense_index INTEGER PRIMARY KEY, '
+    + ', '.join(f'"{name}" {SQL_TYPES[column_type]}' for name, column_type in SCALAR_COLUMNS)
+    + ', parts TEXT, unset TEXT, none_attributes TEXT)',
+    'CREATE TABLE canonical_forms (sense_id TEXT, position INTEGER, form_id TEXT, form TEXT)',
+    'CREATE TABLE provenance (sense_id TEXT, provenance TEXT)',
+    'CREATE TABLE synsets (synset_index INTEGER PRIMARY KEY, synset_id TEXT, ili TEXT, definition TEXT)',
+    'CREATE TABLE synset_senses (synset_id TEXT, position INTEGER, sense_id TEXT)',
+]
+INDICES = [
+    'CREATE UNIQUE INDEX senses_sense_id ON senses (sense_id)',
+    'CREATE INDEX senses_lemma_pos ON senses (lemma, rbn_pos)',
+    'CREATE INDEX senses_lemma_fn_pos ON senses (lemma, fn_pos)',
+    'CREATE INDEX senses_rbn_feature_set ON senses (rbn_feature_set)',
+    'CREATE INDEX senses_synset_id ON senses (synset_id)',
+    'CREATE INDEX canonical_forms_sense_id ON canonical_forms (sense_id)',
+    'CREATE INDEX canonical_forms_form ON canonical_forms (form)',
+    'CREATE INDEX provenance_sense_id ON provenance (sense_id)',
+    'CREATE INDEX provenance_provenance ON provenance (provenance)',
+    'CREATE UNIQUE INDEX synsets_synset_id ON synsets (synset_id)',
+    'CREATE INDEX synsets_ili ON synsets (ili)',
+    'CREATE INDEX synset_senses_synset_id ON synset_senses (synset_id)',
+]
+
+
+def iter_sense_rows(senseid_to_sense_obj):
+    """
+    :rtype: generator
+    :return: generator of (senses row, canonical_forms rows, provenance rows)
+    """
+    for le_obj in senseid_to_sense_obj.values():
+        state = le_obj.__getstate__()
+        unset = [name for name, column_type in SENSE_COLUMNS if name not in state]
+        none_attributes = [name for name in ['provenance_set', 'canonical_forms']
+                           if name in state and state[name] is None]
+
+        row = [state.get(name) for name, column_type in SCALAR_COLUMNS]
+        row.extend([json.dumps(list(state['parts'])) if 'parts' in state else None,
+                    json.dumps(unset),
+                    json.dumps(none_attributes)])
+
+        sense_id = state['sense_id']
+        canonical_forms = [(sense_id, position, form_id, form)
+                           for position, (form_id, form) in enumerate((state.get('canonical_forms') or {}).items())]
+        provenance = [(sense_id, label)
+                      for label in sorted(state.get('provenance_set') or ())]
+        yield row, canonical_forms, provenance
+
+
+def write_database(path, senseid_to_sense_obj, synset_id_to_synset_obj):
+    """
+    write ORBN and ODWN to a SQLite database (see the module docstring)
+
+    :param str path: e.g., output/odwn.sqlite
+    :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE
+    :param dict synset_id_to_synset_obj: synset_id -> odwn_classes.Synset
+    """
+    def write(temp_path):
+        connection = sqlite3.connect(temp_path)
+        with connection:
+            connection.execute('DROP TABLE IF EXISTS info') # mkstemp created an empty file
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.execute('INSERT INTO info VALUES (?, ?)', ('schema_version', str(SCHEMA_VERSION)))
+
+            placeholders = ', '.join('?' * len(COLUMN_NAMES))
+            column_names = ', '.join(f'"{name}"' for name in COLUMN_NAMES)
+            for row, canonical_forms, provenance in iter_sense_rows(senseid_to_sense_obj):
+                connection.execute(f'INSERT INTO senses ({column_names}) VALUES ({placeholders})', row)
+                connection.executemany('INSERT INTO canonical_forms VALUES (?, ?, ?, ?)', canonical_forms)
+                connection.executemany('INSERT INTO provenance VALUES (?, ?)', provenance)
+
+            for synset_obj in synset_id_to_synset_obj.values():
+                connection.execute('INSERT INTO synsets (synset_id, ili, definition) VALUES (?, ?, ?)',
+                                   (synset_obj.synset_id, synset_obj.ili, synset_obj.definition))
+                connection.executemany('INSERT INTO synset_senses VALUES (?, ?, ?)',
+                                       [(synset_obj.synset_id, position, le_obj.sense_id)
+                                        for position, le_obj in enumerate(synset_obj.synonyms)])
+
+            for statement in INDICES:
+                connection.execute(statement)
+        connection.close()
+
+    write_atomically(path, write)
+
+
+class LexiconDatabase:
+    """
+    read API of the SQLite database: senses are returned as odwn_classes.LE objects
+    and synsets as odwn_classes.Synset objects, built from the rows of each query
+    """
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+        schema_version = self.connection.execute("SELECT value FROM info WHERE name = 'schema_version'").fetchone()[0]
+        if int(schema_version) != SCHEMA_VERSION:
+            raise ValueError(f'{path} has schema version {schema_version}, supported: {SCHEMA_VERSION}')
+        self.select = 'SELECT ' + ', '.join(f'"{name}"' for name in COLUMN_NAMES) + ' FROM senses'
+
+    def close(self):
+        self.connection.close()
+
+    def iter_batches(self, sense_ids):
+        sense_ids = list(sense_ids)
+        for start in range(0, len(sense_ids), BATCH_SIZE):
+            yield sense_ids[start:start + BATCH_SIZE]
+
+    def get_sense_id2extra_info(self, sense_ids):
+        """
+        :rtype: dict
+        :return: sense_id -> {'canonical_forms': dict, 'provenance_set': frozenset}
+        """
+        sense_id2extra_info = {sense_id: {'canonical_forms': dict(), 'provenance_set': set()}
+                               for sense_id in sense_ids}
+        for batch in self.iter_batches(sense_ids):
+            placeholders = ', '.join('?' * len(batch))
+            for sense_id, form_id, form in self.connection.execute(
+                    f'SELECT sense_id, form_id, form FROM canonical_forms '
+                    f'WHERE sense_id IN ({placeholders}) ORDER BY sense_id, position', batch):
+                sense_id2extra_info[sense_id]['canonical_forms'][form_id] = form
+            for sense_id, label in self.connection.execute(
+                    f'SELECT sense_id, provenance FROM provenance WHERE sense_id IN ({placeholders})', batch):
+                sense_id2extra_info[sense_id]['provenance_set'].add(label)
+        return sense_id2extra_info
+
+    def materialize_senses(self, rows):
+        """
+        :param list rows: rows of the senses table (in the order of COLUMN_NAMES)
+
+        :rtype: list
+        :return: list of odwn_classes.LE
+        """
+        states = []
+        for row in rows:
+            state = dict(zip(COLUMN_NAMES, row))
+            unset = set(json.loads(state.pop('unset')))
+            none_attributes = set(json.loads(state.pop('none_attributes')))
+            for name, column_type in SCALAR_COLUMNS:
+                if column_type == 'bool' and state[name] is not None:
+                    state[name] = bool(state[name])
+            state['parts'] = json.loads(state['parts']) if state['parts'] is not None else None
+            state['none_attributes'] = none_attributes
+            states.append({name: value for name, value in state.items() if name not in unset})
+
+        sense_id2extra_info = self.get_sense_id2extra_info([state['sense_id'] for state in states])
+        le_objs = []
+        for state in states:
+            none_attributes = state.pop('none_attributes')
+            extra_info = sense_id2extra_info[state['sense_id']]
+            state['canonical_forms'] = None if 'canonical_forms' in none_attributes else extra_info['canonical_forms']
+            state['provenance_set'] = None if 'provenance_set' in none_attributes else frozenset(extra_info['provenance_set'])
+
+            le_obj = LE.__new__(LE)
+            le_obj.__setstate__(state)
+            le_objs.append(le_obj)
+        return le_objs
+
+    def get_senses_where(self, condition, params=()):
+        """
+        e.g., get_senses_where('rbn_pos = ? AND rbn_feature_set = ?', ['verb', 'cognt1'])
+
+        :param str condition: SQL condition on the columns of the senses table
+        :param iterable params: values of the placeholders in condition
+
+        :rtype: list
+        :return: list of odwn_classes.LE in the order of ORBN
+        """
+        rows = self.connection.execute(f'{self.select} WHERE {condition} ORDER BY sense_index',
+                                       list(params)).fetchall()
+        return self.materialize_senses(rows)
+
+    def iter_senses(self, batch_size=10000):
+        """
+        iterate over all senses in the order of ORBN, with at most batch_size LE objects in memory
+        """
+        cursor = self.connection.execute(f'{self.select} ORDER BY sense_index')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from self.materialize_senses(rows)
+
+    def get_sense(self, sense_id):
+        """
+        :rtype: odwn_classes.LE
+        :return: the sense or None if it is not in the database
+        """
+        le_objs = self.get_senses_where('sense_id = ?', [sense_id])
+        return le_objs[0] if le_objs else None
+
+    def get_senses(self, sense_ids):
+        """
+        :rtype: dict
+        :return: sense_id -> odwn_classes.LE for the sense ids in the database
+        """
+        senseid_to_sense_obj = dict()
+        for batch in self.iter_batches(sense_ids):
+            for le_obj in self.get_senses_where(f'sense_id IN ({", ".join("?" * len(batch))})', batch):
+                senseid_to_sense_obj[le_obj.sense_id] = le_obj
+        return senseid_to_sense_obj
+
+    def get_senses_by_lemma(self, lemma, rbn_pos=None):
+        if rbn_pos is None:
+            return self.get_senses_where('lemma = ?', [lemma])
+        return self.get_senses_where('lemma = ? AND rbn_pos IS ?', [lemma, rbn_pos])
+
+    def get_senses_by_feature_set(self, rbn_feature_set):
+        return self.get_senses_where('rbn_feature_set IS ?', [rbn_feature_set])
+
+    def get_senses_with_provenance(self, provenance):
+        """
+        e.g., get_senses_with_provenance('pwn')
+        """
+        return self.get_senses_where('sense_id IN (SELECT sense_id FROM provenance WHERE provenance = ?)',
+                                     [provenance])
+
+    def get_senses_in_synset(self, synset_id):
+        """
+        :rtype: list
+        :return: the synonyms of the synset (odwn_classes.LE) in the order of Synset.synonyms
+        """
+        sense_ids = [sense_id for sense_id, in self.connection.execute(
+            'SELECT sense_id FROM synset_senses WHERE synset_id = ? ORDER BY position', [synset_id])]
+        senseid_to_sense_obj = self.get_senses(sense_ids)
+        return [senseid_to_sense_obj[sense_id] for sense_id in sense_ids]
+
+    def get_synset(self, synset_id):
+        """
+        :rtype: odwn_classes.Synset
+        :return: the synset (with its synonyms) or None if it is not in the database
+        """
+        row = self.connection.execute('SELECT ili, synset_id, definition FROM synsets WHERE synset_id = ?',
+                                      [synset_id]).fetchone()
+        if row is None:
+            return None
+        synset_obj = Synset.__new__(Synset)
+        synset_obj.__setstate__({'ili': row[0],
+                                 'synset_id': row[1],
+                                 'definition': row[2],
+                                 'synonyms': self.get_senses_in_synset(synset_id)})
+        return synset_obj
+
+    def get_synsets_by_ili(self, ili):
+        return [self.get_synset(synset_id)
+                for synset_id, in self.connection.execute('SELECT synset_id FROM synsets WHERE ili = ? ORDER BY synset_index',
+                                                          [ili])]
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM senses').fetchone()[0]
@@ -0,0 +1,36 @@
+"""
+Export ORBN senses as FrameNet lexical units (NLTK format) to sharded JSON lines,
+once per frame that mapping_to_fn/mapping.json maps their rbn_feature_set to (see framenet_utils.py)
+
+Usage:
+  export_fn_lus.py --orbn_path=<orbn_path> --output_folder=<output_folder> [--mapping_path=<mapping_path>] [--workers=<workers>] [--shard_size=<shard_size>] [--provenance=<provenance>]
+
+Options:
+    --orbn_path=<orbn_path>  orbn.lex (or orbn.p), see main.py
+    --output_folder=<output_folder>  the shards (lus-00000.jsonl, ...) and summary.json are written here
+    --mapping_path=<mapping_path>  rbn_feature_set -> frames, see convert_mapping_to_json.py [default: mapping_to_fn/mapping.json]
+    --workers=<workers>  number of worker processes that write the shards [default: 1]
+    --shard_size=<shard_size>  number of senses per shard [default: 10000]
+    --provenance=<provenance>  provenance of the lexical units [default: ORBN]
+
+Example:
+    python export_fn_lus.py --orbn_path="output/orbn.lex" --output_folder="output/fn_lus" --workers=4
+"""
+import os
+from docopt import docopt
+
+from utils import load_orbn
+from framenet_utils import load_feature_set2frames, export_lus
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+
+    senseid_to_sense_obj = load_orbn(arguments['--orbn_path'], package_dir)
+    export_lus(senseid_to_sense_obj,
+               feature_set2frames=load_feature_set2frames(arguments['--mapping_path']),
+               output_folder=arguments['--output_folder'],
+               provenance=arguments['--provenance'],
+               shard_size=int(arguments['--shard_size']),
+               workers=int(arguments['--workers']),
+               verbose=1)
@@ -0,0 +1,55 @@
+"""
+Export ORBN in Lemon to shards of N-Triples, N-Quads or Turtle (optionally gzip-compressed),
+written in parallel, together with manifest.json that lists the shards (see rdf_utils.export_rbn_in_lemon)
+
+Usage:
+  export_lemon.py --orbn_path=<orbn_path> --output_folder=<output_folder> [--format=<format>] [--gzip] [--workers=<workers>] [--shard_size=<shard_size>] [--lemon_path=<lemon_path>] [--namespace=<namespace>] [--major_version=<major_version>] [--minor_version=<minor_version>]
+
+Options:
+    --orbn_path=<orbn_path>  orbn.lex (or orbn.p), see main.py
+    --output_folder=<output_folder>  the shards (orbn_1.0-00000.nt, ...) and manifest.json are written here
+    --format=<format>  nt | nquads | turtle [default: nt]
+    --gzip  gzip-compress the shards
+    --workers=<workers>  number of worker processes that write the shards [default: 1]
+    --shard_size=<shard_size>  number of senses per shard [default: 50000]
+    --lemon_path=<lemon_path>  the Lemon ontology [default: resources/lemon/lemon.ttl]
+    --namespace=<namespace>  namespace of the URIs [default: http://rdf.cltl.nl/rbn/]
+    --major_version=<major_version>  major version of the lexicon [default: 1]
+    --minor_version=<minor_version>  minor version of the lexicon [default: 0]
+
+Example:
+    python export_lemon.py --orbn_path="output/orbn.lex" --output_folder="output/lemon" --format="nt" --gzip --workers=4
+"""
+import os
+from docopt import docopt
+from rdflib import Graph
+
+from utils import load_orbn
+from rdf_utils import export_rbn_in_lemon
+
+rbn_pos_to_lexinfo = {
+    "adj" : "http://www.lexinfo.net/ontology/3.0/lexinfo#adjective",
+    "noun" : "http://www.lexinfo.net/ontology/3.0/lexinfo#noun",
+    "verb" : "http://www.lexinfo.net/ontology/3.0/lexinfo#verb"
+}
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+
+    lemon = Graph()
+    lemon.parse(arguments['--lemon_path'], format='turtle')
+
+    senseid_to_sense_obj = load_orbn(arguments['--orbn_path'], package_dir)
+    export_rbn_in_lemon(senseid_to_sense_obj,
+                        namespace=arguments['--namespace'],
+                        lemon=lemon,
+                        major_version=int(arguments['--major_version']),
+                        minor_version=int(arguments['--minor_version']),
+                        rbn_pos_to_lexinfo=rbn_pos_to_lexinfo,
+                        output_folder=arguments['--output_folder'],
+                        rdf_format=arguments['--format'],
+                        compress=arguments['--gzip'],
+                        shard_size=int(arguments['--shard_size']),
+                        workers=int(arguments['--workers']),
+                        verbose=1)
@@ -0,0 +1,213 @@
+"""
+Columnar representation of ORBN for descriptive statistics: the lexicon frame,
+a pandas.DataFrame with one row per sense (in the order of senseid_to_sense_obj)
+and one column per LE attribute, with categorical dtypes for the string attributes.
+
+If ORBN was loaded from orbn.lex (a read-only lexicon_format.SenseFile), the frame is cached on the file
+and a column is only built the first time an attribute is needed (see get_lexicon_frame).
+A dict of LE objects can be changed in place, so its frame is built again on every call.
+Attributes that were never set on an LE object (e.g., sem_type of senses without part of speech)
+are missing values (None) in the frame.
+If ORBN was loaded from orbn.lex, the string columns are built from the string ids
+in the file without materializing the LE objects.
+
+Groups of senses (e.g., per (lemma, fn_pos)) are computed on the integer codes of the columns
+(see get_group_ids), in the order of the first sense of each group, like the dicts that
+were built by looping over the LE objects.
+"""
+from collections import Counter, defaultdict
+from itertools import islice
+
+import numpy
+import pandas
+
+try:
+    from . import lexicon_format
+except ImportError:
+    import lexicon_format
+
+FRAME_ATTRIBUTES = ['sense_id',
+                    'lemma',
+                    'prefix',
+                    'c_seq_nr',
+                    'rbn_pos',
+                    'simple_pos',
+                    'fn_pos',
+                    'morpho_type',
+                    'lu_type',
+                    'sem_type',
+                    'rbn_type',
+                    'rbn_feature_set',
+                    'article',
+                    'provenance_label',
+                    'synset_id']
+
+def get_string_column(lexicon_file, attribute):
+    """
+    build a categorical column from the string ids of a str column of orbn.lex
+
+    :rtype: pandas.Categorical
+    """
+    column_type, sections = lexicon_file.columns[attribute]
+    string_ids = numpy.frombuffer(sections['values'], dtype=numpy.uint32)
+    missing = string_ids >= lexicon_format.UNSET # NONE or UNSET
+    unique_ids, codes = numpy.unique(string_ids, return_inverse=True)
+    categories = [lexicon_file.get_string(int(string_id))
+                  for string_id in unique_ids
+                  if string_id < lexicon_format.UNSET]
+    codes = codes.astype('int64')
+    codes[missing] = -1
+    return pandas.Categorical.from_codes(codes, categories=categories)
+
+
+def get_column(senseid_to_sense_obj, attribute):
+    """
+    :rtype: pandas.Categorical | list
+    :return: values of the attribute for all senses, categorical if all values are strings (or missing)
+    """
+    if isinstance(senseid_to_sense_obj, lexicon_format.LexiconFile):
+        column_type = senseid_to_sense_obj.columns.get(attribute, (None,))[0]
+        if column_type == 'str':
+            return get_string_column(senseid_to_sense_obj, attribute)
+        elif column_type is None:
+            values = [None] * len(senseid_to_sense_obj)
+        else:
+            values = list(senseid_to_sense_obj.iter_column(attribute))
+    else:
+        values = [getattr(le_obj, attribute, None)
+                  for le_obj in senseid_to_sense_obj.values()]
+
+    if pandas.api.types.infer_dtype(values, skipna=True) in {'string', 'empty'}:
+        codes, categories = pandas.factorize(numpy.array(values, dtype=object))
+        return pandas.Categorical.from_codes(codes, categories=categories)
+    return values
+
+
+def get_lexicon_frame(senseid_to_sense_obj, attributes=FRAME_ATTRIBUTES):
+    """
+    return the lexicon frame of senseid_to_sense_obj with (at least) the attributes as columns.
+    The frame of a lexicon_format.LexiconFile is cached on the file (missing columns are added to it),
+    it is freed together with the file. The frame of a dict is not cached.
+
+    :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE (or lexicon_format.SenseFile)
+    :param iterable attributes: LE attributes that are needed as columns
+
+    :rtype: pandas.DataFrame
+    """
+    if isinstance(senseid_to_sense_obj, lexicon_format.LexiconFile):
+        if 'lexicon_frame' not in senseid_to_sense_obj.derived:
+            senseid_to_sense_obj.derived['lexicon_frame'] = pandas.DataFrame(
+                index=pandas.RangeIndex(len(senseid_to_sense_obj)))
+        frame = senseid_to_sense_obj.derived['lexicon_frame']
+    else:
+        frame = pandas.DataFrame(index=pandas.RangeIndex(len(senseid_to_sense_obj)))
+
+    for attribute in attributes:
+        if attribute not in frame.columns:
+            frame[attribute] = get_column(senseid_to_sense_obj, attribute)
+    return frame
+
+
+def get_codes(column):
+    """
+    :param pandas.Series column: a column of the lexicon frame
+
+    :rtype: tuple
+    :return: (integer code per sense, -1 if missing, numpy array with the value of each code followed by None)
+    """
+    if isinstance(column.dtype, pandas.CategoricalDtype):
+        codes = column.cat.codes.to_numpy(dtype='int64')
+        values = column.cat.categories.to_numpy(dtype=object)
+    else:
+        codes, values = pandas.factorize(column.to_numpy(dtype=object))
+        values = numpy.asarray(values, dtype=object)
+    return codes, numpy.append(values, None)
+
+
+def get_group_ids(frame, attributes):
+    """
+    group the senses by the combination of values of the attributes (missing values included)
+
+    :rtype: tuple
+    :return: (group id per sense, list with the tuple of attribute values of each group),
+    the groups are numbered in the order of the first sense of each group
+    """
+    group_ids = numpy.zeros(len(frame), dtype='int64')
+    attribute_codes = []
+    for attribute in attributes:
+        codes, values = get_codes(frame[attribute])
+        attribute_codes.append((codes, values))
+        group_ids, _ = pandas.factorize(group_ids * (len(values) + 1) + codes + 1)
+
+    _, first_senses = numpy.unique(group_ids, return_index=True)
+    keys = list(zip(*[values[codes[first_senses]]
+                      for codes, values in attribute_codes]))
+    return group_ids, keys
+
+
+def get_group_sizes(frame, attributes):
+    """
+    :rtype: pandas.Series
+    :return: number of senses per combination of values of the attributes,
+    in the order of the first sense with the combination
+    """
+    group_ids, keys = get_group_ids(frame, attributes)
+    return pandas.Series(numpy.bincount(group_ids, minlength=len(keys)),
+                         index=pandas.MultiIndex.from_tuples(keys, names=list(attributes)))
+
+
+def get_frequency_distribution(frame, attributes):
+    """
+    :rtype: collections.Counter
+    :return: tuple of attribute values -> number of senses
+    """
+    group_ids, keys = get_group_ids(frame, attributes)
+    sizes = numpy.bincount(group_ids, minlength=len(keys))
+    return Counter(dict(zip(keys, sizes.tolist())))
+
+
+def get_crosstab(frame, row_attributes, column_attribute):
+    """
+    number of senses per combination of the row attributes (rows) and values of column_attribute (columns),
+    e.g., get_crosstab(frame, ['rbn_pos'], 'lu_type')
+
+    :rtype: pandas.DataFrame
+    """
+    return pandas.crosstab([frame[attribute] for attribute in row_attributes],
+                           frame[column_attribute],
+                           dropna=False)
+
+
+def get_polysemy(frame, attributes=('lemma', 'fn_pos')):
+    """
+    :rtype: pandas.Series
+    :return: number of senses per (lemma, fn_pos), in the order of the first sense
+    """
+    return get_group_sizes(frame, attributes)
+
+
+def get_polysemy_distribution(polysemy):
+    """
+    :param iterable polysemy: polysemy per (lemma, pos), e.g., output of get_polysemy
+
+    :rtype: pandas.DataFrame
+    :return: frequency and percentage per polysemy class
+    """
+    freq = pandas.Series(polysemy).value_counts().sort_index()
+    total = int(freq.sum())
+    list_of_lists = [[int(key), int(value), round((100 * (value / total)), 2)]
+                     for key, value in freq.items()]
+    return pandas.DataFrame(list_of_lists, columns=['Polysemy class', 'Freq', '%'])
+
+
+def get_group_members(frame, attributes, member_attribute='sense_id'):
+    """
+    :rtype: collections.defaultdict
+    :return: tuple of attribute values -> set of values of member_attribute,
+    in the order of the first sense with the combination, e.g., (lemma, fn_pos) -> set of sense ids
+    """
+    group_ids, keys = get_group_ids(frame, attributes)
+    sizes = numpy.bincount(group_ids, minlength=len(keys)).tolist()
+    members = iter(frame[member_attribute].to_numpy(dtype=object)[numpy.argsort(group_ids, kind='stable')])
+
+    return defaultdict(set, zip(keys, [set(islice(members, size)) for size in sizes]))
@@ -0,0 +1,325 @@
+"""
+Bulk export of ORBN senses as FrameNet lexical units in the NLTK format (see odwn_classes.LE.get_fn_nltk_format).
+
+Every sense whose rbn_feature_set is in mapping_to_fn/mapping.json (see convert_mapping_to_json.py)
+is exported once per mapped frame. The lexical units are written as JSON lines to shards,
+e.g., lus-00000.jsonl, of shard_size senses each. Shards are written by a process pool:
+each worker reads its range of senses from orbn.lex (without materializing the other senses),
+so memory does not grow with the size of the lexicon.
+Each line is {"sense_id": ..., "lu": ..., "attributes_to_annotate": [...]}.
+
+FrameMapping is the mapping compiled in both directions (feature set <-> frames)
+and joined to ORBN (frame -> sense ids, sense id -> candidate frames).
+It is cached with a fingerprint of Mapping.xlsx, mapping.json and ORBN (see get_frame_mapping).
+"""
+import os
+import json
+from collections import Counter, deque, defaultdict
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from . import cache_utils
+    from . import lexicon_format
+    from .utils import iter_sense_attributes
+except ImportError:
+    import cache_utils
+    import lexicon_format
+    from utils import iter_sense_attributes
+
+FRAME_MAPPING_VERSION = 1
+
+
+def load_feature_set2frames(path):
+    """
+    :param str path: e.g., mapping_to_fn/mapping.json
+
+    :rtype: dict
+    :return: rbn_feature_set -> list of FrameNet frames
+    """
+    with open(path) as infile:
+        return json.load(infile)
+
+
+def get_lu_name(le_obj):
+    """
+    e.g., 'aanbieden.v'
+    """
+    if le_obj.fn_pos is None:
+        return le_obj.lemma
+    return f'{le_obj.lemma}.{le_obj.fn_pos.lower()}'
+
+
+def iter_lu_records(le_objs, feature_set2frames, provenance):
+    """
+    :rtype: generator
+    :return: generator of (sense_id, lu, attributes_to_annotate), one per mapped frame of a sense
+    """
+    for le_obj in le_objs:
+        for frame in feature_set2frames.get(getattr(le_obj, 'rbn_feature_set', None), []):
+            lu, attributes_to_annotate = le_obj.get_fn_nltk_format(frame=frame,
+                                                                   lu_name=get_lu_name(le_obj),
+                                                                   provenance=provenance)
+            yield le_obj.sense_id, lu, attributes_to_annotate
+
+
+def write_shard(shard_path, le_objs, feature_set2frames, provenance):
+    """
+    write the lexical units of le_objs to shard_path (JSON lines)
+
+    :rtype: dict
+    :return: statistics of the shard
+    """
+    stats = {'shard': os.path.basename(shard_path),
+             'senses': 0,
+             'lus': 0,
+             'attributes_to_annotate': Counter()}
+
+    def write_lus(temp_path):
+        sense_ids = set()
+        with open(temp_path, 'w', encoding='utf-8') as outfile:
+            for sense_id, lu, attributes_to_annotate in iter_lu_records(le_objs, feature_set2frames, provenance):
+                record = {'sense_id': sense_id,
+                          'lu': lu,
+                          'attributes_to_annotate': sorted(attributes_to_annotate)}
+                outfile.write(json.dumps(record, ensure_ascii=False) + '\n')
+                sense_ids.add(sense_id)
+                stats['lus'] += 1
+                stats['attributes_to_annotate'].update(attributes_to_annotate)
+        stats['senses'] = len(sense_ids)
+
+    cache_utils.write_atomically(shard_path, write_lus)
+    return stats
+
+
+def iter_le_objs_in_range(orbn_path, start, end, feature_sets):
+    """
+    materialize the senses with record index start <= index < end of orbn.lex
+    and an rbn_feature_set in feature_sets one by one (without the cache of lexicon_format.SenseFile).
+    The other senses are skipped by reading only their rbn_feature_set.
+    """
+    senses = lexicon_format.load_senses(orbn_path)
+    for index in range(start, end):
+        if senses.get_value('rbn_feature_set', index) in feature_sets:
+            yield senses.load_record(index)
+
+
+def write_shard_of_lexicon_file(shard_path, orbn_path, start, end, feature_set2frames, provenance):
+    """
+    write_shard for a range of senses of orbn.lex (run inside a worker process)
+    """
+    return write_shard(shard_path,
+                       iter_le_objs_in_range(orbn_path, start, end, feature_sets=feature_set2frames),
+                       feature_set2frames,
+                       provenance)
+
+
+def iter_shard_tasks(senseid_to_sense_obj, output_folder, shard_size):
+    """
+    :rtype: generator
+    :return: generator of (function, arguments before feature_set2frames), one per shard
+    """
+    values = iter(senseid_to_sense_obj.values())
+    for shard_number, start in enumerate(range(0, len(senseid_to_sense_obj), shard_size)):
+        shard_path = os.path.join(output_folder, f'lus-{shard_number:05d}.jsonl')
+        if isinstance(senseid_to_sense_obj, lexicon_format.SenseFile):
+            end = min(start + shard_size, len(senseid_to_sense_obj))
+            yield write_shard_of_lexicon_file, (shard_path, senseid_to_sense_obj.path, start, end)
+        else:
+            yield write_shard, (shard_path, list(islice(values, shard_size)))
+
+
+def export_lus(senseid_to_sense_obj,
+               feature_set2frames,
+               output_folder,
+               provenance='ORBN',
+               shard_size=10000,
+               workers=1,
+               verbose=0):
+    """
+    export the senses as FrameNet lexical units to shards in output_folder,
+    together with summary.json (the statistics of all shards)
+
+    :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE (preferably lexicon_format.SenseFile)
+    :param dict feature_set2frames: rbn_feature_set -> frames, see load_feature_set2frames
+    :param str output_folder: folder to which the shards are written
+    :param str provenance: provenance of the lexical units
+    :param int shard_size: number of senses per shard
+    :param int workers: if > 1, the shards are written by a process pool of this size
+
+    :rtype: dict
+    :return: {'shards': list of statistics per shard, 'senses': ..., 'lus': ..., 'attributes_to_annotate': ...}
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    for name in os.listdir(output_folder): # shards of a previous export
+        if name.startswith('lus-') and name.endswith('.jsonl'):
+            os.remove(os.path.join(output_folder, name))
+
+    tasks = iter_shard_tasks(senseid_to_sense_obj, output_folder, shard_size)
+
+    shard_stats = []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = deque()
+            for function, arguments in tasks:
+                futures.append(executor.submit(function, *arguments, feature_set2frames, provenance))
+                if len(futures) >= 2 * workers:
+                    shard_stats.append(futures.popleft().result())
+            while futures:
+                shard_stats.append(futures.popleft().result())
+    else:
+        for function, arguments in tasks:
+            shard_stats.append(function(*arguments, feature_set2frames, provenance))
+
+    attributes_to_annotate = Counter()
+    for stats in shard_stats:
+        attributes_to_annotate.update(stats['attributes_to_annotate'])
+        stats['attributes_to_annotate'] = dict(stats['attributes_to_annotate'])
+
+    summary = {'shards': shard_stats,
+               'senses': sum(stats['senses'] for stats in shard_stats),
+               'lus': sum(stats['lus'] for stats in shard_stats),
+               'attributes_to_annotate': dict(attributes_to_annotate.most_common())}
+    with open(os.path.join(output_folder, 'summary.json'), 'w') as outfile:
+        json.dump(summary, outfile, indent=2)
+
+    if verbose >= 1:
+        print(f'exported {summary["lus"]} lexical units of {summary["senses"]} senses to {len(shard_stats)} shards in {output_folder}')
+        for attribute, count in attributes_to_annotate.most_common():
+            print(f'{attribute} to annotate: {count}')
+    return summary
+
+
+def get_feature_set2frames_from_excel(excel_path):
+    """
+    read the sheet 'the_mapping' of Mapping.xlsx like convert_mapping_to_json.py:
+    the frames of all rows of a feature set, without duplicates, in the order of the sheet
+
+    :rtype: dict
+    :return: rbn_feature_set -> list of FrameNet frames
+    """
+    import pandas
+    df = pandas.read_excel(excel_path, sheet_name='the_mapping', usecols=['RBN feature set', 'English FrameNet frames'])
+
+    feature_set2frames = defaultdict(list)
+    for feature_set, frames in zip(df['RBN feature set'], df['English FrameNet frames'].str.split(',')):
+        for frame in frames:
+            if frame not in feature_set2frames[feature_set]:
+                feature_set2frames[feature_set].append(frame)
+    return dict(feature_set2frames)
+
+
+def compile_feature_set2frames(excel_path, json_path):
+    """
+    the mapping from mapping.json, unless Mapping.xlsx is newer (or mapping.json does not exist)
+
+    :rtype: dict
+    :return: rbn_feature_set -> list of FrameNet frames
+    """
+    if os.path.exists(json_path):
+        if not os.path.exists(excel_path) or os.path.getmtime(json_path) >= os.path.getmtime(excel_path):
+            return load_feature_set2frames(json_path)
+        try:
+            return get_feature_set2frames_from_excel(excel_path)
+        except ImportError as error: # no engine for read_excel, e.g., openpyxl
+            print(f'{excel_path} is newer than {json_path} but could not be read ({error}), using {json_path}')
+            return load_feature_set2frames(json_path)
+    return get_feature_set2frames_from_excel(excel_path)
+
+
+class FrameMapping:
+    """
+    rbn_feature_set <-> FrameNet frames, joined to the senses of ORBN
+    """
+    def __init__(self, feature_set2frames, feature_set2sense_ids):
+        """
+        :param dict feature_set2frames: rbn_feature_set -> list of frames
+        :param dict feature_set2sense_ids: rbn_feature_set -> list of sense ids
+        """
+        self.feature_set2frames = feature_set2frames
+        self.feature_set2sense_ids = feature_set2sense_ids
+
+        self.frame2feature_sets = defaultdict(list)
+        for feature_set, frames in feature_set2frames.items():
+            for frame in frames:
+                self.frame2feature_sets[frame].append(feature_set)
+
+        self.frame2sense_ids = dict()
+        for frame, feature_sets in self.frame2feature_sets.items():
+            self.frame2sense_ids[frame] = [sense_id
+                                           for feature_set in feature_sets
+                                           for sense_id in feature_set2sense_ids.get(feature_set, [])]
+
+        self.sense_id2feature_set = {sense_id: feature_set
+                                     for feature_set, sense_ids in feature_set2sense_ids.items()
+                                     for sense_id in sense_ids}
+
+    @classmethod
+    def build(cls, feature_set2frames, senseid_to_sense_obj):
+        """
+        :param dict feature_set2frames: rbn_feature_set -> list of frames, see compile_feature_set2frames
+        :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE
+        """
+        feature_set2sense_ids = defaultdict(list)
+        for sense_id, feature_set in iter_sense_attributes(senseid_to_sense_obj, ['sense_id', 'rbn_feature_set']):
+            if feature_set in feature_set2frames:
+                feature_set2sense_ids[feature_set].append(sense_id)
+        return cls(feature_set2frames, dict(feature_set2sense_ids))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as infile:
+            info = json.load(infile)
+        if info['version'] != FRAME_MAPPING_VERSION:
+            raise ValueError(f'{path} has version {info["version"]}, supported: {FRAME_MAPPING_VERSION}')
+        return cls(info['feature_set2frames'], info['feature_set2sense_ids'])
+
+    def save(self, path):
+        with open(path, 'w') as outfile:
+            json.dump({'version': FRAME_MAPPING_VERSION,
+                       'feature_set2frames': self.feature_set2frames,
+                       'feature_set2sense_ids': self.feature_set2sense_ids}, outfile)
+
+    def get_sense_ids(self, frame):
+        """
+        :rtype: list
+        :return: sense ids of all senses that evoke the frame (through their rbn_feature_set)
+        """
+        return self.frame2sense_ids.get(frame, [])
+
+    def get_candidate_frames(self, sense_id):
+        """
+        :rtype: list
+        :return: frames of the rbn_feature_set of the sense
+        """
+        return self.feature_set2frames.get(self.sense_id2feature_set.get(sense_id), [])
+
+    def get_feature_sets(self, frame):
+        return self.frame2feature_sets.get(frame, [])
+
+
+def get_frame_mapping(excel_path, json_path, orbn_path, senseid_to_sense_obj, output_dir, verbose=0):
+    """
+    load the FrameMapping from the cache in output_dir, e.g., output/frame_mapping-<fingerprint>.json,
+    which is compiled again if Mapping.xlsx, mapping.json or ORBN changed
+
+    :param str orbn_path: path of ORBN (for the fingerprint)
+    :param dict senseid_to_sense_obj: ORBN loaded from orbn_path
+
+    :rtype: FrameMapping
+    """
+    def write_frame_mapping(output_path):
+        feature_set2frames = compile_feature_set2frames(excel_path, json_path)
+        FrameMapping.build(feature_set2frames, senseid_to_sense_obj).save(output_path)
+
+    fingerprint = cache_utils.get_fingerprint(input_paths={'excel': excel_path,
+                                                           'json': json_path,
+                                                           'orbn': orbn_path},
+                                              settings={'version': FRAME_MAPPING_VERSION})
+    frame_mapping_path = cache_utils.get_or_build(output_dir,
+                                                  stem='frame_mapping',
+                                                  suffix='.json',
+                                                  fingerprint=fingerprint,
+                                                  write_function=write_frame_mapping,
+                                                  verbose=verbose)
+    return FrameMapping.load(frame_mapping_path)
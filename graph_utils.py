@@ -0,0 +1,197 @@
+"""
+Sense <-> synset graph of ODWN with dense integer ids.
+
+Senses, synsets and ILIs are numbered 0..n-1 (in the order of ORBN, ODWN and first occurrence).
+The edges are stored as CSR adjacency arrays (indptr, indices):
+the neighbours of row i are indices[indptr[i]:indptr[i + 1]].
+    sense -> synsets    sense_indptr, sense_synsets
+    synset -> senses    synset_indptr, synset_senses (synonyms in the order of Synset.synonyms)
+    ILI -> synsets      ili_indptr, ili_synsets
+The graph is written by main.py as odwn_graph.npz next to odwn.lex (and odwn.p).
+The queries take batches of ids and are computed with numpy over the whole batch.
+"""
+import numpy
+
+try:
+    from . import lexicon_format
+except ImportError:
+    import lexicon_format
+
+ARRAYS = ['sense_ids', 'synset_ids', 'ilis',
+          'sense_indptr', 'sense_synsets',
+          'synset_indptr', 'synset_senses',
+          'ili_indptr', 'ili_synsets']
+
+
+def get_csr(num_rows, rows, columns):
+    """
+    :param int num_rows: number of rows
+    :param numpy.ndarray rows: row of each edge
+    :param numpy.ndarray columns: column of each edge
+
+    :rtype: tuple
+    :return: (indptr, indices), the columns of a row are in the order of the edges
+    """
+    order = numpy.argsort(rows, kind='stable')
+    indptr = numpy.zeros(num_rows + 1, dtype='int64')
+    numpy.cumsum(numpy.bincount(rows, minlength=num_rows), out=indptr[1:])
+    return indptr, columns[order].astype('int32')
+
+
+def expand_csr(indptr, indices, rows):
+    """
+    the neighbours of a batch of rows
+
+    :rtype: tuple
+    :return: (position in rows of each neighbour, neighbours), grouped by position
+    """
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    positions = numpy.repeat(numpy.arange(len(rows)), counts)
+    offsets = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    return positions, indices[numpy.repeat(starts, counts) + offsets]
+
+
+def split_by_position(positions, values, num_positions):
+    """
+    :rtype: list
+    :return: list with the list of values of each position
+    """
+    if num_positions == 0: # numpy.split would return one empty part
+        return []
+    boundaries = numpy.cumsum(numpy.bincount(positions, minlength=num_positions))[:-1]
+    return [part.tolist() for part in numpy.split(values, boundaries)]
+
+
+def iter_synset_info(synset_id_to_synset_obj):
+    """
+    :rtype: generator
+    :return: generator of (synset_id, ili, sense ids of the synonyms),
+    without materializing the synsets if ODWN was loaded from odwn.lex
+    """
+    if isinstance(synset_id_to_synset_obj, lexicon_format.SynsetFile):
+        yield from zip(synset_id_to_synset_obj.iter_column('synset_id'),
+                       synset_id_to_synset_obj.iter_column('ili'),
+                       synset_id_to_synset_obj.iter_column('synonyms'))
+    else:
+        for synset_obj in synset_id_to_synset_obj.values():
+            yield synset_obj.synset_id, synset_obj.ili, [le_obj.sense_id
+                                                         for le_obj in synset_obj.synonyms]
+
+
+class SynsetGraph:
+    """
+    see the module docstring
+    """
+    def __init__(self, arrays):
+        """
+        :param dict arrays: name -> numpy.ndarray for the names in ARRAYS
+        """
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+        self.sense_id2index = {sense_id: index for index, sense_id in enumerate(self.sense_ids.tolist())}
+        self.synset_id2index = {synset_id: index for index, synset_id in enumerate(self.synset_ids.tolist())}
+        self.ili2index = {ili: index for index, ili in enumerate(self.ilis.tolist())}
+
+    @classmethod
+    def build(cls, senseid_to_sense_obj, synset_id_to_synset_obj):
+        """
+        :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE (or lexicon_format.SenseFile)
+        :param dict synset_id_to_synset_obj: synset_id -> odwn_classes.Synset (or lexicon_format.SynsetFile)
+        """
+        sense_ids = list(senseid_to_sense_obj)
+        sense_id2index = {sense_id: index for index, sense_id in enumerate(sense_ids)}
+
+        synset_ids = []
+        ilis = []
+        ili2index = dict()
+        edge_synsets, edge_senses, ili_edge_ilis = [], [], []
+        for synset_index, (synset_id, ili, synonyms) in enumerate(iter_synset_info(synset_id_to_synset_obj)):
+            synset_ids.append(synset_id)
+            for sense_id in synonyms:
+                edge_synsets.append(synset_index)
+                edge_senses.append(sense_id2index[sense_id])
+            if ili:
+                if ili not in ili2index:
+                    ili2index[ili] = len(ilis)
+                    ilis.append(ili)
+                ili_edge_ilis.append((ili2index[ili], synset_index))
+
+        edge_synsets = numpy.array(edge_synsets, dtype='int64')
+        edge_senses = numpy.array(edge_senses, dtype='int64')
+        ili_edges = numpy.array(ili_edge_ilis, dtype='int64').reshape(-1, 2)
+
+        arrays = {'sense_ids': numpy.array(sense_ids, dtype=str),
+                  'synset_ids': numpy.array(synset_ids, dtype=str),
+                  'ilis': numpy.array(ilis, dtype=str)}
+        arrays['sense_indptr'], arrays['sense_synsets'] = get_csr(len(sense_ids), edge_senses, edge_synsets)
+        arrays['synset_indptr'], arrays['synset_senses'] = get_csr(len(synset_ids), edge_synsets, edge_senses)
+        arrays['ili_indptr'], arrays['ili_synsets'] = get_csr(len(ilis), ili_edges[:, 0], ili_edges[:, 1])
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, path):
+        with numpy.load(path) as npz:
+            return cls({name: npz[name] for name in ARRAYS})
+
+    def save(self, path):
+        with open(path, 'wb') as outfile:
+            numpy.savez(outfile, **{name: getattr(self, name) for name in ARRAYS})
+
+    def get_sense_indices(self, sense_ids):
+        """
+        :rtype: numpy.ndarray
+        :return: integer id of each sense id, -1 if unknown
+        """
+        return numpy.array([self.sense_id2index.get(sense_id, -1) for sense_id in sense_ids], dtype='int64')
+
+    def get_ili_indices(self, ilis):
+        return numpy.array([self.ili2index.get(ili, -1) for ili in ilis], dtype='int64')
+
+    def get_synonym_indices(self, sense_indices):
+        """
+        synonyms of a batch of senses (integer ids)
+
+        :param numpy.ndarray sense_indices: integer ids of senses
+
+        :rtype: tuple
+        :return: (position in sense_indices, integer id of a synonym) arrays
+        """
+        positions, synsets = expand_csr(self.sense_indptr, self.sense_synsets, sense_indices)
+        synset_positions, synonyms = expand_csr(self.synset_indptr, self.synset_senses, synsets)
+        positions = positions[synset_positions]
+        is_other_sense = synonyms != sense_indices[positions]
+        return positions[is_other_sense], synonyms[is_other_sense]
+
+    def get_synonyms(self, sense_ids):
+        """
+        :param list sense_ids: e.g., ['r_n-12345', 'r_v-678']
+
+        :rtype: list
+        :return: for each sense id, the sense ids of its synonyms (other senses in its synsets)
+        """
+        sense_indices = self.get_sense_indices(sense_ids)
+        known = numpy.flatnonzero(sense_indices >= 0)
+        positions, synonyms = self.get_synonym_indices(sense_indices[known])
+        return split_by_position(known[positions], self.sense_ids[synonyms], len(sense_ids))
+
+    def get_senses_of_ilis(self, ilis):
+        """
+        :param list ilis: e.g., ['i12345']
+
+        :rtype: list
+        :return: for each ILI, the sense ids in its synsets
+        """
+        ili_indices = self.get_ili_indices(ilis)
+        known = numpy.flatnonzero(ili_indices >= 0)
+        positions, synsets = expand_csr(self.ili_indptr, self.ili_synsets, ili_indices[known])
+        synset_positions, senses = expand_csr(self.synset_indptr, self.synset_senses, synsets)
+        return split_by_position(known[positions[synset_positions]], self.sense_ids[senses], len(ilis))
+
+    def get_synset_sizes(self):
+        """
+        :rtype: numpy.ndarray
+        :return: number of senses per synset (in the order of synset_ids)
+        """
+        return numpy.diff(self.synset_indptr)
@@ -0,0 +1,464 @@
+"""
+Incremental rebuild of orbn.lex / odwn.lex from a new ORBN/ODWN release.
+
+A full build with main.py --incremental stores ingest_state.json next to its output,
+which contains a fingerprint of every cdb_lu, Lexicon/Synset and LexicalEntry/Sense element.
+The next build with --incremental only rebuilds the LE and Synset objects of elements
+that were added or changed and checks the sense rankings only for the (lemma, pos) groups
+that contain added, changed or removed senses. The links between senses and synsets
+of the previous build are kept, only the senses and synsets that changed are linked again (see relink_synsets).
+"""
+import os
+import json
+import hashlib
+
+from lxml import etree
+
+from odwn_classes import Synset, intern_if_str
+import utils
+import ingest_utils
+import trace_utils
+
+STATE_VERSION = 2
+
+
+def fingerprint_element(el):
+    """
+    :rtype: str
+    :return: hash of the serialized xml element
+    """
+    return hashlib.blake2b(etree.tostring(el, with_tail=False), digest_size=8).hexdigest()
+
+
+def iter_fingerprinted(els, get_id, id2fingerprint):
+    """
+    record the fingerprint of every element in id2fingerprint while passing the elements on
+
+    :param iterable els: xml elements
+    :param callable get_id: function that returns the identifier of an element
+    :param dict id2fingerprint: identifier -> fingerprint, updated in place
+    """
+    for el in els:
+        id2fingerprint[get_id(el)] = fingerprint_element(el)
+        yield el
+
+
+def get_cdb_lu_id(cdb_lu_el):
+    return cdb_lu_el.get('c_lu_id')
+
+
+def iter_lmf_fingerprinted(lmf_els, synset_fingerprints, sense_fingerprints):
+    """
+    like iter_fingerprinted for Lexicon/Synset and Lexicon/LexicalEntry elements,
+    of the latter the LexicalEntry/Sense element is fingerprinted
+    """
+    for el in lmf_els:
+        if el.tag == 'Synset':
+            synset_fingerprints[el.get('id')] = fingerprint_element(el)
+        else:
+            sense_el = el.find('Sense')
+            sense_fingerprints[sense_el.get('id')] = fingerprint_element(sense_el)
+        yield el
+
+
+def get_sense_groups(sense_id2le_obj):
+    """
+    :rtype: dict
+    :return: sense_id -> [lemma, rbn_pos], the group in which sense ranks are checked
+    """
+    return {sense_id: [le_obj.lemma, le_obj.rbn_pos]
+            for sense_id, le_obj in sense_id2le_obj.items()}
+
+
+def get_state(settings,
+              cdb_lu_fingerprints,
+              synset_fingerprints,
+              sense_fingerprints,
+              not_added,
+              sense_groups,
+              inconsistent_ids):
+    """
+    :param dict settings: settings of the build, an incremental build requires the same settings
+    :param dict sense_groups: output of get_sense_groups before removing the inconsistent ids
+
+    :rtype: dict
+    :return: state that is stored as ingest_state.json
+    """
+    return {
+        'version': STATE_VERSION,
+        'settings': settings,
+        'cdb_lu': cdb_lu_fingerprints,
+        'synsets': synset_fingerprints,
+        'senses': sense_fingerprints,
+        'not_added': sorted(not_added),
+        'groups': sense_groups,
+        'inconsistent_ids': sorted(inconsistent_ids)
+    }
+
+
+def save_state(path, state):
+    with open(path, 'w') as outfile:
+        json.dump(state, outfile)
+
+
+def load_state(path, settings, output_paths=(), verbose=0):
+    """
+    :param iterable output_paths: output of the previous build, e.g., orbn.lex and odwn.lex
+
+    :rtype: dict
+    :return: the stored state or None if there is none for these settings or an output path is missing
+    """
+    try:
+        with open(path) as infile:
+            state = json.load(infile)
+    except FileNotFoundError:
+        if verbose:
+            print(f'no ingest state found at {path}, running a full build')
+        return None
+
+    if state['version'] != STATE_VERSION or state['settings'] != settings:
+        if verbose:
+            print(f'ingest state at {path} was created with other settings, running a full build')
+        return None
+
+    missing_paths = [output_path for output_path in output_paths if not os.path.exists(output_path)]
+    if missing_paths:
+        if verbose:
+            print(f'output of the previous build not found: {missing_paths}, running a full build')
+        return None
+
+    return state
+
+
+def diff_fingerprints(old, new):
+    """
+    :rtype: tuple
+    :return: (added ids, changed ids, removed ids)
+    """
+    added = {identifier for identifier in new if identifier not in old}
+    changed = {identifier for identifier, fingerprint in new.items()
+               if identifier in old and old[identifier] != fingerprint}
+    removed = {identifier for identifier in old if identifier not in new}
+    return added, changed, removed
+
+
+def build_le_obj(le_xml_obj,
+                 namespace,
+                 short_namespace,
+                 allowed_prefixes,
+                 exclude_sub_number_ids,
+                 verbose=0):
+    """
+    :rtype: tuple
+    :return: (sense_id -> LE object, set of sense ids that were not added) for one cdb_lu element
+    """
+    return ingest_utils.load_le_objs([le_xml_obj],
+                                     namespace,
+                                     short_namespace,
+                                     allowed_prefixes=allowed_prefixes,
+                                     exclude_sub_number_ids=exclude_sub_number_ids,
+                                     verbose=verbose)
+
+
+def rebuild_le_objs(cdb_lu_els,
+                    previous_senses,
+                    state,
+                    namespace,
+                    short_namespace,
+                    allowed_prefixes,
+                    exclude_sub_number_ids,
+                    verbose=0):
+    """
+    like ingest_utils.load_le_objs, but the LE objects of unchanged cdb_lu elements
+    are taken from the previous build.
+    Unchanged senses that were inconsistent in the previous build are not part of it,
+    they are kept as serialized xml and only built if their (lemma, pos) group is affected
+    (their value in sense_id2le_obj is None to preserve the document order).
+
+    :rtype: tuple
+    :return: (sense_id -> LE object (before checking sense ranks),
+              set of sense ids that were not added,
+              set of sense ids for which a new LE object was built,
+              sense_id -> serialized cdb_lu element of the pending senses,
+              cdb_lu fingerprints)
+    """
+    old_fingerprints = state['cdb_lu']
+    previously_not_added = set(state['not_added'])
+    previously_inconsistent = set(state['inconsistent_ids'])
+
+    cdb_lu_fingerprints = dict()
+    sense_id2le_obj = dict()
+    not_added = set()
+    rebuilt_ids = set()
+    pending = dict()
+
+    for le_xml_obj in cdb_lu_els:
+        sense_id = le_xml_obj.get('c_lu_id')
+        fingerprint = fingerprint_element(le_xml_obj)
+        cdb_lu_fingerprints[sense_id] = fingerprint
+
+        if old_fingerprints.get(sense_id) == fingerprint:
+            if sense_id in previously_not_added:
+                not_added.add(sense_id)
+                continue
+            if sense_id in previously_inconsistent:
+                sense_id2le_obj[sense_id] = None
+                pending[sense_id] = etree.tostring(le_xml_obj, with_tail=False)
+                continue
+            if sense_id in previous_senses:
+                sense_id2le_obj[sense_id] = previous_senses[sense_id]
+                continue
+
+        le_objs, le_not_added = build_le_obj(le_xml_obj,
+                                             namespace,
+                                             short_namespace,
+                                             allowed_prefixes,
+                                             exclude_sub_number_ids,
+                                             verbose=verbose)
+        sense_id2le_obj.update(le_objs)
+        not_added.update(le_not_added)
+        rebuilt_ids.update(le_objs)
+
+    return sense_id2le_obj, not_added, rebuilt_ids, pending, cdb_lu_fingerprints
+
+
+def relink_synsets(lmf_els,
+                   sense_id2le_obj,
+                   previous_senses,
+                   previous_synsets,
+                   state,
+                   unlinked_sense_ids,
+                   verbose=0):
+    """
+    like ingest_utils.load_and_link_synsets, but the links of the previous build are kept:
+    Synset objects of unchanged Lexicon/Synset elements are reused with their synonyms,
+    and only the following senses are linked again:
+        - senses in unlinked_sense_ids (e.g., a new LE object or no longer consistent)
+        - senses whose LexicalEntry/Sense element was added, changed or removed
+        - senses of removed synsets
+        - senses that refer to a synset that was not in the previous build
+    A sense id in several LexicalEntry elements is linked by the last changed one that refers to
+    a loaded synset, an unchanged LexicalEntry after them keeps the link of the previous build.
+    The synonyms of the synsets that gain or lose a sense or that were rebuilt are put
+    in the document order of the LexicalEntry elements (one position per sense is kept for this),
+    the other synsets keep the order of the previous build.
+
+    :param dict sense_id2le_obj: sense_id -> LE object of the new build
+    :param set unlinked_sense_ids: senses whose link of the previous build is dropped
+
+    :rtype: tuple
+    :return: (synset_id -> Synset, synset fingerprints, sense fingerprints, ids of the rebuilt synsets)
+    """
+    synset_fingerprints = dict()
+    sense_fingerprints = dict()
+    synset_id2synset_obj = dict()
+    rebuilt_synset_ids = set()
+    sense_id2position = dict()
+    sense_id2to_link = dict() # sense_id -> [(synset id, provenance label), ...] of its changed LexicalEntry elements
+
+    for position, el in enumerate(lmf_els):
+        if el.tag == 'Synset':
+            synset_id = el.get('id')
+            synset_fingerprints[synset_id] = fingerprint_element(el)
+            if all([state['synsets'].get(synset_id) == synset_fingerprints[synset_id],
+                    synset_id in previous_synsets]):
+                synset_id2synset_obj[synset_id] = previous_synsets[synset_id]
+                continue
+
+            synset_obj = Synset(el)
+            if synset_id in previous_synsets: # the senses of a changed synset stay linked to it
+                synset_obj.synonyms = list(previous_synsets[synset_id].synonyms)
+            synset_id2synset_obj[synset_id] = synset_obj
+            rebuilt_synset_ids.add(synset_id)
+            continue
+
+        sense_el = el.find('Sense')
+        sense_id = sense_el.get('id')
+        sense_fingerprints[sense_id] = fingerprint_element(sense_el)
+        le_obj = sense_id2le_obj.get(sense_id)
+        if le_obj is None:
+            continue
+
+        sense_id2position[sense_id] = position
+        if all([state['senses'].get(sense_id) == sense_fingerprints[sense_id],
+                sense_id not in unlinked_sense_ids,
+                le_obj.synset_id is not None]):
+            sense_id2to_link.pop(sense_id, None) # unchanged link (of the last LexicalEntry of the sense id)
+            continue
+
+        if sense_id not in sense_id2to_link:
+            sense_id2to_link[sense_id] = []
+        sense_id2to_link[sense_id].append((sense_el.get('synset'), intern_if_str(sense_el.get('provenance'))))
+
+    # senses that lose their previous link
+    dropped_ids = set(unlinked_sense_ids) | set(sense_id2to_link) | (set(state['senses']) - set(sense_fingerprints))
+    touched_synset_ids = set(rebuilt_synset_ids)
+    for sense_id in dropped_ids:
+        if sense_id in previous_senses and previous_senses[sense_id].synset_id is not None:
+            touched_synset_ids.add(previous_senses[sense_id].synset_id)
+        le_obj = sense_id2le_obj.get(sense_id)
+        if le_obj is not None:
+            ingest_utils.unlink_sense(le_obj)
+
+    for synset_id in set(state['synsets']) - set(synset_fingerprints):
+        if synset_id in previous_synsets:
+            for le_obj in previous_synsets[synset_id].synonyms:
+                if le_obj.synset_id == synset_id:
+                    ingest_utils.unlink_sense(le_obj)
+
+    for synset_id in touched_synset_ids:
+        synset_obj = synset_id2synset_obj.get(synset_id)
+        if synset_obj is not None:
+            synset_obj.synonyms = [le_obj for le_obj in synset_obj.synonyms
+                                   if le_obj.sense_id not in dropped_ids
+                                   and sense_id2le_obj.get(le_obj.sense_id) is le_obj]
+
+    # link the senses again, by the last LexicalEntry that refers to a loaded synset (as in a full build)
+    label2provenance_set = dict()
+    for sense_id, links in sense_id2to_link.items():
+        for synset, provenance_label in reversed(links):
+            if synset is None or synset == 'unknown_000':
+                continue
+            assert provenance_label
+
+            synset_obj = synset_id2synset_obj.get(synset)
+            if synset_obj is None:
+                if verbose:
+                    print(f'{synset} has no Synset xml element in LMF file')
+                continue
+
+            ingest_utils.link_sense_to_synset(sense_id2le_obj[sense_id], synset_obj.synset_id, synset_obj.synonyms,
+                                              provenance_label, label2provenance_set)
+            touched_synset_ids.add(synset_obj.synset_id)
+            break
+
+    for synset_id in touched_synset_ids:
+        synset_obj = synset_id2synset_obj.get(synset_id)
+        if synset_obj is not None:
+            synset_obj.synonyms.sort(key=lambda le_obj: sense_id2position[le_obj.sense_id])
+
+    return synset_id2synset_obj, synset_fingerprints, sense_fingerprints, rebuilt_synset_ids
+
+
+def rebuild_incrementally(cdb_lu_els,
+                          lmf_els,
+                          previous_senses,
+                          previous_synsets,
+                          state,
+                          namespace,
+                          short_namespace,
+                          allowed_prefixes,
+                          exclude_sub_number_ids,
+                          verbose=0):
+    """
+    rebuild the output of main.py from a new ORBN/ODWN release,
+    reusing the LE and Synset objects of unchanged elements
+
+    :param dict previous_senses: sense_id -> LE of the previous build
+    :param dict previous_synsets: synset_id -> Synset of the previous build
+    :param dict state: ingest state of the previous build (see load_state)
+
+    :rtype: tuple
+    :return: (sense_id -> LE, synset_id -> Synset, not added sense ids, change report, new state)
+    """
+    # senses
+    with trace_utils.span('rebuild_le_objs'):
+        sense_id2le_obj, not_added, rebuilt_sense_ids, pending, cdb_lu_fingerprints = rebuild_le_objs(
+            cdb_lu_els,
+            previous_senses=previous_senses,
+            state=state,
+            namespace=namespace,
+            short_namespace=short_namespace,
+            allowed_prefixes=allowed_prefixes,
+            exclude_sub_number_ids=exclude_sub_number_ids,
+            verbose=verbose)
+    added, changed, removed = diff_fingerprints(state['cdb_lu'], cdb_lu_fingerprints)
+
+    # the cdb_lu elements of pending senses are unchanged, and so are their groups
+    sense_groups = {sense_id: state['groups'][sense_id] if le_obj is None else [le_obj.lemma, le_obj.rbn_pos]
+                    for sense_id, le_obj in sense_id2le_obj.items()}
+    affected_groups = set()
+    for sense_id in added | changed | removed:
+        for groups in [state['groups'], sense_groups]:
+            if sense_id in groups:
+                affected_groups.add(tuple(groups[sense_id]))
+
+    # pending senses in unaffected groups remain inconsistent
+    inconsistent_ids = set()
+    for sense_id, serialized in pending.items():
+        if tuple(sense_groups[sense_id]) in affected_groups:
+            le_objs, _ = build_le_obj(etree.fromstring(serialized),
+                                      namespace,
+                                      short_namespace,
+                                      allowed_prefixes,
+                                      exclude_sub_number_ids,
+                                      verbose=verbose)
+            sense_id2le_obj[sense_id] = le_objs[sense_id]
+            rebuilt_sense_ids.add(sense_id)
+        else:
+            del sense_id2le_obj[sense_id]
+            inconsistent_ids.add(sense_id)
+
+    # the sense ranks only have to be checked within the affected groups
+    affected_senses = {sense_id: le_obj
+                       for sense_id, le_obj in sense_id2le_obj.items()
+                       if (le_obj.lemma, le_obj.rbn_pos) in affected_groups}
+    with trace_utils.span('get_inconsistent_senseranks'):
+        checked_inconsistent_ids = utils.get_inconsistent_senseranks(affected_senses, verbose=verbose)
+    for inconsistent_id in checked_inconsistent_ids:
+        del sense_id2le_obj[inconsistent_id]
+    inconsistent_ids.update(checked_inconsistent_ids)
+
+    # synsets, only the senses that were rebuilt or removed or whose Sense element changed are linked again
+    with trace_utils.span('relink_synsets'):
+        synset_id2synset_obj, synset_fingerprints, sense_fingerprints, rebuilt_synset_ids = relink_synsets(
+            lmf_els,
+            sense_id2le_obj,
+            previous_senses=previous_senses,
+            previous_synsets=previous_synsets,
+            state=state,
+            unlinked_sense_ids=added | changed | removed | rebuilt_sense_ids | inconsistent_ids,
+            verbose=verbose)
+    synsets_added, synsets_changed, synsets_removed = diff_fingerprints(state['synsets'], synset_fingerprints)
+    links_added, links_changed, links_removed = diff_fingerprints(state['senses'], sense_fingerprints)
+
+    change_report = {
+        'senses': {
+            'added': sorted(added),
+            'changed': sorted(changed),
+            'removed': sorted(removed),
+            'rebuilt': sorted(rebuilt_sense_ids),
+            'newly_inconsistent': sorted(inconsistent_ids - set(state['inconsistent_ids'])),
+            'no_longer_inconsistent': sorted(set(state['inconsistent_ids']) & set(sense_id2le_obj))
+        },
+        'groups_checked': [list(group) for group in sorted(affected_groups, key=str)],
+        'synsets': {
+            'added': sorted(synsets_added),
+            'changed': sorted(synsets_changed),
+            'removed': sorted(synsets_removed),
+            'rebuilt': sorted(rebuilt_synset_ids)
+        },
+        'links': {
+            'added': sorted(links_added),
+            'changed': sorted(links_changed),
+            'removed': sorted(links_removed)
+        }
+    }
+
+    new_state = get_state(state['settings'],
+                          cdb_lu_fingerprints=cdb_lu_fingerprints,
+                          synset_fingerprints=synset_fingerprints,
+                          sense_fingerprints=sense_fingerprints,
+                          not_added=not_added,
+                          sense_groups=sense_groups,
+                          inconsistent_ids=inconsistent_ids)
+
+    return sense_id2le_obj, synset_id2synset_obj, not_added, change_report, new_state
+
+
+def print_change_report(change_report):
+    for part in ['senses', 'synsets', 'links']:
+        counts = ', '.join(f'{label}: {len(ids)}'
+                           for label, ids in change_report[part].items())
+        print(f'{part}: {counts}')
+    print(f'(lemma, pos) groups checked for sense ranks: {len(change_report["groups_checked"])}')
@@ -0,0 +1,269 @@
+"""
+Indices of ORBN senses.
+
+LemmaIndex is keyed on (lemma, rbn_pos) and answers lookups with an fn_pos as well.
+Lemmas are kept in a sorted list, so prefix queries are two binary searches
+(the same queries a trie answers, without a node per character).
+Sense ids are ordered by c_seq_nr.
+
+PartIndex maps the parts of the morpho-structure of a sense to the sense,
+with the role of the part (see get_part_roles), for all morpho types.
+"""
+import json
+from bisect import bisect_left
+from collections import defaultdict
+
+try:
+    from .utils import iter_sense_attributes
+except ImportError:
+    from utils import iter_sense_attributes
+
+INDEX_VERSION = 1
+PART_INDEX_VERSION = 1
+FN_POS_TO_RBN_POS = {
+    'N': 'noun',
+    'V': 'verb',
+    'A': 'adj'
+}
+
+
+class LemmaIndex:
+    """
+    (lemma, rbn_pos) -> sense ids ordered by c_seq_nr
+    """
+    def __init__(self, lemma_pos_to_sense_ids):
+        self.lemma_pos_to_sense_ids = lemma_pos_to_sense_ids
+
+        self.lemma_to_pos = defaultdict(list)
+        for lemma, rbn_pos in sorted(lemma_pos_to_sense_ids):
+            self.lemma_to_pos[lemma].append(rbn_pos)
+        self.lemmas = sorted(self.lemma_to_pos)
+
+    @classmethod
+    def build(cls, senseid_to_sense_obj):
+        """
+        :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE
+        """
+        lemma_pos_to_ranked_ids = defaultdict(list)
+        for sense_id, lemma, rbn_pos, c_seq_nr in iter_sense_attributes(senseid_to_sense_obj,
+                                                                        ['sense_id', 'lemma', 'rbn_pos', 'c_seq_nr']):
+            lemma_pos_to_ranked_ids[(lemma, rbn_pos)].append((int(c_seq_nr), sense_id))
+
+        lemma_pos_to_sense_ids = {key: [sense_id for c_seq_nr, sense_id in sorted(ranked_ids)]
+                                  for key, ranked_ids in lemma_pos_to_ranked_ids.items()}
+        return cls(lemma_pos_to_sense_ids)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as infile:
+            info = json.load(infile)
+        if info['version'] != INDEX_VERSION:
+            raise ValueError(f'{path} has index version {info["version"]}, supported: {INDEX_VERSION}')
+        return cls({(lemma, rbn_pos): sense_ids
+                    for lemma, rbn_pos, sense_ids in info['entries']})
+
+    def save(self, path):
+        entries = [[lemma, rbn_pos, sense_ids]
+                   for (lemma, rbn_pos), sense_ids in sorted(self.lemma_pos_to_sense_ids.items())]
+        with open(path, 'w') as outfile:
+            json.dump({'version': INDEX_VERSION,
+                       'entries': entries}, outfile)
+
+    def get_pos_list(self, lemma, pos=None):
+        if pos is None:
+            return self.lemma_to_pos.get(lemma, [])
+        return [FN_POS_TO_RBN_POS.get(pos, pos)]
+
+    def get_sense_ids(self, lemma, pos=None):
+        """
+        :param str lemma: e.g., 'bank'
+        :param str pos: rbn_pos (noun | verb | adj), fn_pos (N | V | A) or None for all
+
+        :rtype: list
+        :return: sense ids ordered by c_seq_nr (per part of speech if pos is None)
+        """
+        sense_ids = []
+        for rbn_pos in self.get_pos_list(lemma, pos):
+            sense_ids.extend(self.lemma_pos_to_sense_ids.get((lemma, rbn_pos), []))
+        return sense_ids
+
+    def iter_lemmas_with_prefix(self, prefix):
+        start = bisect_left(self.lemmas, prefix)
+        for lemma in self.lemmas[start:]:
+            if not lemma.startswith(prefix):
+                break
+            yield lemma
+
+    def get_sense_ids_with_prefix(self, prefix, pos=None):
+        """
+        :rtype: dict
+        :return: (lemma, rbn_pos) -> sense ids ordered by c_seq_nr for all lemmas that start with prefix
+        """
+        result = dict()
+        for lemma in self.iter_lemmas_with_prefix(prefix):
+            for rbn_pos in self.get_pos_list(lemma, pos):
+                key = (lemma, rbn_pos)
+                if key in self.lemma_pos_to_sense_ids:
+                    result[key] = self.lemma_pos_to_sense_ids[key]
+        return result
+
+    def get_sense_ids_batch(self, lemmas, pos=None):
+        """
+        :param iterable lemmas: lemmas to look up
+        :param str pos: rbn_pos, fn_pos or None for all
+
+        :rtype: dict
+        :return: lemma -> sense ids (empty list if the lemma is not in ORBN)
+        """
+        return {lemma: self.get_sense_ids(lemma, pos)
+                for lemma in lemmas}
+
+    def __len__(self):
+        return len(self.lemma_pos_to_sense_ids)
+
+
+ROLES = ['head', 'modifier', 'linking_element', 'particle', 'affix']
+COMPOUND_MORPHO_TYPES = {'compound', 'compderiv', 'xcompound', 'x-compound', 'derivcomp'}
+
+
+def split_morphostructure_with_depth(morphostructure):
+    """
+    like utils.split_morphostructure, but with the bracket depth of each part,
+    e.g., '[voet]s[pad]' -> [('voet', 1), ('s', 0), ('pad', 1)]
+
+    :rtype: list
+    :return: list of (part, depth)
+    """
+    parts = []
+    characters = []
+    depth = 0
+    for character in morphostructure + '[':
+        if character == '*':
+            continue
+        if character in '[]<>':
+            if characters:
+                parts.append((''.join(characters), depth))
+                characters = []
+            depth += 1 if character in '[<' else -1
+        else:
+            characters.append(character)
+    return parts
+
+
+def get_part_roles(morpho_structure, morpho_type, lemma):
+    """
+    assign a role to each part of the morpho-structure:
+        phrasal: the last part is the head, the others are particles, e.g., '[aan][bieden]'
+        other morpho types: the last part in brackets is the head (Dutch compounds are right-headed),
+        the other parts in brackets are modifiers, parts without brackets between them are
+        linking elements (s, e, en, ...) and the remaining parts without brackets are affixes,
+        e.g., '[voet]s[pad]' -> voet: modifier, s: linking_element, pad: head
+
+    :param str morpho_structure: e.g., '[voet]s[pad]'
+    :param str morpho_type: e.g., 'compound'
+    :param str lemma: e.g., 'voetspad'
+
+    :rtype: list
+    :return: list of (part, role), empty if the parts do not join into the lemma (see utils.split_morphostructure)
+    """
+    if morpho_structure is None:
+        return []
+
+    parts = split_morphostructure_with_depth(morpho_structure)
+    if not parts or ''.join(part for part, depth in parts) != lemma:
+        return []
+
+    if morpho_type == 'phrasal':
+        return [(part, 'particle') for part, depth in parts[:-1]] + [(parts[-1][0], 'head')]
+
+    bracketed = [index for index, (part, depth) in enumerate(parts) if depth > 0]
+    if not bracketed:
+        bracketed = [len(parts) - 1]
+
+    part_roles = []
+    for index, (part, depth) in enumerate(parts):
+        if index == bracketed[-1]:
+            role = 'head'
+        elif depth > 0:
+            role = 'modifier'
+        elif bracketed[0] < index < bracketed[-1]:
+            role = 'linking_element'
+        else:
+            role = 'affix'
+        part_roles.append((part, role))
+    return part_roles
+
+
+class PartIndex:
+    """
+    (part, role, morpho_type) -> sorted sense ids
+    """
+    def __init__(self, key_to_sense_ids):
+        self.key_to_sense_ids = key_to_sense_ids
+
+        self.part_role_to_morpho_types = defaultdict(list)
+        for part, role, morpho_type in key_to_sense_ids:
+            self.part_role_to_morpho_types[(part, role)].append(morpho_type)
+
+    @classmethod
+    def build(cls, senseid_to_sense_obj):
+        """
+        :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE
+        """
+        key_to_sense_ids = defaultdict(set)
+        for sense_id, lemma, morpho_type, morpho_structure in iter_sense_attributes(senseid_to_sense_obj,
+                                                                                    ['sense_id', 'lemma', 'morpho_type', 'morpho_structure']):
+            for part, role in get_part_roles(morpho_structure, morpho_type, lemma):
+                key_to_sense_ids[(part, role, morpho_type)].add(sense_id)
+
+        return cls({key: sorted(sense_ids)
+                    for key, sense_ids in key_to_sense_ids.items()})
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as infile:
+            info = json.load(infile)
+        if info['version'] != PART_INDEX_VERSION:
+            raise ValueError(f'{path} has index version {info["version"]}, supported: {PART_INDEX_VERSION}')
+        return cls({(part, role, morpho_type): sense_ids
+                    for part, role, morpho_type, sense_ids in info['entries']})
+
+    def save(self, path):
+        entries = [[part, role, morpho_type, sense_ids]
+                   for (part, role, morpho_type), sense_ids in sorted(self.key_to_sense_ids.items(),
+                                                                      key=lambda item: (item[0][0], item[0][1], str(item[0][2])))]
+        with open(path, 'w') as outfile:
+            json.dump({'version': PART_INDEX_VERSION,
+                       'entries': entries}, outfile)
+
+    def get_sense_ids(self, part, role=None, morpho_types=None):
+        """
+        :param str part: e.g., 'pad'
+        :param str role: one of ROLES or None for all
+        :param iterable morpho_types: e.g., COMPOUND_MORPHO_TYPES or None for all
+
+        :rtype: list
+        :return: sorted sense ids in which part has the role
+        """
+        roles = ROLES if role is None else [role]
+        sense_ids = []
+        for role in roles:
+            for morpho_type in self.part_role_to_morpho_types.get((part, role), []):
+                if morpho_types is None or morpho_type in morpho_types:
+                    sense_ids.extend(self.key_to_sense_ids[(part, role, morpho_type)])
+        return sorted(set(sense_ids))
+
+    def get_compounds_headed_by(self, head):
+        """
+        e.g., get_compounds_headed_by('pad') -> sense ids of 'voetpad', 'fietspad', ...
+        """
+        return self.get_sense_ids(head, role='head', morpho_types=COMPOUND_MORPHO_TYPES)
+
+    def get_phrasal_verbs_with_particle(self, particle):
+        """
+        e.g., get_phrasal_verbs_with_particle('aan') -> sense ids of 'aanbieden', 'aankomen', ...
+        """
+        return self.get_sense_ids(particle, role='particle', morpho_types={'phrasal'})
+
+    def __len__(self):
+        return len(self.key_to_sense_ids)
@@ -0,0 +1,520 @@
+"""
+Versioned binary format for ORBN senses (orbn.lex) and ODWN synsets (odwn.lex)
+
+Layout of a file (all integers are unsigned 32-bit little-endian):
+
+    magic           8 bytes, b'ODWNLEX\\x00'
+    version         uint32, FORMAT_VERSION
+    header_length   uint32
+    header          utf-8 JSON object of header_length bytes
+    sections        each section starts at an offset that is a multiple of 8
+
+The JSON header contains:
+    kind            'senses' or 'synsets'
+    num_records     number of records, stored in the order of the original dict
+    key             attribute used as dict key, i.e., 'sense_id' or 'synset_id'
+    strings         sections 'offsets' (num_strings + 1) and 'blob' (utf-8) of the string table
+    key_index       section with record indices sorted by key, used for binary search
+    columns         list of {'name', 'type', 'sections'}, one per attribute
+
+A section is referenced as [offset, length] in bytes from the start of the file.
+
+Column types:
+    str             'values': one string id per record
+    int, bool       'values': one value per record
+    list, set       'spans': (start, end) per record into 'items', which are string ids
+    dict            'spans': (start, end) per record into 'items', which are alternating key and value string ids
+
+In 'values' and 'spans', NONE (0xFFFFFFFF) encodes None and UNSET (0xFFFFFFFE) an attribute
+that was never set on the object (e.g., LE.sem_type for senses without part of speech).
+
+Reading only parses the header and memory-maps the file, individual records
+are materialized into LE and Synset objects when they are accessed.
+"""
+import json
+import mmap
+import sys
+from abc import abstractmethod
+from array import array
+from collections.abc import Mapping, ItemsView, ValuesView
+
+try:
+    from .odwn_classes import LE, Synset
+    from .cache_utils import write_atomically
+except ImportError:
+    from odwn_classes import LE, Synset
+    from cache_utils import write_atomically
+
+MAGIC = b'ODWNLEX\x00'
+FORMAT_VERSION = 1
+NONE = 0xFFFFFFFF
+UNSET = 0xFFFFFFFE
+NOT_SET = object() # returned for attributes that were never set on the object
+
+SENSE_COLUMNS = [
+    ('add', 'bool'),
+    ('namespace', 'str'),
+    ('abbreviated_namespace', 'str'),
+    ('verbose', 'int'),
+    ('sense_id', 'str'),
+    ('prefix', 'str'),
+    ('c_seq_nr', 'str'),
+    ('lemma', 'str'),
+    ('article', 'str'),
+    ('parts', 'list'),
+    ('sense_label', 'str'),
+    ('definition', 'str'),
+    ('rbn_pos', 'str'),
+    ('simple_pos', 'str'),
+    ('morpho_type', 'str'),
+    ('lu_type', 'str'),
+    ('morpho_structure', 'str'),
+    ('fn_pos', 'str'),
+    ('rbn_type', 'str'),
+    ('rbn_feature_set', 'str'),
+    ('separable', 'bool'),
+    ('provenance_set', 'set'),
+    ('provenance_label', 'str'),
+    ('synset_id', 'str'),
+    ('canonical_forms', 'dict'),
+    ('sem_type', 'str'),
+]
+
+SYNSET_COLUMNS = [
+    ('ili', 'str'),
+    ('synset_id', 'str'),
+    ('definition', 'str'),
+    ('synonyms', 'list'), # sense ids
+]
+
+assert array('I').itemsize == 4
+
+
+def is_lexicon_file(path):
+    """
+    :rtype: bool
+    :return: True if the file starts with the magic bytes of this format
+    """
+    with open(path, 'rb') as infile:
+        return infile.read(len(MAGIC)) == MAGIC
+
+
+def to_little_endian(uint32_array):
+    if sys.byteorder == 'big':
+        uint32_array = array('I', uint32_array)
+        uint32_array.byteswap()
+    return uint32_array
+
+
+def write_lexicon_file(path, kind, key, states, columns):
+    """
+    write records (one dict of attribute values per record) in the binary format
+
+    :param str path: output path
+    :param str kind: 'senses' | 'synsets'
+    :param str key: attribute used as dict key
+    :param list states: list of dicts, attribute -> value
+    :param list columns: list of (attribute, column type)
+    """
+    string2id = dict()
+    strings = []
+
+    def string_id(value):
+        if value not in string2id:
+            string2id[value] = len(strings)
+            strings.append(value)
+        return string2id[value]
+
+    sections = []
+    column_infos = []
+    for name, column_type in columns:
+        sections_of_column = dict()
+        if column_type in {'str', 'int', 'bool'}:
+            values = array('I')
+            for state in states:
+                if name not in state:
+                    values.append(UNSET)
+                elif state[name] is None:
+                    values.append(NONE)
+                elif column_type == 'str':
+                    values.append(string_id(state[name]))
+                else:
+                    values.append(int(state[name]))
+            sections_of_column['values'] = len(sections)
+            sections.append(values)
+        else:
+            spans = array('I')
+            items = array('I')
+            for state in states:
+                if name not in state:
+                    spans.extend([UNSET, UNSET])
+                elif state[name] is None:
+                    spans.extend([NONE, NONE])
+                else:
+                    start = len(items)
+                    if column_type == 'dict':
+                        for dict_key, dict_value in state[name].items():
+                            items.extend([string_id(dict_key), string_id(dict_value)])
+                    elif column_type == 'set':
+                        items.extend([string_id(value) for value in sorted(state[name])])
+                    else:
+                        items.extend([string_id(value) for value in state[name]])
+                    spans.extend([start, len(items)])
+            sections_of_column['spans'] = len(sections)
+            sections.append(spans)
+            sections_of_column['items'] = len(sections)
+            sections.append(items)
+        column_infos.append({'name': name,
+                             'type': column_type,
+                             'sections': sections_of_column})
+
+    # string table
+    string_offsets = array('I', [0])
+    encoded_strings = []
+    for value in strings:
+        encoded = value.encode('utf-8')
+        encoded_strings.append(encoded)
+        string_offsets.append(string_offsets[-1] + len(encoded))
+    strings_info = {'offsets': len(sections)}
+    sections.append(string_offsets)
+    strings_info['blob'] = len(sections)
+    sections.append(b''.join(encoded_strings))
+
+    key_index = array('I', sorted(range(len(states)),
+                                  key=lambda index: states[index][key]))
+    key_index_section = len(sections)
+    sections.append(key_index)
+
+    # the header contains the offsets of the sections, which depend on the size of the header
+    section_bytes = [section if isinstance(section, bytes) else to_little_endian(section).tobytes()
+                     for section in sections]
+
+    def build_header(offsets):
+        def locate(section_index):
+            return [offsets[section_index], len(section_bytes[section_index])]
+
+        header = {
+            'kind': kind,
+            'num_records': len(states),
+            'key': key,
+            'strings': {label: locate(index) for label, index in strings_info.items()},
+            'key_index': locate(key_index_section),
+            'columns': [{'name': info['name'],
+                         'type': info['type'],
+                         'sections': {label: locate(index)
+                                      for label, index in info['sections'].items()}}
+                        for info in column_infos]
+        }
+        return json.dumps(header).encode('utf-8')
+
+    offsets = [0] * len(section_bytes)
+    header = build_header(offsets)
+    while True:
+        position = len(MAGIC) + 8 + len(header)
+        new_offsets = []
+        for section in section_bytes:
+            position += -position % 8
+            new_offsets.append(position)
+            position += len(section)
+        new_header = build_header(new_offsets)
+        if len(new_header) == len(header) and new_offsets == offsets:
+            break
+        header = new_header
+        offsets = new_offsets
+
+    # written atomically, a LexiconFile of the previous version may still be memory-mapped
+    def write_file(temp_path):
+        with open(temp_path, 'wb') as outfile:
+            outfile.write(MAGIC)
+            outfile.write(to_little_endian(array('I', [FORMAT_VERSION, len(header)])).tobytes())
+            outfile.write(header)
+            for offset, section in zip(offsets, section_bytes):
+                outfile.write(b'\x00' * (offset - outfile.tell()))
+                outfile.write(section)
+
+    write_atomically(path, write_file)
+
+
+def write_senses(path, senseid_to_sense_obj):
+    """
+    write a dict of sense_id -> odwn_classes.LE to orbn.lex
+    """
+    write_lexicon_file(path,
+                       kind='senses',
+                       key='sense_id',
+                       states=[le_obj.__getstate__()
+                               for le_obj in senseid_to_sense_obj.values()],
+                       columns=SENSE_COLUMNS)
+
+
+def write_synsets(path, synset_id_to_synset_obj):
+    """
+    write a dict of synset_id -> odwn_classes.Synset to odwn.lex
+    (synonyms are stored as sense ids)
+    """
+    states = []
+    for synset_obj in synset_id_to_synset_obj.values():
+        state = synset_obj.__getstate__()
+        state['synonyms'] = [le_obj.sense_id for le_obj in synset_obj.synonyms]
+        states.append(state)
+
+    write_lexicon_file(path,
+                       kind='synsets',
+                       key='synset_id',
+                       states=states,
+                       columns=SYNSET_COLUMNS)
+
+
+class LexiconFile(Mapping):
+    """
+    read-only, memory-mapped dict of key -> object
+    that materializes each record the first time it is accessed.
+    """
+
+    def __init__(self, path, kind):
+        self.path = path
+        with open(path, 'rb') as infile:
+            self.mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a lexicon file')
+        version, header_length = self.uint32s(len(MAGIC), 8)
+        if version != FORMAT_VERSION:
+            raise ValueError(f'{path} has format version {version}, supported: {FORMAT_VERSION}')
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self.mm[header_start:header_start + header_length].decode('utf-8'))
+        if self.header['kind'] != kind:
+            raise ValueError(f'{path} contains {self.header["kind"]}, expected: {kind}')
+
+        self.num_records = self.header['num_records']
+        self.string_offsets = self.uint32s(*self.header['strings']['offsets'])
+        self.blob_start = self.header['strings']['blob'][0]
+        self.key_index = self.uint32s(*self.header['key_index'])
+        self.key_column = self.header['key']
+
+        self.columns = dict()
+        for column in self.header['columns']:
+            self.columns[column['name']] = (column['type'],
+                                            {label: self.uint32s(*location)
+                                             for label, location in column['sections'].items()})
+
+        self.index_to_obj = dict()
+        self.derived = dict() # data derived from the (immutable) file, e.g., the lexicon frame (see frame_utils)
+
+    def uint32s(self, offset, length):
+        view = memoryview(self.mm)[offset:offset + length]
+        if sys.byteorder == 'big':
+            return to_little_endian(array('I', view.tobytes()))
+        return view.cast('I')
+
+    def get_string(self, string_id):
+        start = self.blob_start + self.string_offsets[string_id]
+        end = self.blob_start + self.string_offsets[string_id + 1]
+        return self.mm[start:end].decode('utf-8')
+
+    def get_value(self, name, index):
+        """
+        :return: value of attribute for the record at index, NOT_SET if it was not set
+        """
+        column_type, sections = self.columns[name]
+        if column_type in {'str', 'int', 'bool'}:
+            value = sections['values'][index]
+            if value == NONE:
+                return None
+            if value == UNSET:
+                return NOT_SET
+            if column_type == 'str':
+                return self.get_string(value)
+            if column_type == 'bool':
+                return bool(value)
+            return value
+
+        start, end = sections['spans'][2 * index], sections['spans'][2 * index + 1]
+        if start == NONE:
+            return None
+        if start == UNSET:
+            return NOT_SET
+
+        items = [self.get_string(string_id)
+                 for string_id in sections['items'][start:end]]
+        if column_type == 'dict':
+            return dict(zip(items[::2], items[1::2]))
+        if column_type == 'set':
+            return frozenset(items)
+        return items
+
+    def get_state(self, index, exclude=()):
+        """
+        :param int index: record index
+        :param tuple exclude: attributes that are not read
+        """
+        state = dict()
+        for name in self.columns:
+            if name in exclude:
+                continue
+            value = self.get_value(name, index)
+            if value is not NOT_SET:
+                state[name] = value
+        return state
+
+    def iter_column(self, name):
+        """
+        iterate over the values of one attribute for all records in order,
+        without materializing the objects
+        """
+        for index in range(self.num_records):
+            value = self.get_value(name, index)
+            yield None if value is NOT_SET else value
+
+    def find_index(self, key):
+        low, high = 0, self.num_records
+        key_values = self.columns[self.key_column][1]['values']
+        while low < high:
+            middle = (low + high) // 2
+            index = self.key_index[middle]
+            middle_key = self.get_string(key_values[index])
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return index
+        return None
+
+    def get_by_index(self, index):
+        if index not in self.index_to_obj:
+            self.index_to_obj[index] = self.load_record(index)
+        return self.index_to_obj[index]
+
+    def load_record(self, index):
+        """
+        :return: new object for the record at index (not cached)
+        """
+        return self.materialize(self.get_state(index))
+
+    @abstractmethod
+    def materialize(self, state):
+        """
+        :param dict state: attribute -> value of a record (see get_state)
+        :return: new object for the record
+        """
+
+    def close(self):
+        """
+        unmap the file. The objects that were already accessed remain usable,
+        the mapping itself can not be used anymore.
+        """
+        views = [self.string_offsets, self.key_index]
+        for column_type, sections in self.columns.values():
+            views.extend(sections.values())
+        for view in views:
+            if isinstance(view, memoryview): # arrays on big-endian machines
+                view.release()
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, key):
+        if not isinstance(key, str):
+            raise KeyError(key)
+        index = self.find_index(key)
+        if index is None:
+            raise KeyError(key)
+        return self.get_by_index(index)
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self.find_index(key) is not None
+
+    def __iter__(self):
+        return self.iter_column(self.key_column)
+
+    def __len__(self):
+        return self.num_records
+
+    def items(self):
+        return LexiconItemsView(self)
+
+    def values(self):
+        return LexiconValuesView(self)
+
+
+class LexiconItemsView(ItemsView):
+    """
+    iterates in record order instead of looking up every key
+    """
+    def __iter__(self):
+        for index, key in enumerate(self._mapping.iter_column(self._mapping.key_column)):
+            yield key, self._mapping.get_by_index(index)
+
+
+class LexiconValuesView(ValuesView):
+    def __iter__(self):
+        for index in range(len(self._mapping)):
+            yield self._mapping.get_by_index(index)
+
+
+class SenseFile(LexiconFile):
+    """
+    sense_id -> odwn_classes.LE, read from orbn.lex.
+    The free text of a sense (LE.text_attrs: definition, canonical_forms) stays in the memory-mapped
+    string table until it is accessed: the LE objects reference the file as their text pool.
+    """
+    def __init__(self, path):
+        super().__init__(path, kind='senses')
+
+    def load_record(self, index):
+        le_obj = self.materialize(self.get_state(index, exclude=LE.text_attrs))
+        le_obj.set_text_pool(self, index)
+        return le_obj
+
+    def close(self):
+        """
+        load the text attributes of the accessed senses, then unmap the file
+        """
+        for le_obj in self.index_to_obj.values():
+            for attr in LE.text_attrs:
+                le_obj.get_text_attr(attr)
+            le_obj.set_text_pool(None, None)
+        super().close()
+
+    def materialize(self, state):
+        le_obj = LE.__new__(LE)
+        le_obj.__setstate__(state)
+        return le_obj
+
+
+class SynsetFile(LexiconFile):
+    """
+    synset_id -> odwn_classes.Synset, read from odwn.lex.
+    Synonyms are resolved with the provided sense_id -> LE mapping.
+    """
+    def __init__(self, path, senseid_to_sense_obj):
+        super().__init__(path, kind='synsets')
+        self.senseid_to_sense_obj = senseid_to_sense_obj
+
+    def materialize(self, state):
+        state['synonyms'] = [self.senseid_to_sense_obj[sense_id]
+                             for sense_id in state['synonyms']]
+        synset_obj = Synset.__new__(Synset)
+        synset_obj.__setstate__(state)
+        return synset_obj
+
+
+def load_senses(path):
+    """
+    :rtype: SenseFile
+    :return: read-only mapping sense_id -> odwn_classes.LE
+    """
+    return SenseFile(path)
+
+
+def load_synsets(path, senseid_to_sense_obj):
+    """
+    :rtype: SynsetFile
+    :return: read-only mapping synset_id -> odwn_classes.Synset
+    """
+    return SynsetFile(path, senseid_to_sense_obj)
@@ -1,9 +1,10 @@
-import pickle
 from collections import defaultdict
 
 def get_verb_to_phrasal_entries(orbn_sense_id_to_obj,
                                 verbose=0):
     """
+    phrasal verbs with two parts by their verb
+    (see index_utils.PartIndex for the parts of all morpho types)
 
     :param dict orbn_sense_id_to_obj: dict mapping the sense_id to
     an instance of odwn_classes.LE
@@ -40,6 +41,7 @@ def get_verb_to_phrasal_entries(orbn_sense_id_to_obj,
 
 
 if __name__ == "__main__":
-    sense_id_to_sense_obj = pickle.load(open('output/orbn.p', 'rb'))
+    from utils import load_orbn
+    sense_id_to_sense_obj = load_orbn('output/orbn.lex', package_dir='.')
     get_verb_to_phrasal_entries(orbn_sense_id_to_obj=sense_id_to_sense_obj,
                                 verbose=1)
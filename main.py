@@ -2,7 +2,7 @@
 Load RBN as python classes
 
 Usage:
-  main.py --orbn_path=<input_path> --odwn_path=<odwn_path> --output_folder=<output_folder> --allowed_prefixes=<allowed_prefixes> --exclude_sub_NUMBER=<include_sub_NUMBER> --namespace=<namespace> --short_namespace=<short_namespace>
+  main.py --orbn_path=<input_path> --odwn_path=<odwn_path> --output_folder=<output_folder> --allowed_prefixes=<allowed_prefixes> --exclude_sub_NUMBER=<include_sub_NUMBER> --namespace=<namespace> --short_namespace=<short_namespace> [--streaming] [--workers=<workers>] [--export_pickle] [--export_sqlite] [--incremental] [--trace_allocations] [--profile]
 
 Options:
     --orbn_path=<input_path> 'resources/orbn_n-v-a.xml'
@@ -12,17 +12,30 @@ Options:
     --exclude_sub_NUMBER=<include_sub_NUMBER> if True, identifiers that end with sub_NUMBER are not included
     --namespace=<namespace> the RDF namespace, e.g., http://premon.fbk.eu/resource/
     --short_namespace=<short_namespace> e.g., pm
+    --streaming  stream the xml files with lxml.etree.iterparse instead of loading the full trees (bounded memory)
+    --workers=<workers>  number of worker processes that build the LE objects [default: 1]
+    --export_pickle  also write orbn.p and odwn.p as pickles next to orbn.lex and odwn.lex
+    --export_sqlite  also write odwn.sqlite, a SQLite database with indexed senses, synsets and provenance (see database_utils.py)
+    --incremental  only rebuild what changed since the previous build in the output folder (see incremental_utils.py)
+    --trace_allocations  also record the memory allocated by Python per stage in build_trace.json (tracemalloc, slower)
+    --profile  write a cProfile dump per stage to <output_folder>/profile
 
 Example:
     python main.py --orbn_path="resources/orbn_n-v-a.xml" --odwn_path="resources/odwn_orbn_gwg-LMF_1.3.xml" --output_folder="output" --allowed_prefixes="r+c" --exclude_sub_NUMBER="True" --namespace="http://premon.fbk.eu/resource/" --short_namespace="pm"
 """
+import json
 import pickle
 from docopt import docopt
 from pathlib import Path
 from lxml import etree
-from odwn_classes import LE, Synset
 
 import utils
+import ingest_utils
+import incremental_utils
+import lexicon_format
+import trace_utils
+import graph_utils
+import database_utils
 
 
 # load arguments
@@ -31,112 +44,168 @@ print()
 print('PROVIDED ARGUMENTS:')
 print(arguments)
 
+output_dir = Path(arguments['--output_folder'])
+trace_utils.tracer.start(trace_allocations=arguments['--trace_allocations'],
+                         profile_folder=str(output_dir / 'profile') if arguments['--profile'] else None)
+
 # load resource
 orbn_path = arguments['--orbn_path']
 odwn_path = arguments['--odwn_path']
-orbn = etree.parse(orbn_path)
-print(f'loaded: {orbn_path}')
-odwn = etree.parse(odwn_path)
-print(f'loaded: {odwn_path}')
+streaming = arguments['--streaming']
+workers = int(arguments['--workers'])
+if streaming:
+    cdb_lu_els = ingest_utils.iter_xml_elements(orbn_path, ['cdb_lu'])
+    lmf_els = ingest_utils.iter_xml_elements(odwn_path, ingest_utils.LMF_PATHS)
+    print(f'streaming: {orbn_path}')
+    print(f'streaming: {odwn_path}')
+else:
+    with trace_utils.span('parse xml'):
+        orbn = etree.parse(orbn_path)
+        print(f'loaded: {orbn_path}')
+        odwn = etree.parse(odwn_path)
+        print(f'loaded: {odwn_path}')
+        cdb_lu_els = orbn.xpath('cdb_lu')
+        lmf_els = odwn.xpath(ingest_utils.LMF_XPATH)
 allowed_prefixes = set(arguments['--allowed_prefixes'].split('+'))
 exclude_sub_number_ids = arguments['--exclude_sub_NUMBER'] == 'True'
 
-not_added = set()
-# load orbn into classes
 verbose = 1
-sense_id2le_obj = dict()
-
-for le_xml_obj in orbn.xpath('cdb_lu'):
-
-    le_obj = LE(le_xml_obj,
-                arguments['--namespace'],
-                arguments['--short_namespace'],
-                verbose=verbose)
-
-    if le_obj.prefix not in allowed_prefixes:
-        le_obj.add = False
-
-    if all(['_sub_' in le_obj.sense_id,
-            exclude_sub_number_ids]):
-        le_obj.add = False
-
-    if le_obj.add:
-        sense_id2le_obj[le_obj.sense_id] = le_obj
-    else:
-        not_added.add(le_obj.sense_id)
-
-# inspect sense rankings
-inconsistent_ids = utils.get_inconsistent_senseranks(sense_id2le_obj, verbose=verbose)
-for inconsistent_id in inconsistent_ids:
-    del sense_id2le_obj[inconsistent_id]
-
-for inconsistent_id in inconsistent_ids:
-    assert inconsistent_id not in sense_id2le_obj
-
-# load synsets into classes
-synset_id2synset_obj = dict()
-for synset_xml_obj in odwn.xpath('Lexicon/Synset'):
-    synset_obj = Synset(synset_xml_obj)
-    synset_id2synset_obj[synset_obj.synset_id] = synset_obj
-
-
-# load synset information about sense_id
-sense_id2synset_info = dict()
-for le_el in odwn.xpath('Lexicon/LexicalEntry'):
-    sense_el = le_el.find('Sense')
-    sense_id = sense_el.get('id')
-    synset = sense_el.get('synset')
-    if synset is not None:
-        provenance_label = sense_el.get('provenance')
-        provenance_set = set(provenance_label.split('+'))
-
-        assert provenance_label
-        assert provenance_set
-        assert synset
-
-        if synset == 'unknown_000':
-            continue
-
-        if synset in synset_id2synset_obj:
-            sense_id2synset_info[sense_id] = {
-                'synset_id': synset,
-                'provenance_label': provenance_label,
-                'provenance_set': provenance_set
-            }
-        else:
-            if verbose:
-                print(f'{synset} has no Synset xml element in LMF file')
-
-# update both LE and Synset with relation between synonym and synset
-for sense_id, synset_info in sense_id2synset_info.items():
-    if sense_id in sense_id2le_obj:
-        le_obj = sense_id2le_obj[sense_id]
-
-        le_obj.provenance_label = synset_info['provenance_label']
-        le_obj.provenance_set = synset_info['provenance_set']
-        synset_id = synset_info['synset_id']
-        le_obj.synset_id = synset_id
-
-        if synset_id in synset_id2synset_obj:
-            synset_obj = synset_id2synset_obj[synset_id]
-            synset_obj.synonyms.append(le_obj)
-
-output_dir = Path(arguments['--output_folder'])
-orbn_out_path = str(output_dir / 'orbn.p')
-with open(orbn_out_path, 'wb') as outfile:
-    pickle.dump(sense_id2le_obj, outfile)
-print(f'writting orbn information to: {orbn_path}')
+orbn_out_path = str(output_dir / 'orbn.lex')
+odwn_out_path = str(output_dir / 'odwn.lex')
+graph_out_path = str(output_dir / 'odwn_graph.npz')
+state_path = str(output_dir / 'ingest_state.json')
+
+incremental = arguments['--incremental']
+settings = {
+    'namespace': arguments['--namespace'],
+    'short_namespace': arguments['--short_namespace'],
+    'allowed_prefixes': sorted(allowed_prefixes),
+    'exclude_sub_number_ids': exclude_sub_number_ids
+}
+state = None
+previous_senses = previous_synsets = None
+if incremental:
+    state = incremental_utils.load_state(state_path,
+                                         settings,
+                                         output_paths=[orbn_out_path, odwn_out_path],
+                                         verbose=verbose)
+
+if state is not None:
+    with trace_utils.span('incremental rebuild'):
+        previous_senses = lexicon_format.load_senses(orbn_out_path)
+        previous_synsets = lexicon_format.load_synsets(odwn_out_path, previous_senses)
+        sense_id2le_obj, synset_id2synset_obj, not_added, change_report, state = incremental_utils.rebuild_incrementally(
+            cdb_lu_els,
+            lmf_els,
+            previous_senses=previous_senses,
+            previous_synsets=previous_synsets,
+            state=state,
+            namespace=arguments['--namespace'],
+            short_namespace=arguments['--short_namespace'],
+            allowed_prefixes=allowed_prefixes,
+            exclude_sub_number_ids=exclude_sub_number_ids,
+            verbose=verbose)
+    inconsistent_ids = set(state['inconsistent_ids'])
+
+    change_report_path = str(output_dir / 'change_report.json')
+    with open(change_report_path, 'w') as outfile:
+        json.dump(change_report, outfile, indent=2)
+    incremental_utils.print_change_report(change_report)
+    print(f'writting change report to: {change_report_path}')
+else:
+    cdb_lu_fingerprints = dict()
+    synset_fingerprints = dict()
+    sense_fingerprints = dict()
+    if incremental:
+        cdb_lu_els = incremental_utils.iter_fingerprinted(cdb_lu_els,
+                                                          incremental_utils.get_cdb_lu_id,
+                                                          cdb_lu_fingerprints)
+        lmf_els = incremental_utils.iter_lmf_fingerprinted(lmf_els,
+                                                           synset_fingerprints,
+                                                           sense_fingerprints)
+
+    # load orbn into classes (with --streaming, this includes parsing orbn)
+    with trace_utils.span('load_le_objs'):
+        sense_id2le_obj, not_added = ingest_utils.load_le_objs(cdb_lu_els,
+                                                               arguments['--namespace'],
+                                                               arguments['--short_namespace'],
+                                                               allowed_prefixes=allowed_prefixes,
+                                                               exclude_sub_number_ids=exclude_sub_number_ids,
+                                                               workers=workers,
+                                                               verbose=verbose)
+    if incremental:
+        sense_groups = incremental_utils.get_sense_groups(sense_id2le_obj)
+
+    # inspect sense rankings
+    with trace_utils.span('get_inconsistent_senseranks'):
+        inconsistent_ids = utils.get_inconsistent_senseranks(sense_id2le_obj, verbose=verbose)
+        for inconsistent_id in inconsistent_ids:
+            del sense_id2le_obj[inconsistent_id]
+
+    for inconsistent_id in inconsistent_ids:
+        assert inconsistent_id not in sense_id2le_obj
+
+    # load synsets into classes and update both LE and Synset with relation between synonym and synset
+    # (with --streaming, this includes parsing odwn)
+    with trace_utils.span('load_and_link_synsets'):
+        synset_id2synset_obj = ingest_utils.load_and_link_synsets(lmf_els,
+                                                                  sense_id2le_obj,
+                                                                  verbose=verbose)
+
+    if incremental:
+        state = incremental_utils.get_state(settings,
+                                            cdb_lu_fingerprints=cdb_lu_fingerprints,
+                                            synset_fingerprints=synset_fingerprints,
+                                            sense_fingerprints=sense_fingerprints,
+                                            not_added=not_added,
+                                            sense_groups=sense_groups,
+                                            inconsistent_ids=inconsistent_ids)
+
+trace_utils.count('senses added', len(sense_id2le_obj))
+trace_utils.count('senses not added', len(not_added))
+trace_utils.count('inconsistent senses', len(inconsistent_ids))
+trace_utils.count('synsets', len(synset_id2synset_obj))
+trace_utils.count('senses linked to a synset', sum(len(synset_obj.synonyms)
+                                                   for synset_obj in synset_id2synset_obj.values()))
+
+if previous_senses is not None:
+    # the previous orbn.lex and odwn.lex are replaced below
+    previous_synsets.close()
+    previous_senses.close()
+
+with trace_utils.span('write orbn.lex'):
+    lexicon_format.write_senses(orbn_out_path, sense_id2le_obj)
+print(f'writting orbn information to: {orbn_out_path}')
 print(f'# of ids not added due to settings or information not available: {len(not_added)}')
-odwn_out_path = str(output_dir / 'odwn.p')
-with open(odwn_out_path, 'wb') as outfile:
-    pickle.dump(synset_id2synset_obj, outfile)
+with trace_utils.span('write odwn.lex'):
+    lexicon_format.write_synsets(odwn_out_path, synset_id2synset_obj)
 print(f'writting odwn information to: {odwn_out_path}')
-
-
-
-
-
-
-
-
-
+with trace_utils.span('write odwn_graph.npz'):
+    graph_utils.SynsetGraph.build(sense_id2le_obj, synset_id2synset_obj).save(graph_out_path)
+print(f'writting sense <-> synset graph to: {graph_out_path}')
+if incremental:
+    incremental_utils.save_state(state_path, state)
+    print(f'writting ingest state to: {state_path}')
+
+if arguments['--export_pickle']:
+    with trace_utils.span('export pickle'):
+        orbn_pickle_path = str(output_dir / 'orbn.p')
+        with open(orbn_pickle_path, 'wb') as outfile:
+            pickle.dump(sense_id2le_obj, outfile)
+        print(f'writting orbn information to: {orbn_pickle_path}')
+        odwn_pickle_path = str(output_dir / 'odwn.p')
+        with open(odwn_pickle_path, 'wb') as outfile:
+            pickle.dump(synset_id2synset_obj, outfile)
+        print(f'writting odwn information to: {odwn_pickle_path}')
+
+if arguments['--export_sqlite']:
+    with trace_utils.span('export sqlite'):
+        sqlite_path = str(output_dir / 'odwn.sqlite')
+        database_utils.write_database(sqlite_path, sense_id2le_obj, synset_id2synset_obj)
+        print(f'writting orbn and odwn information to: {sqlite_path}')
+
+trace_path = str(output_dir / 'build_trace.json')
+trace_utils.tracer.save(trace_path)
+trace_utils.tracer.print_summary()
+print(f'writting build trace to: {trace_path}')
+print(f'peak memory (RSS) with streaming={streaming}: {trace_utils.format_mb(utils.get_peak_rss_mb())}')
@@ -1,3 +1,33 @@
+import sys
+from collections import namedtuple
+
+
+LEConfig = namedtuple('LEConfig', ['namespace', 'abbreviated_namespace', 'verbose'])
+key_to_le_config = dict()
+
+
+def get_le_config(namespace, abbreviated_namespace, verbose):
+    """
+    one LEConfig is shared by all LE objects with the same settings,
+    instead of storing the settings on every sense
+
+    :rtype: LEConfig
+    """
+    key = (namespace, abbreviated_namespace, verbose)
+    if key not in key_to_le_config:
+        key_to_le_config[key] = LEConfig(*key)
+    return key_to_le_config[key]
+
+
+def intern_if_str(value):
+    """
+    intern low-cardinality strings, e.g., part of speech or morpho_type,
+    so that all senses share one string object per value
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
 
 def split_morphostructure(morphostructure, lemma, verbose=0):
     parts = []
@@ -21,6 +51,70 @@ def split_morphostructure(morphostructure, lemma, verbose=0):
 
     return parts
 
+# the child elements of a cdb_lu element that LE reads, as nested dicts of tags
+CDB_LU_PATHS = {
+    'form': {},
+    'sem-definition': {'sem-def': {},
+                       'sem-def-noun': {'sem-specificae': {}}},
+    'semantics_verb': {'sem-type': {},
+                       'sem-caseframe': {'caseframe': {}}},
+    'semantics_noun': {'sem-type': {}},
+    'semantics_adj': {'sem-type': {},
+                      'sem-resume': {}},
+    'examples': {'example': {'form_example': {'canonicalform': {}}}},
+}
+for rbn_pos in ('noun', 'verb', 'adj'):
+    CDB_LU_PATHS[f'morphology_{rbn_pos}'] = {'morpho-type': {},
+                                             'morpho-structure': {}}
+    CDB_LU_PATHS[f'syntax_{rbn_pos}'] = {'sy-article': {}}
+
+# paths of which every element is collected, each with the fields of its own subtree
+REPEATED_PATHS = {('examples', 'example')}
+
+
+def get_cdb_lu_fields(element, paths=CDB_LU_PATHS, prefix=()):
+    """
+    visit the relevant part of the subtree of a cdb_lu element once,
+    instead of one element.find per attribute of LE
+
+    :param lxml.etree._Element element: cdb_lu xml element
+    :param dict paths: tag -> paths below that tag (see CDB_LU_PATHS)
+
+    :rtype: dict
+    :return: path (tuple of tags) -> first element with that path, as returned by element.find('/'.join(path)),
+    and for the paths in REPEATED_PATHS: path -> list of (element, fields of its subtree)
+    """
+    fields = dict()
+    collect_fields(element, paths, prefix, fields)
+    return fields
+
+
+def collect_fields(element, paths, prefix, fields):
+    for child in element:
+        tag = child.tag
+        if tag not in paths: # also skips comments, of which the tag is not a string
+            continue
+        path = prefix + (tag,)
+        if path in REPEATED_PATHS:
+            fields.setdefault(path, []).append((child, get_cdb_lu_fields(child, paths[tag])))
+            continue
+        if path not in fields:
+            fields[path] = child
+        if paths[tag]:
+            collect_fields(child, paths[tag], path, fields)
+
+
+def get_text_of_path(fields, path):
+    """
+    :rtype: str
+    :return: text of the first element with the path, None if there is no such element
+    """
+    el = fields.get(path)
+    if el is None:
+        return None
+    return el.text
+
+
 def extract_attribute_value_if_el_is_not_none(els, attribute_label, verbose=0):
     """
     given xml element.
@@ -55,6 +149,10 @@ class Synset:
     """
 
     """
+    __slots__ = ('ili',
+                 'synset_id',
+                 'definition',
+                 'synonyms')
 
     def __init__(self, synset_xml_obj):
         self.ili = self.get_ili(synset_xml_obj)
@@ -71,6 +169,14 @@ class Synset:
                           for rbn_obj in self.synonyms}
         }
 
+    def __getstate__(self):
+        return {attr: getattr(self, attr)
+                for attr in self.__slots__}
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
     def get_ili(self, synset_xml_obj):
         return synset_xml_obj.get('ili')
 
@@ -90,6 +196,51 @@ class LE:
     """
 
     """
+    __slots__ = ('config', # LEConfig shared by all senses: namespace, abbreviated_namespace, verbose
+                 'add',
+                 'sense_id',
+                 'prefix',
+                 'c_seq_nr',
+                 'lemma',
+                 'article',
+                 'parts',
+                 'sense_label',
+                 'definition_value', # see the definition property
+                 'rbn_pos',
+                 'simple_pos',
+                 'morpho_type',
+                 'lu_type',
+                 'morpho_structure',
+                 'fn_pos',
+                 'rbn_type',
+                 'rbn_feature_set',
+                 'separable',
+                 'provenance_set',
+                 'provenance_label',
+                 'synset_id',
+                 'canonical_forms_value', # see the canonical_forms property
+                 'sem_type',
+                 'text_pool', # e.g., lexicon_format.SenseFile from which the text attributes are loaded
+                 'text_index') # index of the sense in text_pool
+
+    # attributes with few distinct values that are interned
+    categorical_attrs = ('prefix',
+                         'c_seq_nr',
+                         'article',
+                         'rbn_pos',
+                         'simple_pos',
+                         'morpho_type',
+                         'lu_type',
+                         'fn_pos',
+                         'rbn_type',
+                         'rbn_feature_set',
+                         'provenance_label',
+                         'sem_type')
+
+    # free-text attributes that are only loaded from text_pool when they are accessed
+    text_attrs = ('definition',
+                  'canonical_forms')
+
     def __init__(self,
                  le_xml_obj,
                  namespace,
@@ -97,19 +248,17 @@ class LE:
                  verbose=0):
 
         self.add = True # if set to False, sense will not be used
-        self.namespace = namespace
-        self.abbreviated_namespace = abbreviated_namespace
+        self.config = get_le_config(namespace, abbreviated_namespace, verbose)
 
         self.sense_id = le_xml_obj.get('c_lu_id')
         self.prefix = self.sense_id[0]
-        self.c_seq_nr = le_xml_obj.get('c_seq_nr')
+        self.c_seq_nr = intern_if_str(le_xml_obj.get('c_seq_nr'))
         assert self.sense_id
 
-        self.verbose = verbose
-
-        self.lemma = self.get_lemma(le_xml_obj)
+        fields = get_cdb_lu_fields(le_xml_obj)
+        self.lemma = self.get_lemma(fields)
         self.article = None
-        self.parts = []
+        self.parts = ()
 
         self.sense_label = None
         self.definition = None
@@ -126,32 +275,132 @@ class LE:
         self.provenance_label = None # how the synonym was added to a synset
         self.synset_id = None # synset id to which it belongs in ODWN
 
-        self.canonical_forms = self.get_canonical_forms(le_xml_obj)
+        self.canonical_forms = self.get_canonical_forms(fields)
 
-        self.rbn_pos = self.get_rbn_pos(le_xml_obj)
+        self.rbn_pos = self.get_rbn_pos(fields)
         if self.rbn_pos is not None:
-            self.article = self.get_article(le_xml_obj)
+            self.article = self.get_article(fields)
             self.simple_pos = self.get_simple_pos()
-            self.definition = self.get_definition(le_xml_obj)
+            self.definition = self.get_definition(fields)
             self.fn_pos = self.get_fn_pos()
             self.sense_label = f'{self.lemma}-{self.simple_pos}-{self.c_seq_nr}'
-            self.morpho_type = self.get_morpho_type(le_xml_obj)
+            self.morpho_type = self.get_morpho_type(fields)
             self.lu_type = self.get_lu_type()
-            self.sem_type = self.get_sem_type(le_xml_obj)
-            self.morpho_structure = self.get_morpho_structure(le_xml_obj)
-            self.parts = split_morphostructure(morphostructure=self.morpho_structure,
-                                               lemma=self.lemma)
-
-            self.full_rdf_uri = f'{self.namespace}RBN-{self.sense_label}'
-            self.short_rdf_uri = f'({self.abbreviated_namespace})RBN-{self.sense_label}'
+            self.sem_type = self.get_sem_type(fields)
+            self.morpho_structure = self.get_morpho_structure(fields)
+            self.parts = tuple(split_morphostructure(morphostructure=self.morpho_structure,
+                                                     lemma=self.lemma))
 
         if self.simple_pos == 'v':
-            self.rbn_feature_set = self.get_rbn_feature_set(le_xml_obj)
+            self.rbn_feature_set = self.get_rbn_feature_set(fields)
             #self.separable = self.get_separable(le_xml_obj)
 
+        for attr in self.categorical_attrs:
+            value = getattr(self, attr, None)
+            if value is not None:
+                setattr(self, attr, intern_if_str(value))
+
     def __str__(self):
         return str(self.get_hover_info())
 
+    def __getstate__(self):
+        state = {attr: getattr(self, attr)
+                 for attr in self.__slots__
+                 if attr not in {'config', 'definition_value', 'canonical_forms_value', 'text_pool', 'text_index'}
+                 and hasattr(self, attr)}
+        for attr in self.text_attrs:
+            if hasattr(self, attr):
+                state[attr] = getattr(self, attr)
+        state.update(self.config._asdict())
+        return state
+
+    def __setstate__(self, state):
+        """
+        also loads pickles of the LE class before it had __slots__
+        """
+        state = dict(state)
+        self.config = get_le_config(state.pop('namespace'),
+                                    state.pop('abbreviated_namespace'),
+                                    state.pop('verbose'))
+        state.pop('full_rdf_uri', None)
+        state.pop('short_rdf_uri', None)
+        state['parts'] = tuple(state['parts'])
+
+        for attr, value in state.items():
+            if attr in self.categorical_attrs:
+                value = intern_if_str(value)
+            setattr(self, attr, value)
+
+    def set_text_pool(self, text_pool, text_index):
+        """
+        load the text attributes (see text_attrs) lazily
+
+        :param text_pool: object with a method get_value(attr, text_index), e.g., lexicon_format.SenseFile
+        :param int text_index: index of this sense in text_pool
+        """
+        self.text_pool = text_pool
+        self.text_index = text_index
+
+    def get_text_attr(self, attr):
+        value_attr = f'{attr}_value'
+        if not hasattr(self, value_attr):
+            if getattr(self, 'text_pool', None) is None:
+                raise AttributeError(attr)
+            setattr(self, value_attr, self.text_pool.get_value(attr, self.text_index))
+        return getattr(self, value_attr)
+
+    @property
+    def definition(self):
+        return self.get_text_attr('definition')
+
+    @definition.setter
+    def definition(self, definition):
+        self.definition_value = definition
+
+    @property
+    def canonical_forms(self):
+        return self.get_text_attr('canonical_forms')
+
+    @canonical_forms.setter
+    def canonical_forms(self, canonical_forms):
+        self.canonical_forms_value = canonical_forms
+
+    @property
+    def namespace(self):
+        return self.config.namespace
+
+    @namespace.setter
+    def namespace(self, namespace):
+        self.config = get_le_config(namespace, self.config.abbreviated_namespace, self.config.verbose)
+
+    @property
+    def abbreviated_namespace(self):
+        return self.config.abbreviated_namespace
+
+    @abbreviated_namespace.setter
+    def abbreviated_namespace(self, abbreviated_namespace):
+        self.config = get_le_config(self.config.namespace, abbreviated_namespace, self.config.verbose)
+
+    @property
+    def verbose(self):
+        return self.config.verbose
+
+    @verbose.setter
+    def verbose(self, verbose):
+        self.config = get_le_config(self.config.namespace, self.config.abbreviated_namespace, verbose)
+
+    @property
+    def full_rdf_uri(self):
+        if self.sense_label is None:
+            raise AttributeError('full_rdf_uri is only available for senses with a part of speech')
+        return f'{self.namespace}RBN-{self.sense_label}'
+
+    @property
+    def short_rdf_uri(self):
+        if self.sense_label is None:
+            raise AttributeError('short_rdf_uri is only available for senses with a part of speech')
+        return f'({self.abbreviated_namespace})RBN-{self.sense_label}'
+
 
     def get_hover_info(self):
         return {
@@ -211,25 +460,12 @@ class LE:
 
         return lu, attributes_to_annotate
 
-    def get_morpho_type(self, le_xml_obj):
-        morpho_type = None
-        morph_type_el = le_xml_obj.find(f'morphology_{self.rbn_pos}/morpho-type')
-
-        if morph_type_el is not None:
-            morpho_type = morph_type_el.text
-
-        return morpho_type
-
+    def get_morpho_type(self, fields):
+        return get_text_of_path(fields, (f'morphology_{self.rbn_pos}', 'morpho-type'))
 
-    def get_article(self, le_xml_obj):
-        article_el = le_xml_obj.find(f'syntax_{self.rbn_pos}/sy-article')
 
-        if article_el is None:
-            article = None
-        else:
-            article = article_el.text
-
-        return article
+    def get_article(self, fields):
+        return get_text_of_path(fields, (f'syntax_{self.rbn_pos}', 'sy-article'))
 
 
     def get_lu_type(self):
@@ -323,8 +559,8 @@ class LE:
         return lexemes, complete
 
 
-    def get_lemma(self, le_xml_obj):
-        form_el = le_xml_obj.find('form')
+    def get_lemma(self, fields):
+        form_el = fields.get(('form',))
 
         if form_el is None:
             self.add = False
@@ -338,8 +574,8 @@ class LE:
         return lemma
 
 
-    def get_rbn_pos(self, le_xml_obj):
-        form_el = le_xml_obj.find('form')
+    def get_rbn_pos(self, fields):
+        form_el = fields.get(('form',))
 
         if form_el is None:
             self.add = False
@@ -361,17 +597,17 @@ class LE:
         sense_id = sense_el.get('senseId')
         return sense_id
 
-    def get_definition(self, le_xml_obj):
+    def get_definition(self, fields):
         definition = None
 
         if self.simple_pos == 'v':
-            query = 'sem-definition/sem-def'
+            path = ('sem-definition', 'sem-def')
         elif self.simple_pos == 'n':
-            query = 'sem-definition/sem-def-noun/sem-specificae'
+            path = ('sem-definition', 'sem-def-noun', 'sem-specificae')
         elif self.simple_pos == 'a':
-            query = 'semantics_adj/sem-resume'
+            path = ('semantics_adj', 'sem-resume')
 
-        sem_def_el = le_xml_obj.find(query)
+        sem_def_el = fields.get(path)
         if sem_def_el is not None:
             definition = sem_def_el.text
             if definition is None:
@@ -380,11 +616,11 @@ class LE:
 
         return definition
 
-    def get_canonical_forms(self, le_xml_obj):
+    def get_canonical_forms(self, fields):
         canonical_forms = dict()
-        for example_el in le_xml_obj.xpath('examples/example'):
+        for example_el, example_fields in fields.get(('examples', 'example'), ()):
             example_id = example_el.get('r_ex_id')
-            canonicalform_el = example_el.find('form_example/canonicalform')
+            canonicalform_el = example_fields.get(('form_example', 'canonicalform'))
             example = canonicalform_el.text
 
             if example:
@@ -413,34 +649,14 @@ class LE:
             raise ValueError(f'could not map rbn part of speech: {self.rbn_pos}')
 
 
-    def get_sem_type(self, le_xml_obj):
-        rbn_type_info = le_xml_obj.find(f'semantics_{self.rbn_pos}/sem-type')
-
-        if rbn_type_info is None:
-            semantic_type = None
-        else:
-            semantic_type = rbn_type_info.text
-
-        return semantic_type
-
-    def get_morpho_structure(self, le_xml_obj):
-        morpho_struc_el = le_xml_obj.find(f'morphology_{self.rbn_pos}/morpho-structure')
-
-        if morpho_struc_el is None:
-            morphostructure = None
-        else:
-            morphostructure = morpho_struc_el.text
+    def get_sem_type(self, fields):
+        return get_text_of_path(fields, (f'semantics_{self.rbn_pos}', 'sem-type'))
 
-        return morphostructure
+    def get_morpho_structure(self, fields):
+        return get_text_of_path(fields, (f'morphology_{self.rbn_pos}', 'morpho-structure'))
 
-    def get_rbn_feature_set(self, le_xml_obj):
-        rbn_type_info = le_xml_obj.find('semantics_verb/sem-caseframe/caseframe')
-
-        if rbn_type_info is None:
-            rbn_feature_set = None
-        else:
-            rbn_feature_set = rbn_type_info.text
-        return rbn_feature_set
+    def get_rbn_feature_set(self, fields):
+        return get_text_of_path(fields, ('semantics_verb', 'sem-caseframe', 'caseframe'))
 
     def get_separable(self, le_xml_obj):
         morphology_el = le_xml_obj.find('Morphology')
@@ -4,9 +4,87 @@ from rdflib import URIRef
 from rdflib import Literal
 from rdflib import Graph
 
-from collections import defaultdict
-
-
+import os
+import re
+import gzip
+import json
+from collections import defaultdict, deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from . import trace_utils
+    from . import cache_utils
+    from . import lexicon_format
+    from . import triple_dump_utils
+except ImportError:
+    import trace_utils
+    import cache_utils
+    import lexicon_format
+    import triple_dump_utils
+
+LEMON = Namespace('http://lemon-model.net/lemon#')
+DCT = Namespace('http://purl.org/dc/terms/')
+LEXINFO = Namespace('http://www.lexinfo.net/ontology/3.0/lexinfo#')
+
+# Lemon vocabulary used in the conversion, which should be defined in lemon.ttl
+LEMON_VOCABULARY = [LEMON.Lexicon,
+                    LEMON.language,
+                    LEMON.LexicalEntry,
+                    LEMON.Form,
+                    LEMON.writtenRep,
+                    LEMON.canonicalForm,
+                    LEMON.sense,
+                    LEMON.LexicalSense,
+                    LEMON.isSenseOf,
+                    LEMON.definition]
+
+# serializations of write_rbn_in_lemon and export_rbn_in_lemon: rdf_format -> (file extension, media type)
+RDF_FORMATS = {'turtle': ('ttl', 'text/turtle'),
+               'nt': ('nt', 'application/n-triples'),
+               'nquads': ('nq', 'application/n-quads')}
+
+
+def validate_lemon_vocabulary(lemon):
+    """
+    check once that all Lemon terms used in the conversion are defined in lemon.ttl
+
+    :param rdflib.Graph lemon: the Lemon ontology
+    """
+    lemon_subjects = set(lemon.subjects())
+    for term in LEMON_VOCABULARY:
+        assert term in lemon_subjects, f'{term} is not defined in the Lemon ontology'
+
+
+def get_lexicon_uri(namespace, major_version, minor_version):
+    return f'{namespace}lexicon-{major_version}.{minor_version}'
+
+
+def get_lu_uri(lexicon_uri, sense_id):
+    """
+    URI of the LexicalSense of a sense, e.g., http://rdf.cltl.nl/rbn/lexicon-1.0-lu-r_n-123
+    """
+    return f'{lexicon_uri}-lu-{sense_id}'
+
+
+def mint_senseid_to_lu_uri(senseid_to_senseobj,
+                           namespace,
+                           major_version,
+                           minor_version):
+    """
+    compute the mapping from sense id to the URI of its LexicalSense,
+    as created by convert_rbn_to_lemon and write_rbn_in_lemon,
+    without converting or querying anything
+
+    :rtype: dict
+    :return: sense_id -> URI of LexicalSense
+    """
+    lexicon_uri = get_lexicon_uri(namespace, major_version, minor_version)
+    return {sense_id: get_lu_uri(lexicon_uri, sense_id)
+            for sense_id in senseid_to_senseobj}
+
+
+@trace_utils.traced('convert_rbn_to_lemon')
 def convert_rbn_to_lemon(senseid_to_senseobj,
                          namespace,
                          lemon,
@@ -19,25 +97,21 @@ def convert_rbn_to_lemon(senseid_to_senseobj,
 
     assert language == 'nld', f'language should be nld'
 
-    g = Graph()
+    validate_lemon_vocabulary(lemon)
 
-    LEMON = Namespace('http://lemon-model.net/lemon#')
-    DCT = Namespace('http://purl.org/dc/terms/')
-    LEXINFO = Namespace('http://www.lexinfo.net/ontology/3.0/lexinfo#')
+    g = Graph()
 
     g.bind('lemon', LEMON)
     g.bind('dct', DCT)
     g.bind('lexinfo', LEXINFO)
 
-    lexicon_uri = f'{namespace}lexicon-{major_version}.{minor_version}'
+    lexicon_uri = get_lexicon_uri(namespace, major_version, minor_version)
 
     # update lexicon information
     lexicon_uri_obj = URIRef(lexicon_uri)
 
-    assert LEMON.Lexicon in lemon.subjects()
     g.add((lexicon_uri_obj, RDF.type, LEMON.Lexicon))
 
-    assert LEMON.language in lemon.subjects()
     g.add((lexicon_uri_obj, LEMON.language, Literal(language)))
 
     lexicon_label = f'Open Referentie Bestand Nederlands versie {major_version}.{minor_version}: nouns, verbs, and adjectives for senses with prefix c and r'
@@ -52,11 +126,10 @@ def convert_rbn_to_lemon(senseid_to_senseobj,
 
         le_uri = f'{lexicon_uri}-le-{sense_id}'
         leform_uri = f'{lexicon_uri}-leform-{sense_id}'
-        lu_uri = f'{lexicon_uri}-lu-{sense_id}'
+        lu_uri = get_lu_uri(lexicon_uri, sense_id)
 
         # update LE information
         le_obj = URIRef(le_uri)
-        assert LEMON.LexicalEntry in lemon.subjects()
         g.add((le_obj, RDF.type, LEMON.LexicalEntry))
 
         pos_tagset.add(sense_obj.rbn_pos)
@@ -69,55 +142,375 @@ def convert_rbn_to_lemon(senseid_to_senseobj,
         lemma = sense_obj.lemma
         le_form_obj = URIRef(leform_uri)
         g.add((le_form_obj, RDFS.isDefinedBy, le_obj))
-        assert LEMON.Form in lemon.subjects()
         g.add((le_form_obj, RDF.type, LEMON.Form))
-        assert LEMON.writtenRep in lemon.subjects()
 
         g.add((le_form_obj, LEMON.writtenRep, Literal(lemma, lang=language)))
 
-        assert LEMON.canonicalForm in lemon.subjects()
         g.add((le_obj, LEMON.canonicalForm, le_form_obj))
 
         # update LU information
         lu_obj = URIRef(lu_uri)
-        assert LEMON.sense in lemon.subjects()
         g.add((le_obj, LEMON.sense, lu_obj))
-        assert LEMON.LexicalSense in lemon.subjects()
         g.add((lu_obj, RDF.type, LEMON.LexicalSense))
         g.add((lu_obj, DCT.identifier, Literal(sense_obj.sense_id)))
-        assert LEMON.isSenseOf in lemon.subjects()
         g.add((lu_obj, LEMON.isSenseOf, le_obj))
 
         if sense_obj.definition is not None:
-            assert LEMON.definition in lemon.subjects()
             g.add((lu_obj, LEMON.definition, Literal(sense_obj.definition,
                                                      lang=language)))
 
     if output_path is not None:
-        g.serialize(format='turtle', destination=output_path)
+        with trace_utils.span('serialize turtle'):
+            g.serialize(format='turtle', destination=output_path)
         if verbose >= 1:
             print(f'written Lemon representation of RBN ({major_version}.{minor_version} in language {language}) to {output_path}')
 
     return g
 
 
-def load_orbn_in_lemon(orbn_lemon_path):
-    g = Graph()
-    g.parse(orbn_lemon_path, format='turtle')
-    return g
+def nt_uri(uri):
+    return f'<{uri}>'
+
+
+def nt_literal(value, language=None, datatype=None):
+    """
+    N-Triples / Turtle representation of a literal
+    """
+    escaped = (value.replace('\\', '\\\\')
+                    .replace('"', '\\"')
+                    .replace('\n', '\\n')
+                    .replace('\r', '\\r'))
+    if language is not None:
+        return f'"{escaped}"@{language}'
+    if datatype is not None:
+        return f'"{escaped}"^^<{datatype}>'
+    return f'"{escaped}"'
+
+
+def iter_rbn_in_lemon_statements(senseid_to_senseobj,
+                                 namespace,
+                                 major_version,
+                                 minor_version,
+                                 rbn_pos_to_lexinfo,
+                                 language='nld',
+                                 include_lexicon=True):
+    """
+    generate the Lemon representation of RBN (the same triples as convert_rbn_to_lemon)
+    one subject at a time, with terms already in N-Triples syntax
+
+    :param bool include_lexicon: if False, the statements about the Lexicon itself are not generated
+    (e.g., for all shards but the first one, see export_rbn_in_lemon)
+
+    :rtype: generator
+    :return: generator of (subject, [(predicate, object), ...])
+    """
+    lexicon_uri = get_lexicon_uri(namespace, major_version, minor_version)
+    lexicon_label = f'Open Referentie Bestand Nederlands versie {major_version}.{minor_version}: nouns, verbs, and adjectives for senses with prefix c and r'
+    lexicon_version = float(f'{major_version}.{minor_version}')
+
+    rdf_type = nt_uri(RDF.type)
+    rdfs_is_defined_by = nt_uri(RDFS.isDefinedBy)
+    dct_identifier = nt_uri(DCT.identifier)
+    lexinfo_pos = nt_uri(LEXINFO.partOfSpeech)
+    lemon_terms = {term: nt_uri(term) for term in LEMON_VOCABULARY}
+    pos_to_lexinfo_uri = {pos: nt_uri(uri) for pos, uri in rbn_pos_to_lexinfo.items()}
+
+    if include_lexicon:
+        yield nt_uri(lexicon_uri), [
+            (rdf_type, lemon_terms[LEMON.Lexicon]),
+            (lemon_terms[LEMON.language], nt_literal(language)),
+            (nt_uri(RDFS.label), nt_literal(lexicon_label)),
+            (dct_identifier, nt_literal(str(lexicon_version), datatype=XSD.decimal))
+        ]
+
+    for sense_id, sense_obj in senseid_to_senseobj.items():
+        le_uri = nt_uri(f'{lexicon_uri}-le-{sense_id}')
+        leform_uri = nt_uri(f'{lexicon_uri}-leform-{sense_id}')
+        lu_uri = nt_uri(get_lu_uri(lexicon_uri, sense_id))
+
+        yield le_uri, [
+            (rdf_type, lemon_terms[LEMON.LexicalEntry]),
+            (lexinfo_pos, pos_to_lexinfo_uri[sense_obj.rbn_pos]),
+            (lemon_terms[LEMON.canonicalForm], leform_uri),
+            (lemon_terms[LEMON.sense], lu_uri)
+        ]
+
+        yield leform_uri, [
+            (rdfs_is_defined_by, le_uri),
+            (rdf_type, lemon_terms[LEMON.Form]),
+            (lemon_terms[LEMON.writtenRep], nt_literal(sense_obj.lemma, language=language))
+        ]
+
+        lu_statements = [
+            (rdf_type, lemon_terms[LEMON.LexicalSense]),
+            (dct_identifier, nt_literal(sense_obj.sense_id)),
+            (lemon_terms[LEMON.isSenseOf], le_uri)
+        ]
+        if sense_obj.definition is not None:
+            lu_statements.append((lemon_terms[LEMON.definition],
+                                  nt_literal(sense_obj.definition, language=language)))
+        yield lu_uri, lu_statements
+
+
+def write_statements(outfile, statements, rdf_format, graph=None):
+    """
+    write the output of iter_rbn_in_lemon_statements to an open text file
+
+    :param str rdf_format: 'turtle' | 'nt' | 'nquads' (turtle is written with full IRIs, without prefixes)
+    :param str graph: URI of the named graph of the statements (nquads only)
+
+    :rtype: int
+    :return: number of triples
+    """
+    num_triples = 0
+    if rdf_format == 'nquads':
+        graph_suffix = f' {nt_uri(graph)} .\n'
+    for subject, predicate_objects in statements:
+        if rdf_format == 'nt':
+            for predicate, obj in predicate_objects:
+                outfile.write(f'{subject} {predicate} {obj} .\n')
+        elif rdf_format == 'nquads':
+            for predicate, obj in predicate_objects:
+                outfile.write(f'{subject} {predicate} {obj}{graph_suffix}')
+        else:
+            outfile.write(f'{subject} ')
+            outfile.write(' ;\n    '.join(f'{predicate} {obj}'
+                                           for predicate, obj in predicate_objects))
+            outfile.write(' .\n\n')
+        num_triples += len(predicate_objects)
+    return num_triples
+
+
+@trace_utils.traced('write_rbn_in_lemon')
+def write_rbn_in_lemon(senseid_to_senseobj,
+                       namespace,
+                       lemon,
+                       major_version,
+                       minor_version,
+                       rbn_pos_to_lexinfo,
+                       output_path,
+                       language='nld',
+                       rdf_format='turtle',
+                       verbose=0):
+    """
+    write the Lemon representation of RBN directly to a file without building an rdflib Graph.
+    The triples are the same as the ones of convert_rbn_to_lemon, memory use is constant.
+
+    :param str rdf_format: 'turtle' | 'nt' | 'nquads' (in the named graph of the Lexicon)
+
+    :rtype: dict
+    :return: sense_id -> URI of LexicalSense (see mint_senseid_to_lu_uri)
+    """
+    assert language == 'nld', f'language should be nld'
+    assert rdf_format in RDF_FORMATS, f'rdf_format should be one of {set(RDF_FORMATS)}, not {rdf_format}'
+
+    validate_lemon_vocabulary(lemon)
+
+    statements = iter_rbn_in_lemon_statements(senseid_to_senseobj=senseid_to_senseobj,
+                                              namespace=namespace,
+                                              major_version=major_version,
+                                              minor_version=minor_version,
+                                              rbn_pos_to_lexinfo=rbn_pos_to_lexinfo,
+                                              language=language)
+    with open(output_path, 'w', encoding='utf-8') as outfile:
+        num_triples = write_statements(outfile,
+                                       statements,
+                                       rdf_format,
+                                       graph=get_lexicon_uri(namespace, major_version, minor_version))
+
+    if verbose >= 1:
+        print(f'written Lemon representation of RBN ({major_version}.{minor_version} in language {language}) to {output_path} ({num_triples} triples)')
+
+    return mint_senseid_to_lu_uri(senseid_to_senseobj=senseid_to_senseobj,
+                                  namespace=namespace,
+                                  major_version=major_version,
+                                  minor_version=minor_version)
+
+
+def write_lemon_shard(shard_path, senseid_to_senseobj, settings, include_lexicon):
+    """
+    write the Lemon representation of some senses to one shard (see export_rbn_in_lemon)
+
+    :param dict settings: namespace, major_version, minor_version, rbn_pos_to_lexinfo, language,
+    rdf_format and compress (bool, gzip) of the export
+
+    :rtype: dict
+    :return: statistics of the shard
+    """
+    stats = {'path': os.path.basename(shard_path),
+             'senses': len(senseid_to_senseobj),
+             'triples': 0}
+
+    def write_shard(temp_path):
+        statements = iter_rbn_in_lemon_statements(senseid_to_senseobj=senseid_to_senseobj,
+                                                  namespace=settings['namespace'],
+                                                  major_version=settings['major_version'],
+                                                  minor_version=settings['minor_version'],
+                                                  rbn_pos_to_lexinfo=settings['rbn_pos_to_lexinfo'],
+                                                  language=settings['language'],
+                                                  include_lexicon=include_lexicon)
+        if settings['compress']:
+            outfile = gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6)
+        else:
+            outfile = open(temp_path, 'w', encoding='utf-8')
+        with outfile:
+            stats['triples'] = write_statements(outfile,
+                                                statements,
+                                                settings['rdf_format'],
+                                                graph=get_lexicon_uri(settings['namespace'],
+                                                                      settings['major_version'],
+                                                                      settings['minor_version']))
+
+    cache_utils.write_atomically(shard_path, write_shard)
+    stats['bytes'] = os.path.getsize(shard_path)
+    return stats
+
+
+def write_lemon_shard_of_lexicon_file(shard_path, orbn_path, start, end, settings, include_lexicon):
+    """
+    write_lemon_shard for the senses with record index start <= index < end of orbn.lex
+    (run inside a worker process)
+    """
+    senses = lexicon_format.load_senses(orbn_path)
+    le_objs = [senses.load_record(index) for index in range(start, end)]
+    return write_lemon_shard(shard_path,
+                             {le_obj.sense_id: le_obj for le_obj in le_objs},
+                             settings,
+                             include_lexicon)
+
+
+def iter_lemon_shard_tasks(senseid_to_senseobj, output_folder, stem, extension, shard_size):
+    """
+    :rtype: generator
+    :return: generator of (function, arguments before settings and include_lexicon), one per shard
+    """
+    items = iter(senseid_to_senseobj.items())
+    for shard_number, start in enumerate(range(0, max(len(senseid_to_senseobj), 1), shard_size)):
+        shard_path = os.path.join(output_folder, f'{stem}-{shard_number:05d}.{extension}')
+        if isinstance(senseid_to_senseobj, lexicon_format.SenseFile):
+            end = min(start + shard_size, len(senseid_to_senseobj))
+            yield write_lemon_shard_of_lexicon_file, (shard_path, senseid_to_senseobj.path, start, end)
+        else:
+            yield write_lemon_shard, (shard_path, dict(islice(items, shard_size)))
+
+
+@trace_utils.traced('export_rbn_in_lemon')
+def export_rbn_in_lemon(senseid_to_senseobj,
+                        namespace,
+                        lemon,
+                        major_version,
+                        minor_version,
+                        rbn_pos_to_lexinfo,
+                        output_folder,
+                        language='nld',
+                        rdf_format='nt',
+                        compress=False,
+                        shard_size=50000,
+                        workers=1,
+                        verbose=0):
+    """
+    write the Lemon representation of RBN (the triples of write_rbn_in_lemon) to shards
+    of shard_size senses in output_folder, e.g., orbn_1.0-00000.nt.gz, together with manifest.json.
+    Each shard is a complete file in rdf_format that can be loaded on its own.
+    The Lexicon itself is described in the first shard.
+
+    :param dict senseid_to_senseobj: sense_id -> odwn_classes.LE (preferably lexicon_format.SenseFile)
+    :param str rdf_format: 'nt' | 'nquads' (in the named graph of the Lexicon) | 'turtle'
+    :param bool compress: if True, the shards are gzip-compressed
+    :param int workers: if > 1, the shards are written by a process pool of this size
+
+    :rtype: dict
+    :return: the manifest: format, media type, compression, lexicon URI and the statistics of each shard
+    """
+    assert language == 'nld', f'language should be nld'
+    assert rdf_format in RDF_FORMATS, f'rdf_format should be one of {set(RDF_FORMATS)}, not {rdf_format}'
+
+    validate_lemon_vocabulary(lemon)
+
+    stem = f'orbn_{major_version}.{minor_version}'
+    extension, media_type = RDF_FORMATS[rdf_format]
+    if compress:
+        extension += '.gz'
+
+    os.makedirs(output_folder, exist_ok=True)
+    extensions = '|'.join(ext for ext, _ in RDF_FORMATS.values())
+    shard_name = re.compile(re.escape(stem) + rf'-\d{{5}}\.({extensions})(\.gz)?')
+    for name in os.listdir(output_folder): # shards of a previous export, not e.g. orbn_1.0-<fingerprint>.ttl
+        if shard_name.fullmatch(name):
+            os.remove(os.path.join(output_folder, name))
+
+    settings = {'namespace': namespace,
+                'major_version': major_version,
+                'minor_version': minor_version,
+                'rbn_pos_to_lexinfo': rbn_pos_to_lexinfo,
+                'language': language,
+                'rdf_format': rdf_format,
+                'compress': compress}
+    tasks = iter_lemon_shard_tasks(senseid_to_senseobj, output_folder, stem, extension, shard_size)
+
+    shard_stats = []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = deque()
+            for shard_number, (function, arguments) in enumerate(tasks):
+                futures.append(executor.submit(function, *arguments, settings, shard_number == 0))
+                if len(futures) >= 2 * workers:
+                    shard_stats.append(futures.popleft().result())
+            while futures:
+                shard_stats.append(futures.popleft().result())
+    else:
+        for shard_number, (function, arguments) in enumerate(tasks):
+            shard_stats.append(function(*arguments, settings, shard_number == 0))
+
+    lexicon_uri = get_lexicon_uri(namespace, major_version, minor_version)
+    manifest = {'format': rdf_format,
+                'media_type': media_type,
+                'compression': 'gzip' if compress else None,
+                'lexicon': lexicon_uri,
+                'graph': lexicon_uri if rdf_format == 'nquads' else None,
+                'senses': sum(stats['senses'] for stats in shard_stats),
+                'triples': sum(stats['triples'] for stats in shard_stats),
+                'shards': shard_stats}
+    with open(os.path.join(output_folder, 'manifest.json'), 'w') as outfile:
+        json.dump(manifest, outfile, indent=2)
+
+    if verbose >= 1:
+        print(f'exported {manifest["triples"]} triples of {manifest["senses"]} senses to {len(shard_stats)} shards in {output_folder}')
+    return manifest
+
+
+def load_orbn_in_lemon(orbn_lemon_path, cache_dir=None, cache_stem=None, verbose=0):
+    """
+    :param str orbn_lemon_path: Lemon representation of ORBN in turtle
+    :param str cache_dir: if provided, the file is only parsed if it changed and loaded from
+    a triple dump in cache_dir otherwise, the returned graph is then read-only (see triple_dump_utils.py)
+    :param str cache_stem: name of the triple dump, by default the name of orbn_lemon_path with _triples
+
+    :rtype: rdflib.Graph
+    """
+    if cache_dir is None:
+        g = Graph()
+        g.parse(orbn_lemon_path, format='turtle')
+        return g
+
+    if cache_stem is None:
+        cache_stem = os.path.splitext(os.path.basename(orbn_lemon_path))[0] + '_triples'
+    return triple_dump_utils.load_graph_with_dump(orbn_lemon_path,
+                                                  cache_dir=cache_dir,
+                                                  stem=cache_stem,
+                                                  rdf_format='turtle',
+                                                  verbose=verbose)
 
 
 def get_senseid_to_lu_uri(orbn_in_lemon, verbose=0):
-    the_query = """SELECT ?lu ?sense_id WHERE {
-       ?lu <http://purl.org/dc/terms/identifier> ?sense_id
-    }"""
-    results = orbn_in_lemon.query(the_query)
+    """
+    retrieve the mapping from sense id to LexicalSense from a converted graph
+    by matching the dct:identifier triples (without the SPARQL engine)
 
+    :param rdflib.Graph orbn_in_lemon: output of convert_rbn_to_lemon or load_orbn_in_lemon
+    """
     senseid_to_lus = defaultdict(set)
-    for result in results:
-        result_as_dict = result.asdict()
-        lu = result_as_dict['lu']
-        sense_id = result_as_dict['sense_id']
+    for lu, _, sense_id in orbn_in_lemon.triples((None, DCT.identifier, None)):
         senseid_to_lus[sense_id].add(lu.toPython())
 
     senseid_to_lu = {}
@@ -128,4 +521,74 @@ def get_senseid_to_lu_uri(orbn_in_lemon, verbose=0):
     if verbose >= 1:
         print(f'retrieved {len(senseid_to_lu)} mappings from senseid to LexicalSense.')
 
-    return senseid_to_lu
\ No newline at end of file
+    return senseid_to_lu
+
+
+def iter_identifier_statements(orbn_lemon_path):
+    """
+    scan a Lemon file written by write_rbn_in_lemon (turtle or nt, which only use full IRIs)
+    line by line for dct:identifier statements
+
+    :rtype: generator
+    :return: generator of (subject URI, identifier)
+    """
+    dct_identifier = nt_uri(DCT.identifier)
+    subject = None
+    with open(orbn_lemon_path, encoding='utf-8') as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            if line.startswith('@prefix') or line.startswith('PREFIX'):
+                raise ValueError(f'{orbn_lemon_path} uses prefixes, it was not written by write_rbn_in_lemon')
+            if not line[0].isspace():
+                subject, line = line.split(' ', 1)
+            predicate, obj = line.strip().split(' ', 1)
+            if predicate == dct_identifier and obj.startswith('"'):
+                identifier = obj[1:obj.rindex('"')]
+                yield subject[1:-1], identifier
+
+
+def verify_senseid_to_lu_uri(orbn_lemon_path,
+                             senseid_to_uri,
+                             namespace,
+                             major_version,
+                             minor_version,
+                             verbose=0):
+    """
+    check an existing Lemon file against a sense id to LexicalSense mapping.
+    Files written by write_rbn_in_lemon are scanned line by line,
+    other files (e.g., written by rdflib) are parsed and matched without the SPARQL engine.
+
+    :rtype: dict
+    :return: {'missing': sense ids of the mapping that are not in the file,
+              'unexpected': sense ids in the file that are not in the mapping,
+              'different': sense ids with a different URI}
+              all sets are empty if the file and the mapping agree
+    """
+    lexicon_uri = get_lexicon_uri(namespace, major_version, minor_version)
+    try:
+        statements = list(iter_identifier_statements(orbn_lemon_path))
+    except ValueError:
+        statements = [(lu.toPython(), sense_id.toPython())
+                      for lu, _, sense_id in load_orbn_in_lemon(orbn_lemon_path).triples((None, DCT.identifier, None))]
+
+    found = set()
+    result = {'missing': set(),
+              'unexpected': set(),
+              'different': set()}
+    for lu_uri, sense_id in statements:
+        if lu_uri == lexicon_uri: # the identifier of the lexicon is its version
+            continue
+        found.add(sense_id)
+        if sense_id not in senseid_to_uri:
+            result['unexpected'].add(sense_id)
+        elif senseid_to_uri[sense_id] != lu_uri:
+            result['different'].add(sense_id)
+
+    result['missing'] = set(senseid_to_uri) - found
+
+    if verbose >= 1:
+        for label, sense_ids in result.items():
+            print(f'{label}: {len(sense_ids)}')
+
+    return result
@@ -9,20 +9,22 @@ Usage:
    --dataframe_folder=<dataframe_folder>
 
 Options:
-    --path_to_pickled_orbn=<path_to_pickled_orbn> path to pickled ORBN, probably at output/orbn.p
+    --path_to_pickled_orbn=<path_to_pickled_orbn> path to ORBN, probably at output/orbn.lex (or a pickle, e.g., output/orbn.p)
     --dataframe_folder=<dataframe_folder> where to store the dataframes
 
 
 
 Example:
-    python represent_rbn_as_dfs.py --path_to_pickled_orbn="output/orbn.p" --dataframe_folder="output/rbn_dataframes"
+    python represent_rbn_as_dfs.py --path_to_pickled_orbn="output/orbn.lex" --dataframe_folder="output/rbn_dataframes"
 """
+import os
 from docopt import docopt
-import pickle
 from collections import defaultdict, Counter
 
 import pandas
 
+import utils
+
 # load arguments
 arguments = docopt(__doc__)
 print()
@@ -30,7 +32,8 @@ print('PROVIDED ARGUMENTS')
 print(arguments)
 print()
 
-senseid_to_sense_obj = pickle.load(open(arguments['--path_to_pickled_orbn'], 'rb'))
+senseid_to_sense_obj = utils.load_orbn(arguments['--path_to_pickled_orbn'],
+                                       package_dir=os.path.dirname(os.path.realpath(__file__)))
 
 def get_lemma_df(id_to_senseobj):
     """
@@ -0,0 +1,59 @@
+"""
+Serve ORBN and ODWN as an HTTP/JSON lookup service (see service_utils.py for the endpoints)
+
+Usage:
+  serve.py --output_folder=<output_folder> [--host=<host>] [--port=<port>] [--cache_size=<cache_size>] [--namespace=<namespace>] [--major_version=<major_version>] [--minor_version=<minor_version>]
+
+Options:
+    --output_folder=<output_folder>  folder with orbn.lex and odwn.lex (or orbn.p and odwn.p), see main.py
+    --host=<host>  host to listen on [default: 127.0.0.1]
+    --port=<port>  port to listen on [default: 8080]
+    --cache_size=<cache_size>  maximum number of responses in the LRU cache [default: 10000]
+    --namespace=<namespace>  namespace of the sense URIs [default: http://rdf.cltl.nl/rbn/]
+    --major_version=<major_version>  major version of the sense URIs [default: 1]
+    --minor_version=<minor_version>  minor version of the sense URIs [default: 0]
+
+Example:
+    python serve.py --output_folder="output" --port=8080
+    curl "http://127.0.0.1:8080/senses?lemma=fiets&pos=noun"
+"""
+import os
+import asyncio
+from docopt import docopt
+
+from utils import load_orbn, load_odwn
+from index_utils import LemmaIndex
+from rdf_utils import mint_senseid_to_lu_uri
+from service_utils import LookupService, serve
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+    output_folder = arguments['--output_folder']
+
+    orbn_path = os.path.join(output_folder, 'orbn.lex')
+    odwn_path = os.path.join(output_folder, 'odwn.lex')
+    if not os.path.exists(orbn_path):
+        orbn_path = os.path.join(output_folder, 'orbn.p')
+        odwn_path = os.path.join(output_folder, 'odwn.p')
+
+    senseid_to_sense_obj = load_orbn(orbn_path, package_dir)
+    synset_id_to_synset_obj = load_odwn(odwn_path, package_dir, senseid_to_sense_obj)
+    print(f'loaded {len(senseid_to_sense_obj)} senses and {len(synset_id_to_synset_obj)} synsets')
+
+    service = LookupService(senseid_to_sense_obj=senseid_to_sense_obj,
+                            synset_id_to_synset_obj=synset_id_to_synset_obj,
+                            lemma_index=LemmaIndex.build(senseid_to_sense_obj),
+                            senseid_to_uri=mint_senseid_to_lu_uri(senseid_to_sense_obj,
+                                                                  namespace=arguments['--namespace'],
+                                                                  major_version=int(arguments['--major_version']),
+                                                                  minor_version=int(arguments['--minor_version'])),
+                            cache_size=int(arguments['--cache_size']))
+
+    try:
+        asyncio.run(serve(service,
+                          host=arguments['--host'],
+                          port=int(arguments['--port']),
+                          verbose=1))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,236 @@
+"""
+HTTP/JSON lookup service over ORBN and ODWN (see serve.py).
+
+The lexicon is loaded once and served with asyncio (standard library only).
+Responses of GET requests are serialized once and kept in an LRU cache.
+
+Endpoints (GET; repeat a parameter to look up several values at once):
+    /sense?id=<sense_id>                    LE.get_hover_info per sense id
+    /senses?lemma=<lemma>[&pos=<pos>]       hover info of the senses of a lemma (ordered by c_seq_nr),
+                                            pos is rbn_pos (noun | verb | adj) or fn_pos (N | V | A)
+    /synset?id=<synset_id>                  Synset.get_hover_info per synset id
+    /uri?sense_id=<sense_id>                sense id -> URI of the LexicalSense
+    /uri?uri=<uri>                          URI of the LexicalSense -> sense id
+    /stats                                  number of requests and cache statistics
+Batch requests (POST):
+    /batch  with a JSON list of requests, e.g., [{"path": "/sense", "params": {"id": ["r_n-1"]}}],
+            the response is the list of their responses
+"""
+import json
+import asyncio
+from functools import lru_cache
+from urllib.parse import urlsplit, parse_qs
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+def to_json_value(value):
+    """
+    hover info contains sets, e.g., the synonyms of a synset
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return value
+
+
+def get_hover_info(obj):
+    if obj is None:
+        return None
+    return {key: to_json_value(value)
+            for key, value in obj.get_hover_info().items()}
+
+
+class LookupService:
+    """
+    computes the responses of the endpoints, see the module docstring
+    """
+    def __init__(self,
+                 senseid_to_sense_obj,
+                 synset_id_to_synset_obj,
+                 lemma_index,
+                 senseid_to_uri,
+                 cache_size=10000):
+        """
+        :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE (or lexicon_format.SenseFile)
+        :param dict synset_id_to_synset_obj: synset_id -> odwn_classes.Synset (or lexicon_format.SynsetFile)
+        :param index_utils.LemmaIndex lemma_index: index of the senses by lemma and part of speech
+        :param dict senseid_to_uri: sense_id -> URI, see rdf_utils.mint_senseid_to_lu_uri
+        :param int cache_size: maximum number of serialized responses in the LRU cache
+        """
+        self.senseid_to_sense_obj = senseid_to_sense_obj
+        self.synset_id_to_synset_obj = synset_id_to_synset_obj
+        self.lemma_index = lemma_index
+        self.senseid_to_uri = senseid_to_uri
+        self.uri_to_senseid = {uri: sense_id
+                               for sense_id, uri in senseid_to_uri.items()}
+
+        self.path_to_handler = {
+            '/sense': self.get_senses_by_id,
+            '/senses': self.get_senses_by_lemma,
+            '/synset': self.get_synsets_by_id,
+            '/uri': self.resolve_uris,
+        }
+        self.num_requests = 0
+        self.get_cached_response = lru_cache(maxsize=cache_size)(self.get_response)
+
+    def get_senses_by_id(self, params):
+        return {sense_id: get_hover_info(self.senseid_to_sense_obj.get(sense_id))
+                for sense_id in params.get('id', [])}
+
+    def get_senses_by_lemma(self, params):
+        pos_list = params.get('pos', [None])
+        return {lemma: [get_hover_info(self.senseid_to_sense_obj.get(sense_id))
+                        for pos in pos_list
+                        for sense_id in self.lemma_index.get_sense_ids(lemma, pos)]
+                for lemma in params.get('lemma', [])}
+
+    def get_synsets_by_id(self, params):
+        return {synset_id: get_hover_info(self.synset_id_to_synset_obj.get(synset_id))
+                for synset_id in params.get('id', [])}
+
+    def resolve_uris(self, params):
+        result = {sense_id: self.senseid_to_uri.get(sense_id)
+                  for sense_id in params.get('sense_id', [])}
+        result.update({uri: self.uri_to_senseid.get(uri)
+                       for uri in params.get('uri', [])})
+        return result
+
+    def get_stats(self):
+        cache_info = self.get_cached_response.cache_info()
+        return {'requests': self.num_requests,
+                'cache_hits': cache_info.hits,
+                'cache_misses': cache_info.misses,
+                'cache_size': cache_info.currsize,
+                'cache_max_size': cache_info.maxsize}
+
+    def get_response(self, target):
+        """
+        :param str target: path and query string, e.g., '/sense?id=r_n-1'
+
+        :rtype: tuple
+        :return: (HTTP status, serialized JSON)
+        """
+        url = urlsplit(target)
+        if url.path not in self.path_to_handler:
+            return 404, json.dumps({'error': f'unknown path {url.path}'}).encode('utf-8')
+        result = self.path_to_handler[url.path](parse_qs(url.query))
+        return 200, json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+    def get_batch_response(self, body):
+        """
+        :param bytes body: JSON list of {"path": ..., "params": {...}}
+        """
+        try:
+            requests = json.loads(body)
+            results = []
+            for request in requests:
+                params = {key: value if isinstance(value, list) else [value]
+                          for key, value in request.get('params', {}).items()}
+                handler = self.path_to_handler.get(request['path'])
+                results.append(None if handler is None else handler(params))
+        except (ValueError, TypeError, KeyError, AttributeError) as error:
+            return 400, json.dumps({'error': f'invalid batch request: {error}'}).encode('utf-8')
+        return 200, json.dumps(results, ensure_ascii=False).encode('utf-8')
+
+    def respond(self, method, target, body):
+        """
+        :rtype: tuple
+        :return: (HTTP status, serialized JSON)
+        """
+        self.num_requests += 1
+        if method == 'GET' and target == '/stats':
+            return 200, json.dumps(self.get_stats()).encode('utf-8')
+        if method == 'GET':
+            return self.get_cached_response(target)
+        if method == 'POST' and urlsplit(target).path == '/batch':
+            return self.get_batch_response(body)
+        return 405, json.dumps({'error': f'{method} is not supported'}).encode('utf-8')
+
+
+def serialize_response(status, body, keep_alive):
+    headers = [f'HTTP/1.1 {status} {HTTP_REASONS[status]}',
+               'Content-Type: application/json; charset=utf-8',
+               f'Content-Length: {len(body)}',
+               f'Connection: {"keep-alive" if keep_alive else "close"}']
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+
+async def handle_connection(service, reader, writer):
+    """
+    serve the HTTP/1.1 requests of one connection (keep-alive is supported)
+    """
+    try:
+        while True:
+            try:
+                request_line = await reader.readline()
+            except ValueError: # longer than the limit of the StreamReader (asyncio.LimitOverrunError)
+                writer.write(serialize_response(400, b'{"error": "request line too long"}', keep_alive=False))
+                break
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                writer.write(serialize_response(400, b'{"error": "invalid request line"}', keep_alive=False))
+                break
+
+            headers = dict()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if line in {b'\r\n', b'\n', b''}:
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+            except ValueError: # a header line longer than the limit of the StreamReader
+                writer.write(serialize_response(431, b'{"error": "header line too long"}', keep_alive=False))
+                break
+
+            body = b''
+            if 'content-length' in headers:
+                try:
+                    content_length = int(headers['content-length'])
+                    if content_length < 0:
+                        raise ValueError(content_length)
+                except ValueError:
+                    # the end of the body is unknown, so the connection can not be reused
+                    writer.write(serialize_response(400, b'{"error": "invalid Content-Length"}', keep_alive=False))
+                    break
+                body = await reader.readexactly(content_length)
+
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+            try:
+                status, response_body = service.respond(method, target, body)
+            except Exception as error: # one failing request does not end the connection
+                status = 500
+                response_body = json.dumps({'error': f'{type(error).__name__}: {error}'}).encode('utf-8')
+            writer.write(serialize_response(status, response_body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host='127.0.0.1', port=8080, verbose=0):
+    """
+    serve the LookupService until the process is stopped
+    """
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(service, reader, writer),
+                                        host=host,
+                                        port=port)
+    if verbose:
+        print(f'serving on http://{host}:{port}')
+    async with server:
+        await server.serve_forever()
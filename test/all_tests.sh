@@ -1,4 +1,8 @@
 python convert_to_rdf.py
 python load_orbn_in_lemon.py
 python load_orbn.py
-python get_senseid_to_lu.py
\ No newline at end of file
+python get_senseid_to_lu.py
+python link_synsets.py
+python synset_graph.py
+python write_and_load_lexicon.py
+python incremental_rebuild.py
\ No newline at end of file
@@ -1,6 +1,11 @@
 import sys
 import os
+import glob
 sys.path.insert(0, '../../')
 
-os.remove('../output/orbn_1.0.ttl')
-import ODWN_reader
\ No newline at end of file
+# remove the cached Lemon representation and senseid to URI mapping to force a new conversion
+for cached_path in glob.glob('../output/orbn_1.0-*.ttl') + glob.glob('../output/orbn_1.0_senseid_to_uri-*.json'):
+    os.remove(cached_path)
+import ODWN_reader
+ODWN_reader.build_orbn_lemon()
+ODWN_reader.preload(['senseid_to_uri'])
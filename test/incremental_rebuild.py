@@ -0,0 +1,108 @@
+import sys
+sys.path.insert(0, '..')
+sys.path.insert(0, '../benchmarks')
+
+import os
+import json
+import subprocess
+import tempfile
+
+from lxml import etree
+
+import lexicon_format
+import synthetic_data
+
+main_args = ['--allowed_prefixes=r+c',
+             '--exclude_sub_NUMBER=True',
+             '--namespace=http://premon.fbk.eu/resource/',
+             '--short_namespace=pm']
+
+
+def run_main(orbn_path, odwn_path, output_folder, incremental):
+    os.makedirs(output_folder, exist_ok=True)
+    command = [sys.executable, os.path.join('..', 'main.py'),
+               f'--orbn_path={orbn_path}',
+               f'--odwn_path={odwn_path}',
+               f'--output_folder={output_folder}'] + main_args
+    if incremental:
+        command.append('--incremental')
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def load_output(output_folder):
+    """
+    :return: (sense_id -> state, synset_id -> (ili, definition, sense ids of synonyms))
+    """
+    with lexicon_format.load_senses(os.path.join(output_folder, 'orbn.lex')) as senses, \
+            lexicon_format.load_synsets(os.path.join(output_folder, 'odwn.lex'), senses) as synsets:
+        sense_id2state = {sense_id: le_obj.__getstate__()
+                          for sense_id, le_obj in senses.items()}
+        synset_id2info = {synset_id: (synset_obj.ili,
+                                      synset_obj.definition,
+                                      [le_obj.sense_id for le_obj in synset_obj.synonyms])
+                          for synset_id, synset_obj in synsets.items()}
+    return sense_id2state, synset_id2info
+
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    orbn_path = os.path.join(temp_dir, 'orbn.xml')
+    odwn_path = os.path.join(temp_dir, 'odwn.xml')
+    synthetic_data.write_orbn(orbn_path, num_senses=500)
+    synthetic_data.write_lmf(odwn_path, num_senses=500)
+
+    incremental_folder = os.path.join(temp_dir, 'incremental')
+    run_main(orbn_path, odwn_path, incremental_folder, incremental=True)
+
+    # new release: one sense added, one changed and one removed
+    orbn = etree.parse(orbn_path)
+    odwn = etree.parse(odwn_path)
+    lexicon = odwn.find('Lexicon')
+    sense_id2le_el = {le_el.find('Sense').get('id'): le_el
+                      for le_el in lexicon.findall('LexicalEntry')}
+    synset_ids = [synset_el.get('id') for synset_el in lexicon.findall('Synset')]
+    cdb_lu_els = [cdb_lu_el for cdb_lu_el in orbn.getroot().findall('cdb_lu')
+                  if cdb_lu_el.get('c_lu_id')[0] in {'r', 'c'}
+                  and cdb_lu_el.find('.//sem-def') is not None]
+    changed_el, removed_el, copied_el = cdb_lu_els[:3]
+    changed_id = changed_el.get('c_lu_id')
+    removed_id = removed_el.get('c_lu_id')
+    added_id = 'r_n-added'
+
+    changed_el.find('.//sem-def').text += ' changed'
+    sense_id2le_el[changed_id].find('Sense').set('synset', synset_ids[-1])
+
+    orbn.getroot().remove(removed_el)
+    lexicon.remove(sense_id2le_el[removed_id])
+
+    added_el = etree.fromstring(etree.tostring(copied_el, with_tail=False))
+    added_el.set('c_lu_id', added_id)
+    added_el.set('c_seq_nr', '100')
+    orbn.getroot().append(added_el)
+    added_le_el = etree.Element('LexicalEntry', id='le-added')
+    etree.SubElement(added_le_el, 'Sense', id=added_id, synset=synset_ids[0], provenance='pwn')
+    lexicon.insert(lexicon.index(lexicon.find('Synset')), added_le_el)
+
+    new_orbn_path = os.path.join(temp_dir, 'new_orbn.xml')
+    new_odwn_path = os.path.join(temp_dir, 'new_odwn.xml')
+    orbn.write(new_orbn_path, xml_declaration=True, encoding='UTF-8')
+    odwn.write(new_odwn_path, xml_declaration=True, encoding='UTF-8')
+
+    full_folder = os.path.join(temp_dir, 'full')
+    run_main(new_orbn_path, new_odwn_path, full_folder, incremental=False)
+    run_main(new_orbn_path, new_odwn_path, incremental_folder, incremental=True)
+
+    with open(os.path.join(incremental_folder, 'change_report.json')) as infile:
+        change_report = json.load(infile)
+    assert added_id in change_report['senses']['added'], change_report['senses']
+    assert changed_id in change_report['senses']['changed'], change_report['senses']
+    assert removed_id in change_report['senses']['removed'], change_report['senses']
+
+    full_senses, full_synsets = load_output(full_folder)
+    incremental_senses, incremental_synsets = load_output(incremental_folder)
+    assert added_id in full_senses and removed_id not in full_senses
+    assert list(incremental_senses) == list(full_senses)
+    for sense_id, state in full_senses.items():
+        assert incremental_senses[sense_id] == state, sense_id
+    assert incremental_synsets == full_synsets
+
+print(f'incremental == full rebuild: {len(full_senses)} senses, {len(full_synsets)} synsets')
@@ -0,0 +1,47 @@
+import sys
+sys.path.insert(0, '..')
+
+from lxml import etree
+
+import ingest_utils
+from odwn_classes import LE
+
+lmf = etree.fromstring(b'''<LexicalResource><Lexicon>
+<LexicalEntry id="le-1"><Sense id="r_n-1" synset="s1" provenance="pwn"/></LexicalEntry>
+<LexicalEntry id="le-2"><Sense id="r_n-2" synset="s1" provenance="pwn"/></LexicalEntry>
+<LexicalEntry id="le-3"><Sense id="r_n-1" synset="s2" provenance="cdb"/></LexicalEntry>
+<LexicalEntry id="le-4"><Sense id="r_n-2" synset="s_missing" provenance="cdb"/></LexicalEntry>
+<LexicalEntry id="le-5"><Sense id="r_n-3" synset="s_missing" provenance="cdb"/></LexicalEntry>
+<Synset id="s1"/>
+<Synset id="s2"/>
+</Lexicon></LexicalResource>''')
+
+
+def get_le_obj(sense_id):
+    le_obj = LE.__new__(LE)
+    le_obj.sense_id = sense_id
+    ingest_utils.unlink_sense(le_obj)
+    return le_obj
+
+
+sense_id2le_obj = {sense_id: get_le_obj(sense_id)
+                   for sense_id in ['r_n-1', 'r_n-2', 'r_n-3']}
+synset_id2synset_obj = ingest_utils.load_and_link_synsets(lmf.xpath(ingest_utils.LMF_XPATH), sense_id2le_obj)
+synonyms = {synset_id: [le_obj.sense_id for le_obj in synset_obj.synonyms]
+            for synset_id, synset_obj in synset_id2synset_obj.items()}
+
+# a sense id in two LexicalEntry elements is linked by the last one
+assert synonyms['s2'] == ['r_n-1'], synonyms
+assert sense_id2le_obj['r_n-1'].synset_id == 's2'
+assert sense_id2le_obj['r_n-1'].provenance_label == 'cdb'
+
+# a later LexicalEntry with a synset without Synset element does not replace the link
+assert synonyms['s1'] == ['r_n-2'], synonyms
+assert sense_id2le_obj['r_n-2'].synset_id == 's1'
+assert sense_id2le_obj['r_n-2'].provenance_label == 'pwn'
+
+# a sense of a synset without Synset element is not linked
+assert sense_id2le_obj['r_n-3'].synset_id is None
+assert sense_id2le_obj['r_n-3'].provenance_set is None
+
+print(synonyms)
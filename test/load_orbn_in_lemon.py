@@ -3,6 +3,6 @@ sys.path.insert(0, '../../')
 
 import ODWN_reader
 
-orbn_in_lemon = ODWN_reader.load_orbn_in_lemon(ODWN_reader.orbn_lemon_path)
+orbn_in_lemon = ODWN_reader.orbn_in_lemon
 
 print(orbn_in_lemon)
\ No newline at end of file
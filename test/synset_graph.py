@@ -0,0 +1,38 @@
+import sys
+sys.path.insert(0, '..')
+
+from lxml import etree
+
+import ingest_utils
+from odwn_classes import LE
+from graph_utils import SynsetGraph
+
+lmf = etree.fromstring(b'''<LexicalResource><Lexicon>
+<LexicalEntry id="le-1"><Sense id="r_n-1" synset="s1" provenance="pwn"/></LexicalEntry>
+<LexicalEntry id="le-2"><Sense id="r_n-2" synset="s1" provenance="pwn"/></LexicalEntry>
+<LexicalEntry id="le-3"><Sense id="r_n-3" synset="s2" provenance="cdb"/></LexicalEntry>
+<Synset id="s1" ili="i1"/>
+<Synset id="s2" ili="i2"/>
+</Lexicon></LexicalResource>''')
+
+
+def get_le_obj(sense_id):
+    le_obj = LE.__new__(LE)
+    le_obj.sense_id = sense_id
+    ingest_utils.unlink_sense(le_obj)
+    return le_obj
+
+
+sense_id2le_obj = {sense_id: get_le_obj(sense_id)
+                   for sense_id in ['r_n-1', 'r_n-2', 'r_n-3', 'r_n-4']}
+synset_id2synset_obj = ingest_utils.load_and_link_synsets(lmf.xpath(ingest_utils.LMF_XPATH), sense_id2le_obj)
+graph = SynsetGraph.build(sense_id2le_obj, synset_id2synset_obj)
+
+assert graph.get_synonyms(['r_n-1', 'r_n-3', 'r_n-4', 'unknown']) == [['r_n-2'], [], [], []]
+assert graph.get_senses_of_ilis(['i2', 'i1', 'unknown']) == [['r_n-3'], ['r_n-1', 'r_n-2'], []]
+
+# empty batches
+assert graph.get_synonyms([]) == []
+assert graph.get_senses_of_ilis([]) == []
+
+print(graph.get_synonyms(['r_n-1', 'r_n-2']))
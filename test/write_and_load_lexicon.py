@@ -0,0 +1,64 @@
+import sys
+sys.path.insert(0, '..')
+sys.path.insert(0, '../benchmarks')
+
+import os
+import tempfile
+
+from lxml import etree
+
+import ingest_utils
+import lexicon_format
+import synthetic_data
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    orbn_path = os.path.join(temp_dir, 'orbn.xml')
+    odwn_path = os.path.join(temp_dir, 'odwn.xml')
+    synthetic_data.write_orbn(orbn_path, num_senses=500)
+    synthetic_data.write_lmf(odwn_path, num_senses=500)
+
+    sense_id2le_obj, not_added = ingest_utils.load_le_objs(etree.parse(orbn_path).xpath('cdb_lu'),
+                                                           'http://premon.fbk.eu/resource/',
+                                                           'pm',
+                                                           allowed_prefixes={'r', 'c'},
+                                                           exclude_sub_number_ids=True)
+    synset_id2synset_obj = ingest_utils.load_and_link_synsets(etree.parse(odwn_path).xpath(ingest_utils.LMF_XPATH),
+                                                              sense_id2le_obj)
+
+    orbn_out_path = os.path.join(temp_dir, 'orbn.lex')
+    odwn_out_path = os.path.join(temp_dir, 'odwn.lex')
+    lexicon_format.write_senses(orbn_out_path, sense_id2le_obj)
+    lexicon_format.write_synsets(odwn_out_path, synset_id2synset_obj)
+    assert lexicon_format.is_lexicon_file(orbn_out_path)
+    assert lexicon_format.is_lexicon_file(odwn_out_path)
+
+    with lexicon_format.load_senses(orbn_out_path) as senses, \
+            lexicon_format.load_synsets(odwn_out_path, senses) as synsets:
+        assert list(senses) == list(sense_id2le_obj)
+        for sense_id, le_obj in sense_id2le_obj.items():
+            assert senses[sense_id].__getstate__() == le_obj.__getstate__(), sense_id
+        assert 'unknown' not in senses
+
+        assert list(synsets) == list(synset_id2synset_obj)
+        for synset_id, synset_obj in synset_id2synset_obj.items():
+            loaded_synset_obj = synsets[synset_id]
+            assert loaded_synset_obj.synonyms == [senses[le_obj.sense_id] for le_obj in synset_obj.synonyms], synset_id
+            assert loaded_synset_obj.ili == synset_obj.ili
+            assert loaded_synset_obj.definition == synset_obj.definition
+
+        loaded_senses = dict(senses.items())
+
+    # the senses that were accessed keep their text attributes after the file is closed
+    for sense_id, le_obj in sense_id2le_obj.items():
+        assert loaded_senses[sense_id].definition == le_obj.definition, sense_id
+        assert loaded_senses[sense_id].canonical_forms == le_obj.canonical_forms, sense_id
+
+    # LexiconFile only reads the records, SenseFile and SynsetFile materialize them
+    try:
+        lexicon_format.LexiconFile(orbn_out_path, kind='senses')
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('LexiconFile should be abstract')
+
+print(f'{len(sense_id2le_obj)} senses and {len(synset_id2synset_obj)} synsets written and loaded')
@@ -0,0 +1,210 @@
+"""
+Instrumentation of the build pipeline: timed spans, memory snapshots, counters and cProfile dumps.
+
+The module-level tracer records every span, e.g.,
+
+    with trace_utils.span('load_le_objs'):
+        ...
+    trace_utils.count('senses added', len(sense_id2le_obj))
+    trace_utils.tracer.save('output/build_trace.json')
+
+A span records its wall time, its parent span, the peak RSS of the process at its end
+and, if tracemalloc is tracing (see Tracer.start), the memory allocated by Python at its end and its peak
+during the span. Repeated spans with the same name and parent, e.g., of a traced function,
+are aggregated into one record (number of calls, total seconds, maximum peak), so the tracer
+does not grow in a long-running process. If profiling is enabled, each top-level span is profiled with cProfile
+and dumped as <profile_folder>/<span name>.prof (see python -m pstats).
+"""
+import os
+import sys
+import json
+import time
+try:
+    import resource
+except ImportError: # not available on Windows
+    resource = None
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+
+def get_peak_rss_mb(rusage=None):
+    """
+    peak resident set size of the current process (or of a child process)
+
+    :param resource.struct_rusage rusage: e.g., of a child process from os.wait4,
+    by default the resource usage of the current process
+
+    :rtype: float
+    :return: peak RSS in megabytes or None if the resource module is not available
+    """
+    if rusage is None:
+        if resource is None:
+            return None
+        rusage = resource.getrusage(resource.RUSAGE_SELF)
+    peak_rss = rusage.ru_maxrss
+    if sys.platform == 'darwin': # bytes on macOS, kilobytes on Linux
+        peak_rss = peak_rss / 1024
+    return round(peak_rss / 1024, 1)
+
+
+def format_mb(megabytes):
+    """
+    :rtype: str
+    :return: e.g., '12.5 MB' or 'n/a' if the value is not available on this platform
+    """
+    return 'n/a' if megabytes is None else f'{megabytes} MB'
+
+
+def get_rss_mb():
+    """
+    :rtype: float
+    :return: current resident set size in megabytes or None if /proc is not available
+    """
+    try:
+        with open('/proc/self/statm') as infile:
+            resident_pages = int(infile.read().split()[1])
+    except OSError:
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20, 1)
+
+
+class Tracer:
+    """
+    collects spans and counters of one process
+    """
+    aggregated_maximum = ('peak_rss_mb', 'peak_allocated_mb')
+
+    def __init__(self):
+        self.spans = dict() # (name, parent) -> aggregated record
+        self.counters = dict()
+        self.stack = []
+        self.profile_folder = None
+        self.origin = time.perf_counter()
+
+    def start(self, trace_allocations=False, profile_folder=None):
+        """
+        :param bool trace_allocations: trace the memory allocated by Python with tracemalloc (slower)
+        :param str profile_folder: if provided, top-level spans are profiled with cProfile
+        """
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if profile_folder is not None:
+            os.makedirs(profile_folder, exist_ok=True)
+        self.profile_folder = profile_folder
+
+    @contextmanager
+    def span(self, name):
+        """
+        record the time and memory use of the code in the with block
+        """
+        record = {'name': name,
+                  'parent': self.stack[-1]['name'] if self.stack else None,
+                  'start': round(time.perf_counter() - self.origin, 4)}
+        self.stack.append(record)
+
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+        profile = None
+        if self.profile_folder is not None and len(self.stack) == 1:
+            profile = cProfile.Profile()
+            profile.enable()
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                profile_path = os.path.join(self.profile_folder, f'{name.replace(" ", "_")}.prof')
+                profile.dump_stats(profile_path)
+                record['profile'] = profile_path
+
+            record['peak_rss_mb'] = get_peak_rss_mb()
+            record['rss_mb'] = get_rss_mb()
+            peak_of_children = record.pop('peak_of_children', 0)
+            self.stack.pop()
+            if tracemalloc.is_tracing():
+                # the peak was reset by the nested spans, which pass their peak on
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, peak_of_children)
+                record['allocated_mb'] = round(current / 2 ** 20, 1)
+                record['peak_allocated_mb'] = round(peak / 2 ** 20, 1)
+                if self.stack:
+                    parent = self.stack[-1]
+                    parent['peak_of_children'] = max(parent.get('peak_of_children', 0), peak)
+
+            self.add(record)
+
+    def add(self, record):
+        """
+        aggregate a finished span with the previous spans of the same name and parent
+        """
+        key = (record['name'], record['parent'])
+        if key not in self.spans:
+            record['calls'] = 1
+            self.spans[key] = record
+            return
+
+        aggregated = self.spans[key]
+        aggregated['calls'] += 1
+        for attr, value in record.items():
+            if attr in {'name', 'parent', 'start'}:
+                continue
+            if attr == 'seconds':
+                aggregated[attr] += value
+            elif attr in self.aggregated_maximum:
+                if aggregated.get(attr) is None or (value is not None and value > aggregated[attr]):
+                    aggregated[attr] = value
+            else:
+                aggregated[attr] = value
+
+    def count(self, name, value):
+        """
+        set a counter, e.g., the number of senses that were added
+        """
+        self.counters[name] = value
+
+    def to_dict(self):
+        return {'spans': sorted([dict(record, seconds=round(record['seconds'], 4))
+                                 for record in self.spans.values()],
+                                key=lambda record: record['start']),
+                'counters': self.counters}
+
+    def save(self, path):
+        with open(path, 'w') as outfile:
+            json.dump(self.to_dict(), outfile, indent=2)
+
+    def print_summary(self):
+        for record in self.to_dict()['spans']:
+            indent = '  ' if record['parent'] is not None else ''
+            print(f"{indent}{record['name']}: {record['seconds']} s, peak RSS {format_mb(record['peak_rss_mb'])}")
+        for name, value in self.counters.items():
+            print(f'{name}: {value}')
+
+
+tracer = Tracer()
+
+
+def span(name):
+    return tracer.span(name)
+
+
+def count(name, value):
+    tracer.count(name, value)
+
+
+def traced(name):
+    """
+    decorator that records every call of the function as a span
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,161 @@
+"""
+Index of the Dutch translations of English lemmas in Wiktionary
+(resources/wiktionary/translations.tsv).
+
+The TSV contains the translations into all languages. It is read in chunks and only the
+Dutch rows ('Dutch; Flemish') are kept, so the whole file is never in memory.
+The index is cached as JSON with a fingerprint of the TSV (see get_translation_index),
+so it is only rebuilt when the TSV changes.
+
+Wiktionary translations have no part of speech: the translations of a sense
+are the translations of its lemma.
+"""
+import json
+from collections import defaultdict
+
+import pandas
+
+try:
+    from . import cache_utils
+    from .utils import iter_sense_attributes
+except ImportError:
+    import cache_utils
+    from utils import iter_sense_attributes
+
+TRANSLATION_INDEX_VERSION = 1
+DUTCH = 'Dutch; Flemish'
+
+
+def iter_dutch_translations(path, chunk_size=100000, language_names=None):
+    """
+    iterate over the Dutch translations in the Wiktionary TSV
+
+    :param str path: path to translations.tsv
+    :param int chunk_size: number of rows that are read at once
+    :param set language_names: if provided, all language names in the file are added to it
+
+    :rtype: generator
+    :return: generator of (Dutch lemma, English lemma)
+    """
+    chunks = pandas.read_csv(path,
+                             sep='\t',
+                             usecols=['Concept', 'Language_name', 'Form'],
+                             dtype=str,
+                             chunksize=chunk_size)
+    for chunk in chunks:
+        if language_names is not None:
+            language_names.update(chunk['Language_name'].dropna().unique())
+        chunk = chunk[chunk['Language_name'] == DUTCH].dropna(subset=['Concept', 'Form'])
+        english_lemmas = chunk['Concept'].str.split('/', n=1).str[0]
+        yield from zip(chunk['Form'], english_lemmas)
+
+
+class TranslationIndex:
+    """
+    Dutch lemma -> English lemmas and English lemma -> Dutch lemmas
+    """
+    def __init__(self, dutch2english):
+        self.dutch2english = dutch2english
+        self.english2dutch = defaultdict(set)
+        for dutch_lemma, english_lemmas in dutch2english.items():
+            for english_lemma in english_lemmas:
+                self.english2dutch[english_lemma].add(dutch_lemma)
+
+        self.lemma_pos2english = None
+
+    @classmethod
+    def build(cls, path, chunk_size=100000, verbose=0):
+        """
+        :param str path: path to translations.tsv
+        """
+        language_names = set() if verbose else None
+        dutch2english = defaultdict(set)
+        for dutch_lemma, english_lemma in iter_dutch_translations(path,
+                                                                  chunk_size=chunk_size,
+                                                                  language_names=language_names):
+            dutch2english[dutch_lemma].add(english_lemma)
+
+        if verbose:
+            print()
+            print(f'number of available languages: {len(language_names)}')
+            print()
+            print('languages that have Dutch in the name')
+            for language in language_names:
+                if 'Dutch' in language:
+                    print(language)
+            print(f'we use only: "{DUTCH}"')
+        return cls(dutch2english)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as infile:
+            info = json.load(infile)
+        if info['version'] != TRANSLATION_INDEX_VERSION:
+            raise ValueError(f'{path} has index version {info["version"]}, supported: {TRANSLATION_INDEX_VERSION}')
+        return cls(defaultdict(set, {dutch_lemma: set(english_lemmas)
+                                     for dutch_lemma, english_lemmas in info['dutch2english']}))
+
+    def save(self, path):
+        entries = [[dutch_lemma, sorted(english_lemmas)]
+                   for dutch_lemma, english_lemmas in sorted(self.dutch2english.items())]
+        with open(path, 'w') as outfile:
+            json.dump({'version': TRANSLATION_INDEX_VERSION,
+                       'dutch2english': entries}, outfile)
+
+    def get_english_lemmas(self, lemma):
+        """
+        :rtype: list
+        :return: sorted English lemmas of a Dutch lemma (empty list if it is not in Wiktionary)
+        """
+        return sorted(self.dutch2english.get(lemma, ()))
+
+    def index_senses(self, senseid_to_sense_obj):
+        """
+        compute the translations of all (lemma, rbn_pos) of ORBN once,
+        without materializing the LE objects if ORBN was loaded from orbn.lex
+
+        :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE
+        """
+        self.lemma_pos2english = dict()
+        for lemma, rbn_pos in iter_sense_attributes(senseid_to_sense_obj, ['lemma', 'rbn_pos']):
+            key = (lemma, rbn_pos)
+            if key not in self.lemma_pos2english:
+                self.lemma_pos2english[key] = self.get_english_lemmas(lemma)
+
+    def get_sense_translations(self, le_obj):
+        """
+        :param odwn_classes.LE le_obj: an ORBN sense
+
+        :rtype: list
+        :return: sorted English lemmas of the sense
+        """
+        if self.lemma_pos2english is not None:
+            key = (le_obj.lemma, le_obj.rbn_pos)
+            if key in self.lemma_pos2english:
+                return self.lemma_pos2english[key]
+        return self.get_english_lemmas(le_obj.lemma)
+
+    def __len__(self):
+        return len(self.dutch2english)
+
+
+def get_translation_index(tsv_path, output_dir, verbose=0):
+    """
+    load the translation index of tsv_path from the cache in output_dir,
+    e.g., output/wiktionary_translations-<fingerprint>.json, which is built if the TSV changed
+
+    :rtype: TranslationIndex
+    """
+    def write_translation_index(output_path):
+        TranslationIndex.build(tsv_path, verbose=verbose).save(output_path)
+
+    fingerprint = cache_utils.get_fingerprint(input_paths={'translations': tsv_path},
+                                              settings={'index_version': TRANSLATION_INDEX_VERSION,
+                                                        'language_name': DUTCH})
+    index_path = cache_utils.get_or_build(output_dir,
+                                          stem='wiktionary_translations',
+                                          suffix='.json',
+                                          fingerprint=fingerprint,
+                                          write_function=write_translation_index,
+                                          verbose=verbose)
+    return TranslationIndex.load(index_path)
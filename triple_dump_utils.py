@@ -0,0 +1,256 @@
+"""
+Binary dump of an rdflib Graph, so that a large RDF file (e.g., the Lemon representation of ORBN)
+is only parsed once (see rdf_utils.load_orbn_in_lemon).
+
+The dump is a numpy .npz file with:
+    strings             utf-8 of all strings concatenated, string_offsets: character offsets (num_strings + 1)
+    term_kinds          per term: 0 URIRef, 1 BNode, 2 Literal
+    term_values         per term: string id of its value
+    term_languages      per term: string id of the language of a Literal, -1 if none
+    term_datatypes      per term: string id of the datatype of a Literal, -1 if none
+    triples             (num_triples, 3) term ids of subject, predicate and object
+    subject_indptr, subject_triples, predicate_indptr, predicate_triples, object_indptr, object_triples
+                        CSR index (see graph_utils.get_csr): the triples with term i as subject are
+                        subject_triples[subject_indptr[i]:subject_indptr[i + 1]], and so on
+    namespace_prefixes, namespace_uris  string ids of the namespace bindings
+
+TripleDumpStore is a read-only rdflib Store on top of the dump: loading only decodes the terms,
+triple patterns are answered with the CSR index of a bound term.
+The dump is cached with a fingerprint of the RDF file (see cache_utils.py),
+so it is rebuilt when the RDF file changes.
+"""
+import os
+import numpy
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.store import Store
+
+try:
+    from . import cache_utils
+    from .graph_utils import get_csr
+except ImportError:
+    import cache_utils
+    from graph_utils import get_csr
+
+TRIPLE_DUMP_VERSION = 1
+URI, BLANK_NODE, LITERAL = 0, 1, 2
+POSITIONS = ['subject', 'predicate', 'object']
+
+
+def get_string_table(strings):
+    """
+    :rtype: tuple
+    :return: (utf-8 of the concatenated strings as uint8 array, character offsets)
+    """
+    offsets = numpy.zeros(len(strings) + 1, dtype='int64')
+    numpy.cumsum([len(string) for string in strings], out=offsets[1:])
+    blob = numpy.frombuffer(''.join(strings).encode('utf-8'), dtype='uint8')
+    return blob, offsets
+
+
+def read_string_table(blob, offsets):
+    text = blob.tobytes().decode('utf-8')
+    offsets = offsets.tolist()
+    return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def write_triple_dump(graph, path):
+    """
+    :param rdflib.Graph graph: the graph to dump
+    :param str path: output path (.npz)
+    """
+    strings = []
+    string2id = dict()
+
+    def string_id(value):
+        if value is None:
+            return -1
+        if value not in string2id:
+            string2id[value] = len(strings)
+            strings.append(value)
+        return string2id[value]
+
+    term2id = dict()
+    kinds, values, languages, datatypes = [], [], [], []
+
+    def term_id(term):
+        if term not in term2id:
+            term2id[term] = len(kinds)
+            if isinstance(term, Literal):
+                kinds.append(LITERAL)
+                languages.append(string_id(term.language))
+                datatypes.append(string_id(str(term.datatype) if term.datatype is not None else None))
+            else:
+                kinds.append(BLANK_NODE if isinstance(term, BNode) else URI)
+                languages.append(-1)
+                datatypes.append(-1)
+            values.append(string_id(str(term)))
+        return term2id[term]
+
+    triples = numpy.array([(term_id(subject), term_id(predicate), term_id(obj))
+                           for subject, predicate, obj in graph],
+                          dtype='uint32').reshape(-1, 3)
+    namespaces = list(graph.namespaces())
+
+    arrays = {'term_kinds': numpy.array(kinds, dtype='uint8'),
+              'term_values': numpy.array(values, dtype='int32'),
+              'term_languages': numpy.array(languages, dtype='int32'),
+              'term_datatypes': numpy.array(datatypes, dtype='int32'),
+              'triples': triples,
+              'namespace_prefixes': numpy.array([string_id(prefix) for prefix, _ in namespaces], dtype='int32'),
+              'namespace_uris': numpy.array([string_id(str(uri)) for _, uri in namespaces], dtype='int32'),
+              'version': numpy.array([TRIPLE_DUMP_VERSION])}
+    arrays['strings'], arrays['string_offsets'] = get_string_table(strings)
+
+    triple_indices = numpy.arange(len(triples), dtype='int64')
+    for column, position in enumerate(POSITIONS):
+        arrays[f'{position}_indptr'], arrays[f'{position}_triples'] = get_csr(len(kinds),
+                                                                              triples[:, column].astype('int64'),
+                                                                              triple_indices)
+
+    with open(path, 'wb') as outfile:
+        numpy.savez(outfile, **arrays)
+
+
+class TripleDumpStore(Store):
+    """
+    read-only rdflib Store of a triple dump (see the module docstring), e.g., Graph(store=TripleDumpStore.load(path))
+    """
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, arrays):
+        """
+        :param dict arrays: name -> numpy.ndarray, as written by write_triple_dump
+        """
+        super().__init__()
+        if int(arrays['version'][0]) != TRIPLE_DUMP_VERSION:
+            raise ValueError(f'triple dump version {int(arrays["version"][0])}, supported: {TRIPLE_DUMP_VERSION}')
+        strings = read_string_table(arrays['strings'], arrays['string_offsets'])
+
+        self.terms = []
+        for kind, value, language, datatype in zip(arrays['term_kinds'].tolist(),
+                                                   arrays['term_values'].tolist(),
+                                                   arrays['term_languages'].tolist(),
+                                                   arrays['term_datatypes'].tolist()):
+            if kind == URI:
+                self.terms.append(URIRef(strings[value]))
+            elif kind == BLANK_NODE:
+                self.terms.append(BNode(strings[value]))
+            else:
+                self.terms.append(Literal(strings[value],
+                                          lang=strings[language] if language >= 0 else None,
+                                          datatype=URIRef(strings[datatype]) if datatype >= 0 else None))
+        self.term2id = {term: index for index, term in enumerate(self.terms)}
+
+        self.triples_array = arrays['triples'].astype('int64')
+        self.indices = [(arrays[f'{position}_indptr'], arrays[f'{position}_triples'])
+                        for position in POSITIONS]
+
+        self.prefix_to_namespace = dict()
+        self.namespace_to_prefix = dict()
+        for prefix, uri in zip(arrays['namespace_prefixes'].tolist(), arrays['namespace_uris'].tolist()):
+            self.bind(strings[prefix], URIRef(strings[uri]))
+
+    @classmethod
+    def load(cls, path):
+        with numpy.load(path) as npz:
+            return cls({name: npz[name] for name in npz.files})
+
+    def get_triple_ids(self, pattern):
+        """
+        :param tuple pattern: (subject, predicate, object), None is a wildcard
+
+        :rtype: numpy.ndarray
+        :return: (num_matches, 3) term ids of the matching triples
+        """
+        bound = []
+        for column, term in enumerate(pattern):
+            if term is not None:
+                term_id = self.term2id.get(term)
+                if term_id is None:
+                    return self.triples_array[:0]
+                bound.append((column, term_id))
+        if not bound:
+            return self.triples_array
+
+        # start from the bound term with the fewest triples, e.g., a subject rather than rdf:type
+        best = None
+        for column, term_id in bound:
+            indptr = self.indices[column][0]
+            start, end = indptr[term_id], indptr[term_id + 1]
+            if best is None or end - start < best[2] - best[1]:
+                best = (column, start, end)
+        column, start, end = best
+        selected = self.triples_array[self.indices[column][1][start:end]]
+        for other_column, term_id in bound:
+            if other_column != column:
+                selected = selected[selected[:, other_column] == term_id]
+        return selected
+
+    def triples(self, triple_pattern, context=None):
+        terms = self.terms
+        for subject_id, predicate_id, object_id in self.get_triple_ids(triple_pattern).tolist():
+            yield (terms[subject_id], terms[predicate_id], terms[object_id]), iter(())
+
+    def __len__(self, context=None):
+        return len(self.triples_array)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def add(self, triple, context, quoted=False):
+        raise TypeError('TripleDumpStore is read-only')
+
+    def addN(self, quads):
+        raise TypeError('TripleDumpStore is read-only')
+
+    def remove(self, triple, context=None):
+        raise TypeError('TripleDumpStore is read-only')
+
+    def bind(self, prefix, namespace, override=True):
+        if not override and (prefix in self.prefix_to_namespace or namespace in self.namespace_to_prefix):
+            return
+        if namespace in self.namespace_to_prefix:
+            del self.prefix_to_namespace[self.namespace_to_prefix[namespace]]
+        if prefix in self.prefix_to_namespace:
+            del self.namespace_to_prefix[self.prefix_to_namespace[prefix]]
+        self.prefix_to_namespace[prefix] = namespace
+        self.namespace_to_prefix[namespace] = prefix
+
+    def namespace(self, prefix):
+        return self.prefix_to_namespace.get(prefix)
+
+    def prefix(self, namespace):
+        return self.namespace_to_prefix.get(namespace)
+
+    def namespaces(self):
+        yield from self.prefix_to_namespace.items()
+
+
+def load_graph_with_dump(rdf_path, cache_dir, stem, rdf_format='turtle', verbose=0):
+    """
+    load an RDF file through its cached triple dump <cache_dir>/<stem>-<fingerprint>.npz,
+    which is (re)built by parsing rdf_path if it does not exist for the current contents of rdf_path
+
+    :rtype: rdflib.Graph
+    :return: read-only graph backed by TripleDumpStore
+    """
+    fingerprint = cache_utils.get_fingerprint(input_paths={'rdf': rdf_path},
+                                              settings={'rdf_format': rdf_format,
+                                                        'version': TRIPLE_DUMP_VERSION})
+
+    def parse_and_dump(output_path):
+        graph = Graph()
+        graph.parse(rdf_path, format=rdf_format)
+        write_triple_dump(graph, output_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    dump_path = cache_utils.get_or_build(cache_dir,
+                                         stem=stem,
+                                         suffix='.npz',
+                                         fingerprint=fingerprint,
+                                         write_function=parse_and_dump,
+                                         verbose=verbose)
+    return Graph(store=TripleDumpStore.load(dump_path))
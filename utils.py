@@ -1,14 +1,63 @@
 import pandas
 import pickle
 import sys
-from collections import defaultdict, Counter
+from collections import defaultdict
+
+try:
+    from . import lexicon_format
+    from . import frame_utils
+    from .trace_utils import get_peak_rss_mb
+except ImportError:
+    import lexicon_format
+    import frame_utils
+    from trace_utils import get_peak_rss_mb
 
 def load_orbn(path, package_dir):
+    """
+    load sense_id -> odwn_classes.LE from orbn.lex (lazily, see lexicon_format)
+    or from a pickle, e.g., orbn.p
+    """
+    if lexicon_format.is_lexicon_file(path):
+        return lexicon_format.load_senses(path)
+
     sys.path.append(package_dir)
     sense_id_to_sense_obj = pickle.load(open(path, 'rb'))
     sys.path.remove(package_dir)
     return sense_id_to_sense_obj
 
+def load_odwn(path, package_dir, senseid_to_sense_obj):
+    """
+    load synset_id -> odwn_classes.Synset from odwn.lex
+    (synonyms are resolved with senseid_to_sense_obj)
+    or from a pickle, e.g., odwn.p
+    """
+    if lexicon_format.is_lexicon_file(path):
+        return lexicon_format.load_synsets(path, senseid_to_sense_obj)
+
+    sys.path.append(package_dir)
+    synset_id_to_synset_obj = pickle.load(open(path, 'rb'))
+    sys.path.remove(package_dir)
+    return synset_id_to_synset_obj
+
+def iter_sense_attributes(senseid_to_sense_obj, attributes):
+    """
+    iterate over the values of the provided attributes for every sense.
+    If ORBN was loaded from orbn.lex, the values are read from the columns of the file
+    without materializing the LE objects.
+
+    :param dict senseid_to_sense_obj: sense_id -> odwn_classes.LE (or lexicon_format.SenseFile)
+    :param list attributes: e.g., ['lemma', 'rbn_pos']
+
+    :rtype: generator
+    :return: generator of tuples, one value per attribute (None if not set)
+    """
+    if isinstance(senseid_to_sense_obj, lexicon_format.LexiconFile):
+        columns = [senseid_to_sense_obj.iter_column(attr) for attr in attributes]
+        yield from zip(*columns)
+    else:
+        for le_obj in senseid_to_sense_obj.values():
+            yield tuple(getattr(le_obj, attr, None) for attr in attributes)
+
 def split_morphostructure(morphostructure, lemma, verbose=0):
     parts = []
 
@@ -34,9 +83,10 @@ def split_morphostructure(morphostructure, lemma, verbose=0):
 def compute_stats_about(le_objs, attributes, verbose=0):
     """
     compute stats about the provided attributes
+    (with the lexicon frame of le_objs, see frame_utils)
     
-    :param list le_objs: list of rbn_classes.LE object
-    :param set attributes: set of attributes to use in descriptive statistics
+    :param dict le_objs: sense_id -> rbn_classes.LE object
+    :param list attributes: list of attributes to use in descriptive statistics
     :param
     :rtype: dict
     :return: {
@@ -46,22 +96,11 @@ def compute_stats_about(le_objs, attributes, verbose=0):
      'freq_dist_df' : frequency distribution as pandas dataframe
     }
     """
-    observations = []
-    
-    for le_obj in le_objs.values():
-        observation = [getattr(le_obj, attr)
-                       for attr in attributes]
-        observations.append(tuple(observation))
-        
+    frame = frame_utils.get_lexicon_frame(le_objs, attributes)
+    freq_dist = frame_utils.get_frequency_distribution(frame, attributes)
 
-    
-    freq_dist = Counter(observations)
-    
-    headers = ['-'.join(attributes), 
-               'frequency']
-    list_of_lists = [[key, freq]
-                     for key, freq  in freq_dist.items()]
-    df = pandas.DataFrame(list_of_lists, columns=headers)
+    df = pandas.DataFrame({'-'.join(attributes): pandas.Series(list(freq_dist), dtype=object),
+                           'frequency': list(freq_dist.values())})
     
     
     if verbose:
@@ -69,8 +108,8 @@ def compute_stats_about(le_objs, attributes, verbose=0):
 
         
     stats = {
-        'count' : len(observations),
-        '# of unique observations' : len(set(observations)),
+        'count' : len(frame),
+        '# of unique observations' : len(freq_dist),
         'freq_dist' : freq_dist,
         'freq_dist_df' : df.sort_values('frequency', ascending=False)
     }
@@ -78,67 +117,38 @@ def compute_stats_about(le_objs, attributes, verbose=0):
 
 
 def load_mapping(path):
-    
-    df = pandas.read_excel(path, sheet_name='the_mapping')
-    
-    rbn_featureset2frames = dict()
-    for index, row in df.iterrows():
-        rbn_info = row['RBN feature set']
-        frames = row['English FrameNet frames']
-        frames = frames.split(',')
-
-        rbn_featureset2frames[rbn_info] = frames
-
-    return rbn_featureset2frames
+    """
+    rbn_feature_set -> frames of the last row of the feature set in the sheet 'the_mapping'
+    (see framenet_utils.FrameMapping for the compiled and cached mapping)
+    """
+    df = pandas.read_excel(path, sheet_name='the_mapping', usecols=['RBN feature set', 'English FrameNet frames'])
+    return dict(zip(df['RBN feature set'], df['English FrameNet frames'].str.split(',')))
 
 
-def get_translations_from_wiktionary(path, verbose=0):
+def get_translations_from_wiktionary(path, verbose=0, cache_dir=None):
     """
     path to translations in csv
     (resources/wiktionary/translations.tsv)
+    The file is read in chunks and only the Dutch translations are kept (see translation_utils).
 
     :param str path: the path to translations
+    :param str cache_dir: if provided, the index is cached in this folder
+    and only rebuilt when the file changes
 
     :rtype: tuple
-    :return: (en to nl, nl to en)
+    :return: (nl to en, en to nl)
     """
-    path = 'resources/wiktionary/translations.tsv'
-    df = pandas.read_csv(path, sep='\t', usecols=['ID', 'Concept_ID', 'Concept', 'Languoid', 'Language_name', 'Form'])
-
-    if verbose:
-        print()
-        print(f'number of available languages: {len(set(df.Language_name))}')
-
-    if verbose:
-        print()
-        print('languages that have Dutch in the name')
-        for language in set(df.Language_name):
-            if 'Dutch' in language:
-                print(language)
-        print('we use only: "Dutch; Flemish"')
-
-    df = df[df.Language_name == 'Dutch; Flemish']
-
-    english_lemmas = []
-    english_definitions = []
-
-    for index, row in df.iterrows():
-        concept = row['Concept']
-        lemma, *definitions = concept.split('/')
-        english_lemmas.append(lemma)
-        english_definitions.append('/'.join(definitions))
-    df['English_lemma'] = english_lemmas
+    try:
+        from .translation_utils import TranslationIndex, get_translation_index
+    except ImportError:
+        from translation_utils import TranslationIndex, get_translation_index
 
-    dutch2english = defaultdict(set)
-    english2dutch = defaultdict(set)
+    if cache_dir is None:
+        translation_index = TranslationIndex.build(path, verbose=verbose)
+    else:
+        translation_index = get_translation_index(path, cache_dir, verbose=verbose)
 
-    for index, row in df.iterrows():
-        english_lemma = row['English_lemma']
-        dutch_lemma = row['Form']
-        dutch2english[dutch_lemma].add(english_lemma)
-        english2dutch[english_lemma].add(dutch_lemma)
-
-    return dutch2english, english2dutch
+    return translation_index.dutch2english, translation_index.english2dutch
 
 
 def load_polysemy_info(le_objs, pos={'noun', 
@@ -147,37 +157,24 @@ def load_polysemy_info(le_objs, pos={'noun',
                                      'adverb',
                                      'other'}):
     """
+    polysemy of (lemma, fn_pos) for the senses with a part of speech in pos
+    (with the lexicon frame of le_objs, see frame_utils)
+
+    :param dict le_objs: sense_id -> rbn_classes.LE object
+    :param set pos: the RBN parts of speech to include
+
+    :rtype: tuple
+    :return: (df with polysemy per (lemma, fn_pos), df with polysemy distribution, (lemma, fn_pos) -> set of sense ids)
     """
-    lemma_pos2le_ids = defaultdict(set)
-    for le_obj in le_objs.values():
-        if le_obj.rbn_pos in pos:
-            key = (le_obj.lemma, le_obj.fn_pos)
-            value = le_obj.sense_id
-            lemma_pos2le_ids[key].add(value)
-
-    list_of_lists = []
-    headers = ['lemma_pos', 'polysemy', 'LU ids']
-    
-    le_id2polysemy_of_lemma = dict()
-    for lemma_pos, le_ids in lemma_pos2le_ids.items():
-        one_row = [lemma_pos, len(le_ids), le_ids]
-        list_of_lists.append(one_row)
-        
-        for le_id in le_ids:
-            le_id2polysemy_of_lemma[le_id] = len(le_ids)
+    frame = frame_utils.get_lexicon_frame(le_objs)
+    frame = frame[frame['rbn_pos'].isin(pos)]
+    lemma_pos2le_ids = frame_utils.get_group_members(frame, ['lemma', 'fn_pos'])
 
-    df = pandas.DataFrame(list_of_lists, columns=headers)
-        
-    freq_dict = Counter(df['polysemy'])
-    total = sum(freq_dict.values())
-    list_of_lists = []
-    headers = ['Polysemy class', 'Freq', '%']
-    for key, value in sorted(freq_dict.items()):
-        one_row = [key, value, round((100 * (value / total)),2)]
-        list_of_lists.append(one_row)
-        
-    
-    distr_df = pandas.DataFrame(list_of_lists, columns=headers)
+    df = pandas.DataFrame({'lemma_pos': pandas.Series(list(lemma_pos2le_ids), dtype=object),
+                           'polysemy': [len(le_ids) for le_ids in lemma_pos2le_ids.values()],
+                           'LU ids': pandas.Series(list(lemma_pos2le_ids.values()), dtype=object)})
+
+    distr_df = frame_utils.get_polysemy_distribution(df['polysemy'])
     
     return df, distr_df, lemma_pos2le_ids
 